@@ -0,0 +1,124 @@
+from typing import Dict, Any, Callable, List, Optional
+
+import numpy as np
+
+from source.utils.parallel import imap_tasks, resolve_n_jobs, worker_context
+
+ALIGNMENTS = ('procrustes', 'sign')
+DEFAULT_REPLICATES = 1000
+DEFAULT_BLOCK_SIZE = 50  # Replicates per task; large enough to amortize process overhead
+
+
+def align_loadings(loadings: np.ndarray, reference: np.ndarray, alignment: str = 'procrustes') -> np.ndarray:
+    """Align replicate loadings (features x components) to the reference loadings.
+
+    'sign' flips each component to agree with its reference column. 'procrustes'
+    applies the orthogonal rotation that best maps the replicate onto the reference,
+    which also undoes component swaps between near-equal eigenvalues.
+    """
+    if alignment == 'sign':
+        signs = np.sign(np.sum(loadings * reference, axis=0))
+        signs[signs == 0] = 1.0
+        return loadings * signs
+    if alignment == 'procrustes':
+        u, _, vt = np.linalg.svd(loadings.T @ reference)
+        return loadings @ (u @ vt)
+    raise ValueError(f"Unsupported alignment: {alignment}. Choose from {', '.join(ALIGNMENTS)}")
+
+
+def replicate_loadings(data: np.ndarray, counts: np.ndarray, n_components: int) -> np.ndarray:
+    """PCA loadings of a bootstrap resample given as per-row multiplicities.
+
+    Weighting rows by how often they were drawn gives the resample's covariance
+    without materializing the resampled matrix.
+    """
+    n_samples = counts.sum()
+    mean = counts @ data / n_samples
+    covariance = (data.T * counts) @ data / n_samples - np.outer(mean, mean)
+    _, eigenvectors = np.linalg.eigh(covariance)
+    return eigenvectors[:, ::-1][:, :n_components]
+
+
+def bootstrap_block(
+        replicate_ids: List[int],
+        reference: np.ndarray,
+        alignment: str,
+        random_state: int,
+        data: Optional[np.ndarray] = None
+) -> Dict[str, Any]:
+    """Fit and align a block of replicates, each seeded by its own replicate id."""
+    data = worker_context()['data'] if data is None else data
+    n_samples = data.shape[0]
+    n_components = reference.shape[1]
+    loadings = np.empty((len(replicate_ids), reference.shape[0], n_components))
+    for i, replicate_id in enumerate(replicate_ids):
+        # Seeding per replicate keeps results identical regardless of n_jobs and block order
+        rng = np.random.default_rng([random_state, replicate_id])
+        counts = np.bincount(rng.integers(0, n_samples, n_samples), minlength=n_samples).astype(np.float64)
+        loadings[i] = align_loadings(replicate_loadings(data, counts, n_components), reference, alignment)
+    return {'replicate_ids': replicate_ids, 'loadings': loadings}
+
+
+def bootstrap_loadings(
+        data: np.ndarray,
+        reference: np.ndarray,
+        n_replicates: int = DEFAULT_REPLICATES,
+        confidence: float = 0.95,
+        alignment: str = 'procrustes',
+        threshold: float = 0.2,
+        n_jobs: Optional[int] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        random_state: int = 42,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, Any]:
+    """Bootstrap confidence intervals and selection frequencies for PCA loadings.
+
+    Replicate blocks run in a process pool and are collected as they finish, so
+    progress_callback(done, total) sees partial progress. A feature is "selected" on
+    a component in a replicate when its absolute aligned loading reaches threshold.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    reference = np.asarray(reference, dtype=np.float64)
+    if n_replicates <= 0:
+        raise ValueError("Number of bootstrap replicates must be greater than 0.")
+    if not 0 < confidence < 1:
+        raise ValueError("Confidence level must be between 0 and 1.")
+    if alignment not in ALIGNMENTS:
+        raise ValueError(f"Unsupported alignment: {alignment}. Choose from {', '.join(ALIGNMENTS)}")
+    if reference.shape[0] != data.shape[1]:
+        raise ValueError("Reference loadings do not match the number of features.")
+
+    blocks = [list(range(start, min(start + block_size, n_replicates)))
+              for start in range(0, n_replicates, block_size)]
+    n_jobs = resolve_n_jobs(n_jobs, len(blocks))
+    loadings = np.empty((n_replicates, reference.shape[0], reference.shape[1]))
+    done = 0
+
+    def collect(block_result):
+        nonlocal done
+        loadings[block_result['replicate_ids']] = block_result['loadings']
+        done += len(block_result['replicate_ids'])
+        if progress_callback is not None:
+            progress_callback(done, n_replicates)
+
+    tasks = [(block, reference, alignment, random_state) for block in blocks]
+    for block_result in imap_tasks(bootstrap_block, tasks, n_jobs=n_jobs, context={'data': data}):
+        collect(block_result)
+
+    tail = (1 - confidence) / 2 * 100
+    lower, upper = np.percentile(loadings, [tail, 100 - tail], axis=0)
+
+    return {
+        'reference': reference,
+        'mean': loadings.mean(axis=0),
+        'std': loadings.std(axis=0, ddof=1) if n_replicates > 1 else np.zeros_like(reference),
+        'lower': lower,
+        'upper': upper,
+        'selection_frequency': (np.abs(loadings) >= threshold).mean(axis=0),
+        'replicates': loadings,
+        'n_replicates': n_replicates,
+        'confidence': confidence,
+        'alignment': alignment,
+        'threshold': threshold,
+        'random_state': random_state
+    }
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+from typing import Dict, Any, Optional
+
+import numpy as np
+from sklearn.decomposition import PCA
+
+from source.analysis.covariance import CovariancePCAModel
+from source.utils.constant import CACHE_DIR, CACHE_MAX_BYTES
+
+try:
+    import xxhash
+except ImportError:  # Fall back to the standard library hasher
+    xxhash = None
+
+
+def _new_hasher():
+    """Return the fastest available incremental hasher."""
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+class AnalysisCache:
+    """Content-addressed, size-bounded LRU store for PCA results on disk."""
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def make_key(self, data, **params) -> str:
+        """Hash the numeric matrix (values, shape, column names) together with the parameters."""
+        values = np.ascontiguousarray(np.asarray(data))
+        hasher = _new_hasher()
+        hasher.update(str(values.dtype).encode())
+        hasher.update(str(values.shape).encode())
+        if hasattr(data, 'columns'):
+            hasher.update(json.dumps([str(col) for col in data.columns]).encode())
+        hasher.update(memoryview(values).cast('B'))
+        hasher.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return hasher.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored arrays and metadata for a key, or None on a miss."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                entry = {name: stored[name] for name in stored.files if name != 'meta'}
+                entry['meta'] = json.loads(str(stored['meta']))
+        except (OSError, ValueError) as e:
+            print(f"Discarding unreadable cache entry {path}: {e}")
+            os.remove(path)
+            return None
+        os.utime(path)  # Mark as recently used for LRU eviction
+        return entry
+
+    def save(self, key: str, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        """Write an entry atomically and evict least recently used entries beyond max_bytes."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            np.savez_compressed(file, meta=np.array(json.dumps(meta, default=str)), **arrays)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.npz'):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+    def clear(self):
+        """Delete every cached entry."""
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.npz'):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+
+def pack_model(model, scaler_mean: np.ndarray, scaler_scale: np.ndarray) -> Dict[str, np.ndarray]:
+    """Extract the arrays needed to rebuild a fitted PCA model."""
+    return {
+        'components': model.components_,
+        'explained_variance': model.explained_variance_,
+        'explained_variance_ratio': model.explained_variance_ratio_,
+        'singular_values': model.singular_values_,
+        'noise_variance': np.asarray(model.noise_variance_),
+        'pca_mean': model.mean_,
+        'scaler_mean': scaler_mean,
+        'scaler_scale': scaler_scale
+    }
+
+
+def restore_model(entry: Dict[str, Any]):
+    """Rebuild a fitted model (sklearn PCA or CovariancePCAModel) from a cache entry."""
+    meta = entry['meta']
+    n_components = meta['n_components']
+    if meta['model_type'] == 'CovariancePCAModel':
+        model = CovariancePCAModel(n_components)
+        model.scaler_mean_ = entry['scaler_mean']
+        model.scaler_scale_ = entry['scaler_scale']
+    else:
+        model = PCA(n_components=n_components, svd_solver=meta['svd_solver'], random_state=42)
+        if meta.get('feature_names_in') is not None:
+            model.feature_names_in_ = np.array(meta['feature_names_in'], dtype=object)
+
+    model.components_ = entry['components']
+    model.explained_variance_ = entry['explained_variance']
+    model.explained_variance_ratio_ = entry['explained_variance_ratio']
+    model.singular_values_ = entry['singular_values']
+    model.noise_variance_ = float(entry['noise_variance'])
+    model.mean_ = entry['pca_mean']
+    model.n_components_ = n_components
+    model.n_samples_ = meta['data_shape'][0]
+    model.n_features_in_ = len(meta['feature_names'])
+    return model
@@ -0,0 +1,118 @@
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+
+from source.utils.parallel import map_tasks, resolve_n_jobs, worker_context
+
+
+DEFAULT_SILHOUETTE_SAMPLE = 5000  # Silhouette is O(n^2); estimate it on a sample beyond this size
+DEFAULT_K_BLOCK = 4  # Consecutive k values warm-started as one chain, whatever the worker count
+
+
+def next_center(data: np.ndarray, centers: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Draw one extra centroid with k-means++ (D^2) weighting against the existing centers."""
+    distances = np.full(data.shape[0], np.inf)
+    for center in centers:
+        np.minimum(distances, ((data - center) ** 2).sum(axis=1), out=distances)
+    total = distances.sum()
+    if total == 0:
+        return data[rng.integers(data.shape[0])]
+    return data[rng.choice(data.shape[0], p=distances / total)]
+
+
+def sweep_block(
+        k_values: List[int],
+        sample_indices: np.ndarray,
+        random_state: int,
+        data: Optional[np.ndarray] = None
+) -> List[Dict[str, Any]]:
+    """Fit consecutive k values, warm-starting each k from the previous k's centroids.
+
+    Warm starts only chain inside the block: its first k (and any k that does not
+    follow the previous one) starts cold with KMeans' default k-means++ init.
+    """
+    data = worker_context()['data'] if data is None else data
+    results = []
+    centers = None
+    for k in k_values:
+        rng = np.random.default_rng(random_state + k)
+        if centers is None or centers.shape[0] != k - 1:
+            kmeans = KMeans(n_clusters=k, random_state=random_state)
+        else:
+            init = np.vstack([centers, next_center(data, centers, rng)])
+            kmeans = KMeans(n_clusters=k, init=init, n_init=1, random_state=random_state)
+        labels = kmeans.fit_predict(data)
+        centers = kmeans.cluster_centers_
+
+        sampled_labels = labels[sample_indices]
+        if 1 < len(np.unique(sampled_labels)) < len(sample_indices):
+            silhouette = float(silhouette_score(data[sample_indices], sampled_labels))
+        else:
+            silhouette = float('nan')
+
+        results.append({
+            'k': k,
+            'inertia': float(kmeans.inertia_),
+            'silhouette': silhouette,
+            'labels': labels,
+            'centroids': centers,
+            'n_iter': int(kmeans.n_iter_)
+        })
+    return results
+
+
+def k_sweep(
+        data: np.ndarray,
+        k_values: List[int],
+        n_jobs: Optional[int] = None,
+        silhouette_sample_size: int = DEFAULT_SILHOUETTE_SAMPLE,
+        random_state: int = 42,
+        block_size: int = DEFAULT_K_BLOCK
+) -> Dict[str, Any]:
+    """Fit KMeans for every k, splitting the k range into warm-started blocks across processes.
+
+    The sorted k values are cut into fixed blocks of block_size; the first k of every
+    block starts cold and the rest warm-start from it. The pool only decides which
+    worker fits a block, so the fits do not depend on n_jobs.
+    """
+    data = np.asarray(data)
+    if data.shape[0] < 3:
+        raise ValueError(f"A k sweep needs at least 3 samples to score silhouettes; got {data.shape[0]}.")
+    k_values = sorted(set(int(k) for k in k_values))
+    if not k_values:
+        raise ValueError("No k values to sweep.")
+    if k_values[0] <= 0:
+        raise ValueError("k values must be positive integers.")
+    if block_size < 1:
+        raise ValueError(f"block_size must be at least 1; got {block_size}.")
+    if k_values[-1] > data.shape[0]:
+        raise ValueError(f"Cannot fit {k_values[-1]} clusters to {data.shape[0]} samples.")
+
+    # One shared sample keeps silhouettes comparable across k
+    rng = np.random.default_rng(random_state)
+    if data.shape[0] > silhouette_sample_size:
+        sample_indices = np.sort(rng.choice(data.shape[0], silhouette_sample_size, replace=False))
+    else:
+        sample_indices = np.arange(data.shape[0])
+
+    blocks = [k_values[start:start + block_size] for start in range(0, len(k_values), block_size)]
+    block_results = map_tasks(sweep_block, [(block, sample_indices, random_state) for block in blocks],
+                              n_jobs=resolve_n_jobs(n_jobs, len(blocks)), context={'data': data})
+
+    fits = [fit for block in block_results for fit in block]
+    silhouettes = np.array([fit['silhouette'] for fit in fits])
+    best_k = fits[int(np.nanargmax(silhouettes))]['k'] if not np.all(np.isnan(silhouettes)) else None
+
+    return {
+        'algorithm': 'k-means sweep',
+        'k_values': [fit['k'] for fit in fits],
+        'inertia': np.array([fit['inertia'] for fit in fits]),
+        'silhouette': silhouettes,
+        'labels': {fit['k']: fit['labels'] for fit in fits},
+        'centroids': {fit['k']: fit['centroids'] for fit in fits},
+        'n_iter': {fit['k']: fit['n_iter'] for fit in fits},
+        'best_k': best_k,
+        'silhouette_sample_size': len(sample_indices)
+    }
@@ -0,0 +1,158 @@
+import itertools
+import os
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from source.analysis.pca import PCAAnalyzer
+from source.utils.constant import DEFAULT_COLUMNS_TO_DROP
+from source.utils.file_operations import load_file
+from source.utils.parallel import map_tasks, resolve_n_jobs, worker_context
+
+
+# GUI missing-value choices -> preprocessing impute strategy. "leave_empty" imputes
+# nothing; the sweep evaluates it by listwise deletion of incomplete samples.
+MISSING_STRATEGIES = {
+    'impute_mean': 'mean',
+    'impute_median': 'median',
+    'replace_nan': 'zero',
+    'leave_empty': None
+}
+BBCH_STAGES = (59, 69, 85, -1)  # -1 keeps every stage, as the GUI's "all" option
+DEFAULT_TOP_LOADINGS = 3
+
+
+def build_grid(
+        missing_strategies=tuple(MISSING_STRATEGIES),
+        bbch_stages=BBCH_STAGES,
+        drop_lists: Optional[Dict[str, List[str]]] = None
+) -> List[Dict[str, Any]]:
+    """Every combination of missing-value strategy, BBCH stage and named drop list."""
+    if drop_lists is None:
+        drop_lists = {'none': [], 'default': DEFAULT_COLUMNS_TO_DROP}
+    for strategy in missing_strategies:
+        if strategy not in MISSING_STRATEGIES:
+            raise ValueError(f"Unsupported missing value strategy: {strategy}")
+    for stage in bbch_stages:
+        if stage not in BBCH_STAGES:
+            raise ValueError(f"Unsupported BBCH stage: {stage}")
+
+    return [
+        {'missing_strategy': strategy, 'bbch_stage': stage, 'drop_list': name, 'drop_columns': drop_lists[name]}
+        for strategy, stage, name in itertools.product(missing_strategies, bbch_stages, drop_lists)
+    ]
+
+
+def split_frame(data: pd.DataFrame) -> Dict[str, Any]:
+    """Normalize column names like clean_data and split off the numeric matrix and BBCH labels."""
+    data = data.rename(columns=lambda col: str(col).strip().lower())
+    bbch = data['bbch'].astype(str).str.strip().to_numpy() if 'bbch' in data.columns else None
+    numeric_columns = [
+        col for col in data.columns
+        if pd.api.types.is_numeric_dtype(data[col].dtype) and not pd.api.types.is_bool_dtype(data[col].dtype)
+    ]
+    values = np.empty((data.shape[0], len(numeric_columns)), dtype=np.float64, order='F')
+    for j, col in enumerate(numeric_columns):
+        values[:, j] = data[col].to_numpy(dtype=np.float64, na_value=np.nan)
+    return {'values': values, 'columns': numeric_columns, 'bbch': bbch}
+
+
+def top_loadings(loadings: np.ndarray, feature_names: List[str], top_n: int) -> List[str]:
+    """Format the top_n features by absolute loading for each component."""
+    summaries = []
+    for pc in range(loadings.shape[1]):
+        order = np.argsort(np.abs(loadings[:, pc]))[::-1][:top_n]
+        summaries.append(", ".join(f"{feature_names[i]} ({loadings[i, pc]:+.2f})" for i in order))
+    return summaries
+
+
+def evaluate_config(
+        config: Dict[str, Any],
+        n_components: int,
+        top_n: int,
+        frame: Optional[pd.DataFrame] = None,
+        bbch: Optional[np.ndarray] = None
+) -> Dict[str, Any]:
+    """Run one configuration and reduce it to a single comparison-table row."""
+    if frame is None:
+        context = worker_context()  # Numeric matrix mapped from shared memory
+        frame = pd.DataFrame(context['values'], columns=context['columns'], copy=False)
+        bbch = context['bbch']
+
+    row = {
+        'missing_strategy': config['missing_strategy'],
+        'bbch_stage': 'all' if config['bbch_stage'] == -1 else config['bbch_stage'],
+        'drop_list': config['drop_list']
+    }
+    try:
+        if config['bbch_stage'] != -1:
+            if bbch is None:
+                raise ValueError("Dataset has no 'bbch' column to filter on.")
+            frame = frame[bbch == f"B{config['bbch_stage']}"]
+        if frame.shape[0] < 2:
+            raise ValueError("Fewer than two samples remain after filtering.")
+
+        # Missing drop columns are skipped with a warning in clean_data, so skip them here too
+        drop_columns = [col.strip().lower() for col in config['drop_columns']]
+        drop_columns = [col for col in drop_columns if col in frame.columns]
+
+        impute_strategy = MISSING_STRATEGIES[config['missing_strategy']]
+        if impute_strategy is None:
+            features = frame.drop(columns=drop_columns).to_numpy()
+            frame = frame[np.isfinite(features).all(axis=1)]
+            if frame.shape[0] < 2:
+                raise ValueError("Fewer than two complete samples remain after listwise deletion.")
+
+        analyzer = PCAAnalyzer()
+        results = analyzer.analyze(
+            frame,
+            n_components,
+            default_columns_to_drop=drop_columns,
+            impute_strategy=impute_strategy
+        )
+        explained = results['explained_variance']
+        row.update({'n_samples': results['data_shape'][0], 'n_features': results['data_shape'][1]})
+        row.update({f"PC{i + 1}_var": float(ratio) for i, ratio in enumerate(explained)})
+        row['cumulative_var'] = float(np.sum(explained))
+        summaries = top_loadings(results['loadings'], results['feature_names'], top_n)
+        row.update({f"PC{i + 1}_top_loadings": summary for i, summary in enumerate(summaries)})
+        row['error'] = ''
+    except Exception as e:
+        row['error'] = str(e)
+    return row
+
+
+def run_config_sweep(
+        file_path: str,
+        n_components: int,
+        missing_strategies=tuple(MISSING_STRATEGIES),
+        bbch_stages=BBCH_STAGES,
+        drop_lists: Optional[Dict[str, List[str]]] = None,
+        output_path: Optional[str] = None,
+        n_jobs: Optional[int] = None,
+        top_n: int = DEFAULT_TOP_LOADINGS
+) -> pd.DataFrame:
+    """Evaluate the full grid of cleaning configurations and return a comparison table.
+
+    The CSV is parsed once; its numeric matrix is placed in shared memory so every
+    worker maps it instead of re-reading the file or receiving a pickled copy.
+    """
+    grid = build_grid(missing_strategies, bbch_stages, drop_lists)
+    split = split_frame(load_file(file_path))
+    print(f"Running {len(grid)} configurations on {split['values'].shape[0]} samples")
+
+    rows = map_tasks(
+        evaluate_config,
+        [(config, n_components, top_n) for config in grid],
+        n_jobs=resolve_n_jobs(n_jobs, len(grid)),
+        context={'columns': split['columns'], 'bbch': split['bbch']},
+        shared={'values': split.pop('values')}
+    )
+
+    table = pd.DataFrame(rows)
+    if output_path:
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        table.to_csv(output_path, index=False)
+        print(f"Comparison table written to {output_path}")
+    return table
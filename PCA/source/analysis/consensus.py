@@ -0,0 +1,128 @@
+from typing import Dict, Any, Callable, List, Optional
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import csr_matrix
+from sklearn.neighbors import KDTree
+
+from source.utils.parallel import imap_tasks, resolve_n_jobs, split_blocks, worker_context
+
+
+DEFAULT_RESAMPLES = 50
+DEFAULT_SUBSAMPLE = 0.8
+DEFAULT_CONSENSUS_NEIGHBORS = 10  # Co-association is tracked only on these kNN pairs
+
+
+def align_labels(labels: np.ndarray, reference: np.ndarray, n_clusters: int) -> np.ndarray:
+    """Relabel a replicate so its clusters match the reference clusters (Hungarian assignment)."""
+    n_replicate = labels.max() + 1
+    contingency = np.zeros((n_replicate, n_clusters), dtype=np.int64)
+    np.add.at(contingency, (labels, reference), 1)
+    rows, cols = linear_sum_assignment(-contingency)
+    mapping = np.full(n_replicate, -1)
+    mapping[rows] = cols
+    # Replicate clusters left unmatched (more clusters than the reference) vote for their majority
+    unmatched = mapping < 0
+    mapping[unmatched] = np.argmax(contingency[unmatched], axis=1)
+    return mapping[labels]
+
+
+def resample_block(replicate_ids: List[int], state: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+    """Cluster a block of subsamples and accumulate aligned votes and kNN co-clustering counts."""
+    state = worker_context() if state is None else state
+    data, reference = state['data'], state['reference']
+    source, target = state['source'], state['target']
+    n_samples, n_clusters = data.shape[0], state['n_clusters']
+    sample_size = max(int(round(state['subsample'] * n_samples)), n_clusters + 1)
+
+    votes = np.zeros((n_samples, n_clusters), dtype=np.int32)
+    cosampled = np.zeros(source.shape[0], dtype=np.int32)
+    coclustered = np.zeros(source.shape[0], dtype=np.int32)
+    labels = np.empty(n_samples, dtype=np.int64)
+
+    for replicate_id in replicate_ids:
+        rng = np.random.default_rng([state['random_state'], replicate_id])
+        sampled = np.sort(rng.choice(n_samples, size=min(sample_size, n_samples), replace=False))
+        _, replicate_labels = np.unique(state['label_fn'](data[sampled]), return_inverse=True)
+
+        aligned = align_labels(replicate_labels, reference[sampled], n_clusters)
+        votes[sampled, aligned] += 1
+
+        labels.fill(-1)
+        labels[sampled] = replicate_labels
+        both = (labels[source] >= 0) & (labels[target] >= 0)
+        cosampled += both
+        coclustered += both & (labels[source] == labels[target])
+
+    return {'votes': votes, 'cosampled': cosampled, 'coclustered': coclustered}
+
+
+def consensus_clustering(
+        data: np.ndarray,
+        label_fn: Callable[[np.ndarray], np.ndarray],
+        n_resamples: int = DEFAULT_RESAMPLES,
+        subsample: float = DEFAULT_SUBSAMPLE,
+        n_neighbors: int = DEFAULT_CONSENSUS_NEIGHBORS,
+        n_jobs: Optional[int] = None,
+        random_state: int = 42
+) -> Dict[str, Any]:
+    """Consensus labels and stability scores from repeated subsampled clusterings.
+
+    label_fn clusters a block of rows and returns one label per row. Each replicate's
+    labels are aligned to a full-data reference labelling and counted as votes
+    (n x k). Co-association is kept only for each sample's n_neighbors nearest
+    neighbours (a sparse n x n matrix), so memory stays O(n (k + n_neighbors)).
+    """
+    data = np.asarray(data)
+    if n_resamples <= 0:
+        raise ValueError("Number of resamples must be greater than 0.")
+    if not 0 < subsample <= 1:
+        raise ValueError("Subsample fraction must be in (0, 1].")
+
+    reference_values, reference = np.unique(label_fn(data), return_inverse=True)
+    n_samples, n_clusters = data.shape[0], len(reference_values)
+
+    n_neighbors = min(n_neighbors, n_samples - 1)
+    _, neighbors = KDTree(data).query(data, k=n_neighbors + 1)
+    source = np.repeat(np.arange(n_samples, dtype=np.int32), n_neighbors)
+    target = neighbors[:, 1:].astype(np.int32).ravel()
+
+    state = {
+        'data': data, 'reference': reference, 'source': source, 'target': target,
+        'n_clusters': n_clusters, 'subsample': subsample, 'random_state': random_state, 'label_fn': label_fn
+    }
+    # Data, kNN edges, reference labels and the label function are shared once per worker
+    n_jobs = resolve_n_jobs(n_jobs, n_resamples)
+    totals = None
+    tasks = [(block,) for block in split_blocks(n_resamples, n_jobs)]
+    for partial in imap_tasks(resample_block, tasks, n_jobs=n_jobs, context=state):
+        totals = partial if totals is None else {key: totals[key] + partial[key] for key in totals}
+
+    votes = totals['votes']
+    times_sampled = votes.sum(axis=1)
+    consensus = np.argmax(votes, axis=1)
+    consensus[times_sampled == 0] = reference[times_sampled == 0]
+    stability = np.divide(votes.max(axis=1), times_sampled, out=np.zeros(n_samples), where=times_sampled > 0)
+
+    ratio = np.divide(totals['coclustered'], totals['cosampled'],
+                      out=np.full(source.shape[0], np.nan), where=totals['cosampled'] > 0)
+    observed = ~np.isnan(ratio)
+    coassociation = csr_matrix((ratio[observed], (source[observed], target[observed])), shape=(n_samples, n_samples))
+    edge_sums = np.bincount(source[observed], weights=ratio[observed], minlength=n_samples)
+    edge_counts = np.bincount(source[observed], minlength=n_samples)
+    coassociation_stability = np.divide(edge_sums, edge_counts, out=np.full(n_samples, np.nan), where=edge_counts > 0)
+
+    labels = reference_values[consensus]
+    return {
+        'labels': labels,
+        'reference_labels': reference_values[reference],
+        'stability': stability,
+        'coassociation': coassociation,
+        'coassociation_stability': coassociation_stability,
+        'cluster_stability': {value: float(stability[consensus == i].mean()) if np.any(consensus == i) else float('nan')
+                              for i, value in enumerate(reference_values.tolist())},
+        'times_sampled': times_sampled,
+        'num_clusters': n_clusters,
+        'n_resamples': n_resamples,
+        'subsample': subsample
+    }
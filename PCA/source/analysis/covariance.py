@@ -0,0 +1,173 @@
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+from source.utils.parallel import imap_tasks
+
+
+DEFAULT_CHUNK_ROWS = 100000  # Rows per block sent to a worker process
+
+# (n_rows, column means, centered cross-product matrix)
+Moments = Tuple[int, np.ndarray, np.ndarray]
+
+
+def as_float_array(data) -> np.ndarray:
+    """Return data as a float array, keeping float32 input as float32."""
+    data = np.asarray(data)
+    if not np.issubdtype(data.dtype, np.floating):
+        data = data.astype(np.float64)
+    return data
+
+
+def chunk_moments(block: np.ndarray) -> Moments:
+    """Compute row count, means and centered cross-product (Gram) matrix of one block."""
+    # Moments are always accumulated in float64, whatever the input precision
+    block = np.asarray(block, dtype=np.float64)
+    if np.isnan(block).any():
+        raise ValueError("Input contains NaN; impute missing values before running the covariance engine")
+    mean = block.mean(axis=0)
+    centered = block - mean
+    return block.shape[0], mean, centered.T @ centered
+
+
+def merge_moments(a: Optional[Moments], b: Moments) -> Moments:
+    """Merge two sets of chunk moments (pairwise update of Chan et al.)."""
+    if a is None or a[0] == 0:
+        return b
+    if b[0] == 0:
+        return a
+    n_a, mean_a, comoment_a = a
+    n_b, mean_b, comoment_b = b
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (n_b / n)
+    comoment = comoment_a + comoment_b + np.outer(delta, delta) * (n_a * n_b / n)
+    return n, mean, comoment
+
+
+def subtract_moments(total: Moments, part: Moments) -> Moments:
+    """Remove a block's moments from a merged total (inverse of merge_moments)."""
+    n, mean, comoment = total
+    n_b, mean_b, comoment_b = part
+    n_a = n - n_b
+    if n_a < 0:
+        raise ValueError("Cannot remove more rows than the moments contain")
+    if n_a == 0:
+        return 0, np.zeros_like(mean), np.zeros_like(comoment)
+    mean_a = (n * mean - n_b * mean_b) / n_a
+    delta = mean_b - mean_a
+    comoment_a = comoment - comoment_b - np.outer(delta, delta) * (n_a * n_b / n)
+    return n_a, mean_a, comoment_a
+
+
+def iter_row_blocks(data: np.ndarray, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """Yield consecutive row blocks of an in-memory array."""
+    for start in range(0, data.shape[0], chunk_rows):
+        yield data[start:start + chunk_rows]
+
+
+def accumulate_moments(blocks: Iterable[np.ndarray], n_jobs: Optional[int] = None) -> Moments:
+    """Compute moments of every block in a process pool and merge them in one pass."""
+    total = None
+    for moments in imap_tasks(chunk_moments, ((block,) for block in blocks), n_jobs=n_jobs):
+        total = merge_moments(total, moments)
+
+    if total is None or total[0] < 2:
+        raise ValueError("At least two rows are required to compute a covariance matrix")
+    return total
+
+
+class CovariancePCAModel:
+    """PCA model fitted from merged moments; mirrors the sklearn PCA attributes used by the GUI.
+
+    Like the sklearn path, the model lives in standardized space: transform() expects
+    data that has already been scaled with scaler_mean_ / scaler_scale_.
+    """
+
+    def __init__(self, n_components: int):
+        self.n_components = n_components
+        self.n_components_ = n_components
+        self.components_ = None
+        self.explained_variance_ = None
+        self.explained_variance_ratio_ = None
+        self.singular_values_ = None
+        self.noise_variance_ = None
+        self.mean_ = None
+        self.scaler_mean_ = None
+        self.scaler_scale_ = None
+        self.n_samples_ = None
+        self.n_features_in_ = None
+
+    def fit_moments(self, moments: Moments) -> 'CovariancePCAModel':
+        """Standardize analytically from the moments and eigendecompose the p x p covariance."""
+        n, mean, comoment = moments
+        n_features = mean.shape[0]
+
+        # Same conventions as StandardScaler (ddof=0, unit scale for constant columns)
+        scale = np.sqrt(np.clip(np.diag(comoment) / n, 0, None))
+        scale[scale == 0] = 1.0
+
+        # Covariance of the standardized data, ddof=1 as in sklearn's PCA
+        covariance = comoment / (n - 1) / np.outer(scale, scale)
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        order = np.argsort(eigenvalues)[::-1]
+        eigenvalues = np.clip(eigenvalues[order], 0, None)
+        components = eigenvectors[:, order].T
+
+        # Deterministic signs: largest absolute loading of each component is positive (svd_flip)
+        max_abs_rows = np.argmax(np.abs(components), axis=1)
+        signs = np.sign(components[np.arange(components.shape[0]), max_abs_rows])
+        signs[signs == 0] = 1.0
+        components *= signs[:, np.newaxis]
+
+        k = self.n_components
+        total_variance = eigenvalues.sum()
+        self.components_ = components[:k]
+        self.explained_variance_ = eigenvalues[:k]
+        self.explained_variance_ratio_ = (
+            eigenvalues[:k] / total_variance if total_variance > 0 else np.zeros(k)
+        )
+        self.singular_values_ = np.sqrt(eigenvalues[:k] * (n - 1))
+        self.noise_variance_ = eigenvalues[k:].mean() if k < n_features else 0.0
+        self.mean_ = np.zeros(n_features)
+        self.scaler_mean_ = mean
+        self.scaler_scale_ = scale
+        self.n_samples_ = n
+        self.n_features_in_ = n_features
+        return self
+
+    def standardize(self, data) -> np.ndarray:
+        """Scale raw data with the moments-derived mean and scale."""
+        data = as_float_array(data)
+        return (data - self.scaler_mean_.astype(data.dtype)) / self.scaler_scale_.astype(data.dtype)
+
+    def transform(self, data) -> np.ndarray:
+        """Project standardized data onto the principal components."""
+        data = as_float_array(data)
+        return (data - self.mean_.astype(data.dtype)) @ self.components_.T.astype(data.dtype)
+
+
+def fit_covariance_pca(
+        data: np.ndarray,
+        n_components: int,
+        n_jobs: Optional[int] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Dict[str, Any]:
+    """Fit an exact PCA from per-chunk moments computed in parallel."""
+    data = as_float_array(data)
+    moments = accumulate_moments(iter_row_blocks(data, chunk_rows), n_jobs=n_jobs)
+    model = CovariancePCAModel(n_components).fit_moments(moments)
+
+    # Standardize and project block by block into preallocated outputs
+    standardized = np.empty_like(data)
+    transformed = np.empty((data.shape[0], n_components), dtype=data.dtype)
+    for start in range(0, data.shape[0], chunk_rows):
+        stop = start + chunk_rows
+        standardized[start:stop] = model.standardize(data[start:stop])
+        transformed[start:stop] = model.transform(standardized[start:stop])
+
+    return {
+        'model': model,
+        'standardized': standardized,
+        'transformed_data': transformed
+    }
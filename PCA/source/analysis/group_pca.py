@@ -0,0 +1,134 @@
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA
+
+from source.analysis.preprocessing import PreprocessingPipeline
+from source.analysis.solver import resolve_svd_solver
+from source.utils.parallel import map_tasks, resolve_n_jobs, worker_context
+
+
+def fit_pca(
+        frame: pd.DataFrame,
+        n_components: int,
+        impute_strategy: Optional[str],
+        svd_solver: str,
+        dtype=np.float64
+) -> Dict[str, Any]:
+    """Impute, standardize and fit PCA on one block of rows."""
+    preprocessed = PreprocessingPipeline(impute_strategy=impute_strategy, dtype=dtype).fit_transform(frame)
+    # Same shape-based choice and ARPACK fallback as PCAAnalyzer.run_pca, per group
+    svd_solver = resolve_svd_solver(svd_solver, *preprocessed['data'].shape, n_components)
+    model = PCA(n_components=n_components, svd_solver=svd_solver, random_state=42)
+    transformed = model.fit_transform(preprocessed['data'])
+    return {
+        'model': model,
+        'transformed_data': transformed,
+        'components': model.components_,
+        'explained_variance': model.explained_variance_ratio_,
+        'loadings': model.components_.T,
+        'feature_names': preprocessed['feature_names'],
+        'n_components': n_components,
+        'data_shape': preprocessed['data'].shape,
+        'svd_solver': svd_solver
+    }
+
+
+def fit_group(
+        key,
+        rows: np.ndarray,
+        feature_names: List[str],
+        n_components: int,
+        impute_strategy: Optional[str],
+        svd_solver: str,
+        values: Optional[np.ndarray] = None
+) -> Dict[str, Any]:
+    """Fit one group's PCA on its rows of the shared matrix."""
+    values = worker_context()['values'] if values is None else values
+    frame = pd.DataFrame(values[rows], columns=feature_names, copy=False)
+    results = fit_pca(frame, n_components, impute_strategy, svd_solver, dtype=values.dtype)
+    results.update({'group': key, 'row_indices': rows})
+    return results
+
+
+def align_signs(results: Dict[str, Any], reference: np.ndarray) -> np.ndarray:
+    """Flip each component so it points the same way as the reference loadings, in place."""
+    signs = np.sign(np.sum(results['loadings'] * reference, axis=0))
+    signs[signs == 0] = 1.0
+    results['model'].components_ *= signs[:, np.newaxis]
+    results['transformed_data'] *= signs
+    results['components'] = results['model'].components_
+    results['loadings'] = results['model'].components_.T
+    return signs
+
+
+def group_pca(
+        data: pd.DataFrame,
+        group_by: List[str],
+        n_components: int,
+        drop_columns: Optional[List[str]] = None,
+        default_columns_to_drop: Optional[List[str]] = None,
+        impute_strategy: Optional[str] = 'mean',
+        svd_solver: str = 'auto',
+        n_jobs: Optional[int] = None,
+        dtype=np.float64
+) -> Dict[str, Any]:
+    """Fit a separate PCA per group of rows in a process pool.
+
+    The numeric columns are extracted once into shared memory and every worker maps
+    that block. Each group is imputed and standardized on its own rows. Component
+    signs are aligned to a PCA on all rows so loadings are comparable across groups.
+    """
+    missing_keys = [col for col in group_by if col not in data.columns]
+    if missing_keys:
+        raise ValueError(f"Group columns not found in the dataset: {', '.join(missing_keys)}")
+
+    # Group keys never enter the PCA; NaN and inf are kept for per-group imputation
+    extraction = PreprocessingPipeline(
+        drop_columns=drop_columns,
+        default_columns_to_drop=list(default_columns_to_drop or []) + list(group_by),
+        impute_strategy=None,
+        scale=False,
+        dtype=dtype
+    ).fit_transform(data)
+    values, feature_names = extraction['data'], extraction['feature_names']
+    n_components = min(n_components, len(feature_names))
+
+    groups = {}
+    skipped = {}
+    for key, rows in data.groupby(group_by if len(group_by) > 1 else group_by[0], sort=True).indices.items():
+        if len(rows) <= n_components:
+            skipped[key] = f"{len(rows)} samples is too few for {n_components} components"
+        else:
+            groups[key] = rows
+    if not groups:
+        raise ValueError("No group has enough samples for the requested number of components.")
+    print(f"Fitting PCA for {len(groups)} groups of {group_by}; skipped {len(skipped)}")
+
+    reference = fit_pca(pd.DataFrame(values, columns=feature_names, copy=False),
+                        n_components, impute_strategy, svd_solver, dtype=dtype)
+
+    tasks = [(key, rows, feature_names, n_components, impute_strategy, svd_solver) for key, rows in groups.items()]
+    fitted = map_tasks(fit_group, tasks, n_jobs=resolve_n_jobs(n_jobs, len(groups)), shared={'values': values})
+
+    group_results = {}
+    loadings_tensor = np.empty((len(fitted), len(feature_names), n_components))
+    explained_variance = np.empty((len(fitted), n_components))
+    for i, results in enumerate(fitted):
+        results['sign_flips'] = align_signs(results, reference['loadings'])
+        group_results[results['group']] = results
+        loadings_tensor[i] = results['loadings']
+        explained_variance[i] = results['explained_variance']
+
+    return {
+        'group_by': list(group_by),
+        'group_keys': list(group_results),
+        'groups': group_results,
+        'loadings_tensor': loadings_tensor,
+        'explained_variance': explained_variance,
+        'feature_names': feature_names,
+        'reference': reference,
+        'skipped_groups': skipped,
+        'n_components': n_components
+    }
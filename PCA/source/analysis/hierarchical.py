@@ -0,0 +1,75 @@
+import numpy as np
+
+
+def weighted_ward_linkage(centroids: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """Ward linkage over weighted points (e.g. micro-cluster centroids and their sample counts).
+
+    Uses the nearest-neighbour chain algorithm with exact ward distances between
+    weighted centroids, so merging micro-clusters behaves as if every original sample
+    were present. With unit sizes the result matches scipy's linkage(method="ward").
+    Returns a scipy-compatible linkage matrix.
+    """
+    centroids = np.array(centroids, dtype=np.float64)
+    sizes = np.array(sizes, dtype=np.float64)
+    n = centroids.shape[0]
+    if n < 2:
+        raise ValueError("At least two points are required for linkage.")
+
+    alive = np.ones(n, dtype=bool)
+    merges = []  # (representative leaf a, representative leaf b, distance)
+    chain = []
+
+    def distances_from(a):
+        weight = sizes[a] * sizes / (sizes[a] + sizes)
+        squared = ((centroids - centroids[a]) ** 2).sum(axis=1)
+        dist = np.sqrt(2.0 * weight * squared)
+        dist[~alive] = np.inf
+        dist[a] = np.inf
+        return dist
+
+    for _ in range(n - 1):
+        if not chain:
+            chain.append(int(np.flatnonzero(alive)[0]))
+        while True:
+            a = chain[-1]
+            dist = distances_from(a)
+            b = int(np.argmin(dist))
+            # Prefer the previous chain element on ties so the chain always terminates
+            if len(chain) > 1 and dist[chain[-2]] <= dist[b]:
+                b = chain[-2]
+                break
+            chain.append(b)
+
+        chain.pop()
+        chain.pop()
+        merges.append((a, b, dist[b]))
+
+        # Merge b into slot a
+        total = sizes[a] + sizes[b]
+        centroids[a] = (sizes[a] * centroids[a] + sizes[b] * centroids[b]) / total
+        sizes[a] = total
+        alive[b] = False
+
+    # Sort merges by height and relabel them in scipy's cluster numbering
+    merges.sort(key=lambda merge: merge[2])
+    parent = np.arange(n)
+    cluster_id = np.arange(n)
+    leaf_count = np.ones(n, dtype=np.int64)
+    linkage_matrix = np.empty((n - 1, 4))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, (a, b, distance) in enumerate(merges):
+        root_a, root_b = find(a), find(b)
+        id_a, id_b = cluster_id[root_a], cluster_id[root_b]
+        count = leaf_count[root_a] + leaf_count[root_b]
+        linkage_matrix[i] = (min(id_a, id_b), max(id_a, id_b), distance, count)
+        parent[root_b] = root_a
+        cluster_id[root_a] = n + i
+        leaf_count[root_a] = count
+
+    return linkage_matrix
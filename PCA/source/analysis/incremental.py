@@ -0,0 +1,98 @@
+import json
+import os
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.linalg import subspace_angles
+
+from source.analysis.covariance import CovariancePCAModel, Moments, chunk_moments, merge_moments
+
+
+STATE_VERSION = 1
+
+
+def component_drift(previous: np.ndarray, current: np.ndarray,
+                    previous_ratio: np.ndarray, current_ratio: np.ndarray) -> Dict[str, Any]:
+    """Describe how far the components moved between two fits (rows are components)."""
+    angles = np.degrees(subspace_angles(previous.T, current.T))
+    return {
+        'max_subspace_angle_deg': float(np.max(angles)),
+        'subspace_angles_deg': angles,
+        # |cos| per matched component: 1 means the axis did not move
+        'component_cosines': np.abs(np.sum(previous * current, axis=1)),
+        'explained_variance_change': current_ratio - previous_ratio
+    }
+
+
+class IncrementalPCAState:
+    """Running moments of the raw data plus the PCA model fitted from them.
+
+    Scaler statistics and the covariance are exact running sums (Chan et al. merge),
+    so absorbing m new rows costs O(m p^2) plus an O(p^3) eigendecomposition,
+    independent of how many rows were absorbed before.
+    """
+
+    def __init__(self, feature_names: List[str], n_components: int, moments: Moments):
+        self.feature_names = list(feature_names)
+        self.n_components = n_components
+        self.moments = moments
+        self.model = CovariancePCAModel(n_components).fit_moments(moments)
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, feature_names: List[str], n_components: int) -> 'IncrementalPCAState':
+        """Start a state from an initial, already imputed block of raw values."""
+        return cls(feature_names, min(n_components, len(feature_names)), chunk_moments(values))
+
+    def extract(self, data: pd.DataFrame) -> np.ndarray:
+        """Pull the state's features out of new rows, imputing gaps with the running means."""
+        missing = [col for col in self.feature_names if col not in data.columns]
+        if missing:
+            raise ValueError(f"New rows are missing model features: {', '.join(missing)}")
+        values = np.empty((data.shape[0], len(self.feature_names)), dtype=np.float64, order='F')
+        for j, col in enumerate(self.feature_names):
+            values[:, j] = pd.to_numeric(data[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        values[~np.isfinite(values)] = np.nan
+        rows, cols = np.nonzero(np.isnan(values))
+        values[rows, cols] = self.moments[1][cols]
+        return values
+
+    def update(self, values: np.ndarray) -> Dict[str, Any]:
+        """Absorb new rows, refit, keep component signs continuous and report the drift."""
+        previous = self.model
+        self.moments = merge_moments(self.moments, chunk_moments(values))
+        self.model = CovariancePCAModel(self.n_components).fit_moments(self.moments)
+
+        # Keep each component pointing the same way as before so loadings stay comparable
+        signs = np.sign(np.sum(self.model.components_ * previous.components_, axis=1))
+        signs[signs == 0] = 1.0
+        self.model.components_ *= signs[:, np.newaxis]
+
+        return component_drift(previous.components_, self.model.components_,
+                               previous.explained_variance_ratio_, self.model.explained_variance_ratio_)
+
+    def save(self, path: str):
+        """Persist the moments and fitted components atomically."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        n, mean, comoment = self.moments
+        meta = {'version': STATE_VERSION, 'feature_names': self.feature_names,
+                'n_components': self.n_components, 'n_samples': int(n)}
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            np.savez(file, meta=np.array(json.dumps(meta)), mean=mean, comoment=comoment,
+                     components=self.model.components_)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'IncrementalPCAState':
+        """Restore a saved state, including the component signs it was saved with."""
+        with np.load(path, allow_pickle=False) as stored:
+            meta = json.loads(str(stored['meta']))
+            if meta.get('version') != STATE_VERSION:
+                raise ValueError(f"Unsupported incremental state version: {meta.get('version')}")
+            state = cls(meta['feature_names'], meta['n_components'],
+                        (meta['n_samples'], stored['mean'], stored['comoment']))
+            signs = np.sign(np.sum(state.model.components_ * stored['components'], axis=1))
+        signs[signs == 0] = 1.0
+        state.model.components_ *= signs[:, np.newaxis]
+        return state
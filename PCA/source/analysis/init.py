@@ -3,5 +3,7 @@ Analysis components for PCA
 """
 
 from .pca import PCAAnalyzer
+from .covariance import CovariancePCAModel, fit_covariance_pca
+from .preprocessing import PreprocessingPipeline
 
-__all__ = ['PCAAnalyzer']
\ No newline at end of file
+__all__ = ['PCAAnalyzer', 'CovariancePCAModel', 'fit_covariance_pca', 'PreprocessingPipeline']
\ No newline at end of file
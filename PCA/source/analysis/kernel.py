@@ -0,0 +1,99 @@
+from typing import Dict, Any, Optional
+
+import numpy as np
+from sklearn.decomposition import PCA
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+
+
+KERNEL_APPROXIMATIONS = ('nystroem', 'rff')
+DEFAULT_LANDMARKS = 500
+
+
+class KernelPCAModel:
+    """Approximate kernel PCA: linear PCA on an explicit low-rank kernel feature map.
+
+    The Nystroem map (or random Fourier features for the RBF kernel) has
+    n_landmarks dimensions, so fitting and transforming are linear in the number of
+    samples. components_ holds pseudo-loadings (correlation of each input feature
+    with each kernel component), since kernel components have no input-space axes.
+    is_kernel marks the model so loading-based tools (biplots, bootstrap intervals,
+    projector export) refuse it instead of treating it as a linear PCA.
+    """
+
+    is_kernel = True
+
+    def __init__(self, n_components: int, kernel: str = 'rbf', gamma: Optional[float] = None,
+                 n_landmarks: int = DEFAULT_LANDMARKS, approximation: str = 'nystroem'):
+        if approximation not in KERNEL_APPROXIMATIONS:
+            raise ValueError(f"Unsupported kernel approximation: {approximation}. "
+                             f"Choose from {', '.join(KERNEL_APPROXIMATIONS)}")
+        if approximation == 'rff' and kernel != 'rbf':
+            raise ValueError("Random Fourier features only approximate the 'rbf' kernel.")
+        self.n_components = n_components
+        self.n_components_ = n_components
+        self.kernel = kernel
+        self.gamma = gamma
+        self.n_landmarks = n_landmarks
+        self.approximation = approximation
+        self.feature_map = None
+        self.pca = None
+        self.components_ = None
+        self.explained_variance_ = None
+        self.explained_variance_ratio_ = None
+        self.singular_values_ = None
+        self.mean_ = None
+        self.n_features_in_ = None
+
+    def fit_transform(self, data: np.ndarray, svd_solver: str = 'auto') -> np.ndarray:
+        """Fit the feature map and the PCA on it; return the kernel component scores."""
+        n_samples, n_features = data.shape
+        gamma = self.gamma if self.gamma is not None else 1.0 / n_features
+        n_landmarks = min(self.n_landmarks, n_samples)
+        if self.approximation == 'nystroem':
+            self.feature_map = Nystroem(kernel=self.kernel, gamma=gamma, n_components=n_landmarks, random_state=42)
+        else:
+            self.feature_map = RBFSampler(gamma=gamma, n_components=n_landmarks, random_state=42)
+        mapped = self.feature_map.fit_transform(data)
+
+        n_components = min(self.n_components, mapped.shape[1])
+        self.pca = PCA(n_components=n_components, svd_solver=svd_solver, random_state=42)
+        scores = self.pca.fit_transform(mapped)
+
+        self.n_components_ = n_components
+        self.explained_variance_ = self.pca.explained_variance_
+        self.explained_variance_ratio_ = self.pca.explained_variance_ratio_
+        self.singular_values_ = self.pca.singular_values_
+        self.mean_ = np.zeros(n_features)
+        self.n_features_in_ = n_features
+        self.components_ = self.pseudo_loadings(data, scores)
+        return scores
+
+    @staticmethod
+    def pseudo_loadings(data: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        """Pearson correlation of every input feature with every score column (components x features)."""
+        centered = data - data.mean(axis=0)
+        covariance = scores.T @ centered / data.shape[0]
+        feature_std = centered.std(axis=0)
+        score_std = scores.std(axis=0)
+        denominator = np.outer(score_std, feature_std)
+        return np.divide(covariance, denominator, out=np.zeros_like(covariance), where=denominator > 0)
+
+    def transform(self, data) -> np.ndarray:
+        """Project standardized data onto the kernel components."""
+        return self.pca.transform(self.feature_map.transform(np.asarray(data)))
+
+
+def fit_kernel_pca(
+        data: np.ndarray,
+        n_components: int,
+        kernel: str = 'rbf',
+        gamma: Optional[float] = None,
+        n_landmarks: int = DEFAULT_LANDMARKS,
+        approximation: str = 'nystroem',
+        svd_solver: str = 'auto'
+) -> Dict[str, Any]:
+    """Fit approximate kernel PCA on standardized data."""
+    model = KernelPCAModel(n_components, kernel=kernel, gamma=gamma, n_landmarks=n_landmarks,
+                           approximation=approximation)
+    transformed = model.fit_transform(np.asarray(data), svd_solver=svd_solver)
+    return {'model': model, 'transformed_data': transformed}
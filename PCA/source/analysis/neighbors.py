@@ -0,0 +1,71 @@
+from typing import Dict, Any, Optional, Sequence
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+
+DEFAULT_NEIGHBORS = 5
+
+
+class SampleIndex:
+    """KD-tree over PCA scores for nearest-sample queries by sample ID.
+
+    Queries cost O(log n) instead of a linear scan. A second tree over the first two
+    components resolves clicks on a PC1/PC2 scatter to the nearest plotted sample.
+    """
+
+    def __init__(self, scores: np.ndarray, sample_ids: Optional[Sequence] = None, model=None, leaf_size: int = 40):
+        self.scores = np.ascontiguousarray(scores, dtype=np.float64)
+        self.sample_ids = np.asarray(sample_ids if sample_ids is not None else np.arange(self.scores.shape[0]))
+        if self.sample_ids.shape[0] != self.scores.shape[0]:
+            raise ValueError("Number of sample IDs does not match the number of samples.")
+        self.model = model  # The model the scores came from; a different model needs a new index
+
+        self.row_of = {}
+        for row, sample_id in enumerate(self.sample_ids.tolist()):
+            self.row_of.setdefault(sample_id, row)  # Duplicate IDs resolve to their first row
+        self.tree = KDTree(self.scores, leaf_size=leaf_size)
+        self.plane_tree = KDTree(self.scores[:, :2], leaf_size=leaf_size) if self.scores.shape[1] >= 2 else self.tree
+
+    def row(self, sample_id) -> int:
+        """Row position of a sample ID."""
+        if sample_id not in self.row_of:
+            raise ValueError(f"Sample '{sample_id}' not found.")
+        return self.row_of[sample_id]
+
+    def locate(self, x: float, y: float) -> int:
+        """Row of the sample plotted closest to (x, y) in the PC1/PC2 plane."""
+        _, rows = self.plane_tree.query(np.array([[x, y]]), k=1)
+        return int(rows[0, 0])
+
+    def _results(self, row: int, rows: np.ndarray, distances: np.ndarray) -> Dict[str, Any]:
+        keep = rows != row  # Never report a sample as its own neighbour
+        rows, distances = rows[keep], distances[keep]
+        return {
+            'sample_id': self.sample_ids[row],
+            'row': row,
+            'neighbor_ids': self.sample_ids[rows],
+            'neighbor_rows': rows,
+            'distances': distances
+        }
+
+    def knn(self, sample_id=None, k: int = DEFAULT_NEIGHBORS, row: Optional[int] = None) -> Dict[str, Any]:
+        """The k samples closest to a sample in the full component space."""
+        if k <= 0:
+            raise ValueError("Number of neighbours must be greater than 0.")
+        row = self.row(sample_id) if row is None else row
+        # Ask for one extra so k remain after the query sample itself is removed
+        distances, rows = self.tree.query(self.scores[row:row + 1], k=min(k + 1, self.scores.shape[0]))
+        results = self._results(row, rows[0], distances[0])
+        for key in ('neighbor_ids', 'neighbor_rows', 'distances'):
+            results[key] = results[key][:k]
+        return results
+
+    def radius(self, sample_id=None, radius: float = 1.0, row: Optional[int] = None) -> Dict[str, Any]:
+        """All samples within radius of a sample in the full component space, nearest first."""
+        if radius <= 0:
+            raise ValueError("Radius must be greater than 0.")
+        row = self.row(sample_id) if row is None else row
+        rows, distances = self.tree.query_radius(self.scores[row:row + 1], r=radius,
+                                                 return_distance=True, sort_results=True)
+        return self._results(row, rows[0], distances[0])
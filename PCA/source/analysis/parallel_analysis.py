@@ -0,0 +1,78 @@
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from source.utils.parallel import map_tasks, resolve_n_jobs, split_blocks, worker_context
+
+DEFAULT_PERMUTATIONS = 100
+DEFAULT_PERCENTILE = 95
+
+
+def covariance_eigenvalues(data: np.ndarray) -> np.ndarray:
+    """Eigenvalues (descending, ddof=1) of the covariance of a column-centered matrix."""
+    return np.linalg.eigvalsh(data.T @ data / (data.shape[0] - 1))[::-1]
+
+
+def permutation_block(
+        permutation_ids: List[int],
+        random_state: int,
+        data: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Eigenvalues of independently column-shuffled copies of the data."""
+    data = worker_context()['data'] if data is None else data
+    eigenvalues = np.empty((len(permutation_ids), data.shape[1]))
+    for i, permutation_id in enumerate(permutation_ids):
+        rng = np.random.default_rng([random_state, permutation_id])
+        # Shuffling each column on its own keeps the marginals but destroys correlations
+        eigenvalues[i] = covariance_eigenvalues(rng.permuted(data, axis=0))
+    return eigenvalues
+
+
+def parallel_analysis(
+        data: np.ndarray,
+        n_permutations: int = DEFAULT_PERMUTATIONS,
+        percentile: float = DEFAULT_PERCENTILE,
+        n_jobs: Optional[int] = None,
+        random_state: int = 42
+) -> Dict[str, Any]:
+    """Horn's parallel analysis: keep components whose eigenvalue beats the permutation null.
+
+    Column shuffles preserve every column's mean and variance, so the null eigenvalues
+    share the observed total variance and ratios are directly comparable.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if n_permutations <= 0:
+        raise ValueError("Number of permutations must be greater than 0.")
+    if not 0 < percentile < 100:
+        raise ValueError("Percentile must be between 0 and 100.")
+    if data.shape[0] < 2:
+        raise ValueError("Parallel analysis needs at least two samples.")
+
+    data = data - data.mean(axis=0)
+    observed = covariance_eigenvalues(data)
+    total_variance = observed.sum()
+
+    n_jobs = resolve_n_jobs(n_jobs, n_permutations)
+    tasks = [(block, random_state) for block in split_blocks(n_permutations, n_jobs)]
+    null = np.vstack(map_tasks(permutation_block, tasks, n_jobs=n_jobs, context={'data': data}))
+
+    null_upper = np.percentile(null, percentile, axis=0)
+    null_lower = np.percentile(null, 100 - percentile, axis=0)
+
+    # Retain the leading run of components that beat the null; stop at the first failure
+    beats_null = observed > null_upper
+    suggested = int(np.argmin(beats_null)) if not beats_null.all() else len(observed)
+
+    return {
+        'observed': observed,
+        'null_mean': null.mean(axis=0),
+        'null_lower': null_lower,
+        'null_upper': null_upper,
+        'observed_ratio': observed / total_variance,
+        'null_mean_ratio': null.mean(axis=0) / total_variance,
+        'null_lower_ratio': null_lower / total_variance,
+        'null_upper_ratio': null_upper / total_variance,
+        'suggested_n_components': max(suggested, 1),
+        'n_permutations': n_permutations,
+        'percentile': percentile
+    }
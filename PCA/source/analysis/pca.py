@@ -1,22 +1,72 @@
 import numpy as np
 import pandas as pd
-from sklearn.decomposition import PCA
+from sklearn.decomposition import PCA, IncrementalPCA
 from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
+from sklearn.cluster import DBSCAN, HDBSCAN, Birch, KMeans, MiniBatchKMeans
+from sklearn.neighbors import KDTree
 from scipy.cluster.hierarchy import linkage, fcluster
+from scipy.linalg import subspace_angles
 import numpy as np
 from typing import Dict, Any, Optional, List, Tuple
+import functools
+import os
+import time
 import traceback
 
+from source.analysis.bootstrap import DEFAULT_REPLICATES, bootstrap_loadings
+from source.analysis.cluster_sweep import DEFAULT_SILHOUETTE_SAMPLE, k_sweep
+from source.analysis.cache import AnalysisCache, pack_model, restore_model
+from source.analysis.consensus import DEFAULT_CONSENSUS_NEIGHBORS, DEFAULT_RESAMPLES, DEFAULT_SUBSAMPLE, consensus_clustering
+from source.analysis.covariance import DEFAULT_CHUNK_ROWS, CovariancePCAModel, fit_covariance_pca
+from source.analysis.group_pca import group_pca
+from source.analysis.incremental import IncrementalPCAState
+from source.analysis.kernel import fit_kernel_pca
+from source.analysis.hierarchical import weighted_ward_linkage
+from source.analysis.parallel_analysis import DEFAULT_PERCENTILE, DEFAULT_PERMUTATIONS, parallel_analysis
+from source.analysis.neighbors import DEFAULT_NEIGHBORS, SampleIndex
+from source.analysis.preprocessing import PreprocessingPipeline
+from source.analysis.projector import save_projector
+from source.analysis.solver import SVD_SOLVERS, resolve_svd_solver, select_svd_solver
+from source.analysis.windowed import DEFAULT_ORDER_BY, windowed_pca
+from source.utils.file_operations import DEFAULT_CHUNKSIZE, detect_encoding, iter_csv_chunks
+
+
+PCA_ENGINES = ('sklearn', 'covariance', 'kernel')
+PRECISIONS = {'float64': np.float64, 'float32': np.float32}
+DEFAULT_BATCH_SIZE = 1024  # Samples per mini-batch k-means update
+DEFAULT_MICRO_CLUSTERS = 1000  # Summaries fed to ward linkage in scalable hierarchical mode
+SCALABLE_HIERARCHICAL_THRESHOLD = 20000  # Above this many samples exact ward linkage is too costly
+DENSITY_ALGORITHMS = ('dbscan', 'hdbscan')
+DEFAULT_MIN_SAMPLES = 10  # Neighbours (including the point itself) that make a core point
+NOISE_LABEL = -1
+# Models whose scores are (standardized - mean_) @ components_.T and can be exported as a projector
+LINEAR_MODELS = (PCA, IncrementalPCA, CovariancePCAModel)
+CONSENSUS_ALGORITHMS = ('k-means', 'mini-batch k-means', 'hierarchical', 'hierarchical (scalable)')
+
 
 class PCAAnalyzer:
     """Core PCA analysis functionality separate from GUI."""
 
-    def __init__(self):
+    def __init__(self, precision: str = 'float64'):
         self.pca_model = None
         self.standardized_data = None
         self.feature_groups = None
         self.x_standardized = None
+        self.scaler = None
+        self.scaler_mean = None
+        self.scaler_scale = None
+        self.feature_names = None
+        self.preprocessing_report = None
+        self.incremental_state = None
+        self.sample_index = None
+        self.set_precision(precision)
+
+    def set_precision(self, precision: str):
+        """Select float64 (default) or float32 compute for preprocessing, PCA and stored scores."""
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unsupported precision: {precision}. Choose from {', '.join(PRECISIONS)}")
+        self.precision = precision
+        self.dtype = PRECISIONS[precision]
 
     def prepare_data(
             self,
@@ -43,46 +93,27 @@ class PCAAnalyzer:
         return working_data, missing_columns if drop_columns else []
 
     def validate_numeric_data(self, data: pd.DataFrame) -> pd.DataFrame:
-        """Extract and validate numeric data with detailed checks."""
-        # Select numeric data
-        numeric_data = data.select_dtypes(include=[np.number])
-
-        # Identify and log non-numeric columns
-        removed_columns = data.columns.difference(numeric_data.columns)
-        if not removed_columns.empty:
-            print(f"Non-numeric columns excluded: {list(removed_columns)}")
-
-        # Check if numeric data is empty
-        if numeric_data.empty:
-            raise ValueError("No numerical data available for PCA")
-
-        # Replace inf values with NaN
-        if np.any(np.isinf(numeric_data.values)):
-            numeric_data = numeric_data.replace([np.inf, -np.inf], np.nan)
-
-        return numeric_data
+        """Numeric columns of data with inf replaced by NaN (the pipeline's numeric stages)."""
+        pipeline = PreprocessingPipeline(impute_strategy=None, scale=False, dtype=self.dtype)
+        preprocessed = pipeline.fit_transform(data)
+        return pd.DataFrame(preprocessed['data'], columns=preprocessed['feature_names'], index=data.index, copy=False)
 
     def standardize_data(self, data: pd.DataFrame) -> pd.DataFrame:
-        """Standardize the data for PCA with detailed tracking."""
-        print(f"Data shape before standardization: {data.shape}")  # Debug info
-
-
-
-
-        scaler = StandardScaler()
-        standardized = pd.DataFrame(
-            scaler.fit_transform(data),
-            columns=data.columns
-        )
+        """Standardize numeric data for PCA and keep the scaler statistics (NaN is ignored, as in StandardScaler)."""
+        pipeline = PreprocessingPipeline(impute_strategy=None, dtype=self.dtype)
+        preprocessed = pipeline.fit_transform(data)
+        standardized = pipeline.to_frame(preprocessed)
         self.standardized_data = standardized
-        self.x_standardized = standardized  # Keep original attribute
-
-
-
-        print(f"Data shape after standardization: {standardized.shape}")  # Debug info
+        self.x_standardized = standardized
+        self.scaler_mean = preprocessed['mean']
+        self.scaler_scale = preprocessed['scale']
         return standardized
 
-    def run_pca(self, data: pd.DataFrame, n_components: int) -> Dict[str, Any]:
+    def select_svd_solver(self, n_samples: int, n_features: int, n_components: int) -> str:
+        """Pick the cheapest exact-enough PCA solver for the data shape."""
+        return select_svd_solver(n_samples, n_features, n_components)
+
+    def run_pca(self, data: pd.DataFrame, n_components: int, svd_solver: str = 'auto') -> Dict[str, Any]:
         """Run PCA analysis with detailed validation and debugging."""
         # Validate components and data
         print(f"\nDEBUG INFO BEFORE PCA:")
@@ -96,9 +127,12 @@ class PCAAnalyzer:
             n_components = max_components
             print(f"Capping components to {max_components}.")
 
+        svd_solver = resolve_svd_solver(svd_solver, data.shape[0], data.shape[1], n_components)
+        print(f"SVD solver: {svd_solver}")
+
         # PCA Execution with detailed tracking
         print("\nStarting PCA fit...")
-        self.pca_model = PCA(n_components=n_components)
+        self.pca_model = PCA(n_components=n_components, svd_solver=svd_solver, random_state=42)
         print("PCA model initialized")
 
         transformed_data = self.pca_model.fit_transform(data)
@@ -119,40 +153,207 @@ class PCAAnalyzer:
             'feature_names': data.columns.tolist(),
             'n_components': n_components,
             'max_components': max_components,
-            'data_shape': data.shape
+            'data_shape': data.shape,
+            'svd_solver': svd_solver
+        }
+
+    def run_covariance_pca(
+            self,
+            data: pd.DataFrame,
+            n_components: int,
+            n_jobs: Optional[int] = None,
+            chunk_rows: int = DEFAULT_CHUNK_ROWS
+    ) -> Dict[str, Any]:
+        """Exact one-pass PCA on raw numeric data from parallel per-chunk moments."""
+        print(f"\nDEBUG INFO BEFORE COVARIANCE PCA:")
+        print(f"Data shape before PCA: {data.shape}")
+
+        max_components = data.shape[1]
+        if n_components > max_components:
+            n_components = max_components
+            print(f"Capping components to {max_components}.")
+
+        fitted = fit_covariance_pca(data.to_numpy(dtype=self.dtype), n_components, n_jobs=n_jobs, chunk_rows=chunk_rows)
+        self.pca_model = fitted['model']
+        standardized = pd.DataFrame(fitted['standardized'], columns=data.columns)
+        self.standardized_data = standardized
+        self.x_standardized = standardized
+        self.scaler_mean = self.pca_model.scaler_mean_
+        self.scaler_scale = self.pca_model.scaler_scale_
+        print(f"Explained variance ratios: {self.pca_model.explained_variance_ratio_}")
+
+        return {
+            'model': self.pca_model,
+            'transformed_data': fitted['transformed_data'],
+            'components': self.pca_model.components_,
+            'explained_variance': self.pca_model.explained_variance_ratio_,
+            'loadings': self.pca_model.components_.T,
+            'feature_names': data.columns.tolist(),
+            'n_components': n_components,
+            'max_components': max_components,
+            'data_shape': data.shape,
+            'svd_solver': 'covariance (parallel moments)'
+        }
+
+    def run_kernel_pca(
+            self,
+            data: pd.DataFrame,
+            n_components: int,
+            kernel_params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Approximate (Nystroem / random Fourier feature) kernel PCA on standardized data."""
+        kernel_params = kernel_params or {}
+        print(f"\nDEBUG INFO BEFORE KERNEL PCA:")
+        print(f"Data shape before PCA: {data.shape}")
+        print(f"Kernel parameters: {kernel_params}")
+
+        fitted = fit_kernel_pca(data.to_numpy(), n_components, **kernel_params)
+        self.pca_model = fitted['model']
+        n_components = self.pca_model.n_components_
+        print(f"Explained variance ratios (kernel feature space): {self.pca_model.explained_variance_ratio_}")
+
+        return {
+            'model': self.pca_model,
+            'transformed_data': fitted['transformed_data'],
+            'components': self.pca_model.components_,
+            'explained_variance': self.pca_model.explained_variance_ratio_,
+            'loadings': self.pca_model.components_.T,
+            'feature_names': data.columns.tolist(),
+            'n_components': n_components,
+            'max_components': self.pca_model.feature_map.n_components,
+            'data_shape': data.shape,
+            'svd_solver': f"kernel ({self.pca_model.approximation}, {self.pca_model.kernel})"
         }
 
+    def restore_cached_results(self, entry: Dict[str, Any], standardized: pd.DataFrame) -> Dict[str, Any]:
+        """Rebuild model and results from a cache entry for already standardized data."""
+        meta = entry['meta']
+        self.pca_model = restore_model(entry)
+        self.standardized_data = standardized
+        self.x_standardized = standardized
+        self.scaler_mean = entry['scaler_mean']
+        self.scaler_scale = entry['scaler_scale']
+        print("PCA results loaded from cache")
+
+        return {
+            'model': self.pca_model,
+            'transformed_data': entry['transformed_data'],
+            'components': self.pca_model.components_,
+            'explained_variance': self.pca_model.explained_variance_ratio_,
+            'loadings': self.pca_model.components_.T,
+            'feature_names': meta['feature_names'],
+            'n_components': meta['n_components'],
+            'max_components': meta['max_components'],
+            'data_shape': tuple(meta['data_shape']),
+            'svd_solver': meta['svd_solver']
+        }
+
+    def store_cached_results(self, cache: AnalysisCache, key: str, results: Dict[str, Any]):
+        """Persist model arrays, scores and explained variance for later runs."""
+        model = results['model']
+        arrays = pack_model(model, self.scaler_mean, self.scaler_scale)
+        arrays['transformed_data'] = results['transformed_data']
+        feature_names_in = getattr(model, 'feature_names_in_', None)
+        meta = {
+            'model_type': type(model).__name__,
+            'feature_names': [str(name) for name in results['feature_names']],
+            'feature_names_in': None if feature_names_in is None else list(feature_names_in),
+            'n_components': results['n_components'],
+            'max_components': results['max_components'],
+            'data_shape': list(results['data_shape']),
+            'svd_solver': results['svd_solver']
+        }
+        try:
+            cache.save(key, arrays, meta)
+        except OSError as e:
+            print(f"Could not write PCA cache entry: {e}")
+
     def analyze(
             self,
             data: pd.DataFrame,
             n_components: int,
             drop_columns: Optional[List[str]] = None,
-            default_columns_to_drop: Optional[List[str]] = None
+            default_columns_to_drop: Optional[List[str]] = None,
+            svd_solver: str = 'auto',
+            engine: str = 'sklearn',
+            n_jobs: Optional[int] = None,
+            cache: Optional[AnalysisCache] = None,
+            impute_strategy: Optional[str] = None,
+            kernel_params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Complete PCA analysis pipeline with comprehensive error handling."""
+        """Complete PCA analysis pipeline with comprehensive error handling.
+
+        Missing values raise unless impute_strategy ('mean', 'median' or 'zero') is given.
+        """
         try:
-            # Prepare and validate data
-            prepared_data, missing_columns = self.prepare_data(
-                data,
+            if engine not in PCA_ENGINES:
+                raise ValueError(f"Unsupported PCA engine: {engine}. Choose from {', '.join(PCA_ENGINES)}")
+
+            # Drop -> numeric -> inf/NaN -> impute -> scale in one pass over a single float array.
+            # The covariance engine derives its scaling from the merged moments instead.
+            pipeline = PreprocessingPipeline(
                 drop_columns=drop_columns,
-                default_columns_to_drop=default_columns_to_drop
+                default_columns_to_drop=default_columns_to_drop,
+                impute_strategy=impute_strategy,
+                scale=(engine != 'covariance'),
+                dtype=self.dtype
             )
+            preprocessed = pipeline.fit_transform(data)
+            if impute_strategy is None and preprocessed['nan_count']:
+                raise ValueError(f"Data contains {preprocessed['nan_count']} missing or infinite values; "
+                                 f"clean the data or pass impute_strategy to impute them")
+            self.preprocessing_report = preprocessed['stage_bytes']
+            values = preprocessed['data']
 
-            # Process numeric data
-            numeric_data = self.validate_numeric_data(prepared_data)
+            cache_key = None
+            cached_entry = None
+            if engine == 'kernel':
+                cache = None  # Kernel feature maps are not part of the cache format
+            if cache is not None:
+                cache_key = cache.make_key(
+                    values,
+                    feature_names=preprocessed['feature_names'],
+                    n_components=n_components,
+                    drop_columns=drop_columns,
+                    default_columns_to_drop=default_columns_to_drop,
+                    impute_strategy=impute_strategy,
+                    svd_solver=svd_solver,
+                    engine=engine
+                )
+                cached_entry = cache.load(cache_key)
 
-            # Standardize
-            standardized_data = self.standardize_data(numeric_data)
+            if cached_entry is not None:
+                if not pipeline.scale:
+                    # Pipeline output is ours to modify, so scale it in place
+                    values -= cached_entry['scaler_mean']
+                    values /= cached_entry['scaler_scale']
+                results = self.restore_cached_results(cached_entry, pipeline.to_frame(preprocessed))
+            elif engine == 'covariance':
+                results = self.run_covariance_pca(pipeline.to_frame(preprocessed), n_components, n_jobs=n_jobs)
+            else:
+                standardized = pipeline.to_frame(preprocessed)
+                self.standardized_data = standardized
+                self.x_standardized = standardized
+                self.scaler_mean = preprocessed['mean']
+                self.scaler_scale = preprocessed['scale']
+                if engine == 'kernel':
+                    results = self.run_kernel_pca(standardized, n_components, kernel_params=kernel_params)
+                else:
+                    results = self.run_pca(standardized, n_components, svd_solver=svd_solver)
+            standardized_data = self.standardized_data
 
-            # Run PCA
-            results = self.run_pca(standardized_data, n_components)
+            if cache is not None and cached_entry is None:
+                self.store_cached_results(cache, cache_key, results)
 
             # Add additional context to results
             results.update({
-                'missing_columns': missing_columns,
+                'missing_columns': preprocessed['missing_columns'],
                 'original_shape': data.shape,
-                'prepared_shape': prepared_data.shape,
-                'standardized_shape': standardized_data.shape
+                'prepared_shape': preprocessed['prepared_shape'],
+                'standardized_shape': standardized_data.shape,
+                'cache_hit': cached_entry is not None,
+                'precision': self.precision,
+                'preprocessing_bytes': preprocessed['stage_bytes']
             })
 
             return results
@@ -161,12 +362,450 @@ class PCAAnalyzer:
             traceback.print_exc()  # Keep detailed error tracking
             raise Exception(f"PCA analysis failed: {str(e)}")
 
+    def resolve_stream_columns(
+            self,
+            first_chunk: pd.DataFrame,
+            drop_columns: Optional[List[str]] = None,
+            default_columns_to_drop: Optional[List[str]] = None
+    ) -> List[str]:
+        """Apply the prepare/numeric rules to the first chunk to fix the feature columns."""
+        prepared_chunk, _ = self.prepare_data(
+            first_chunk,
+            drop_columns=drop_columns,
+            default_columns_to_drop=default_columns_to_drop
+        )
+        numeric_columns = prepared_chunk.select_dtypes(include=[np.number]).columns.tolist()
+
+        removed_columns = prepared_chunk.columns.difference(numeric_columns)
+        if not removed_columns.empty:
+            print(f"Non-numeric columns excluded: {list(removed_columns)}")
+
+        if not numeric_columns:
+            raise ValueError("No numerical data available for PCA")
+
+        return numeric_columns
+
+    def iter_numeric_blocks(self, file_path: str, numeric_columns: List[str], encoding: str,
+                            chunksize: int = DEFAULT_CHUNKSIZE):
+        """Yield float blocks of the feature columns, one per CSV chunk, with inf replaced by NaN."""
+        for chunk in iter_csv_chunks(file_path, chunksize=chunksize, encoding=encoding, usecols=numeric_columns):
+            # Later chunks may hold stray text in a numeric column; coerce it to NaN.
+            # copy=True: under copy-on-write to_numpy can return a read-only view.
+            block = chunk[numeric_columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=self.dtype, copy=True)
+            block[np.isinf(block)] = np.nan
+            yield block
+
+    def analyze_streaming(
+            self,
+            file_path: str,
+            n_components: int,
+            output_path: str,
+            drop_columns: Optional[List[str]] = None,
+            default_columns_to_drop: Optional[List[str]] = None,
+            chunksize: int = DEFAULT_CHUNKSIZE
+    ) -> Dict[str, Any]:
+        """Out-of-core PCA over a chunked CSV; scores are written to output_path chunk by chunk.
+
+        The fitted scaler and model can be exported as a projector. The standardized data
+        is never held in memory, so bootstrap, parallel analysis and the nearest-sample
+        index need an in-memory analyze() run instead.
+        """
+        try:
+            encoding = detect_encoding(file_path)['encoding']
+            first_chunk = pd.read_csv(file_path, encoding=encoding, nrows=chunksize)
+            numeric_columns = self.resolve_stream_columns(
+                first_chunk,
+                drop_columns=drop_columns,
+                default_columns_to_drop=default_columns_to_drop
+            )
+            del first_chunk
+
+            max_components = len(numeric_columns)
+            if n_components > max_components:
+                n_components = max_components
+                print(f"Capping components to {max_components}.")
+
+            # Pass 1: scaler statistics (StandardScaler ignores NaN while fitting)
+            scaler = StandardScaler()
+            n_chunks = 0
+            for block in self.iter_numeric_blocks(file_path, numeric_columns, encoding, chunksize):
+                scaler.partial_fit(block)
+                n_chunks += 1
+            print(f"Scaler fitted over {n_chunks} chunks")
+
+            # Pass 2: incremental PCA. Missing values are mean-imputed, i.e. 0 after scaling.
+            # A chunk shorter than n_components is merged into the previous one before fitting.
+            self.pca_model = IncrementalPCA(n_components=n_components)
+            pending = None
+            n_samples = 0
+            for block in self.iter_numeric_blocks(file_path, numeric_columns, encoding, chunksize):
+                scaled = np.nan_to_num(scaler.transform(block), copy=False)
+                n_samples += scaled.shape[0]
+                if pending is None:
+                    pending = scaled
+                elif scaled.shape[0] < n_components:
+                    pending = np.vstack([pending, scaled])
+                else:
+                    self.pca_model.partial_fit(pending)
+                    pending = scaled
+            if pending is None or n_samples < n_components:
+                raise ValueError(f"Need at least {n_components} rows for PCA, found {n_samples}")
+            self.pca_model.partial_fit(pending)
+            del pending
+            print("Incremental PCA fit completed")
+
+            # Pass 3: project and append the scores chunk by chunk
+            score_columns = [f'PC{i + 1}' for i in range(n_components)]
+            write_header = True
+            for block in self.iter_numeric_blocks(file_path, numeric_columns, encoding, chunksize):
+                scores = self.pca_model.transform(np.nan_to_num(scaler.transform(block), copy=False))
+                pd.DataFrame(scores, columns=score_columns).to_csv(
+                    output_path,
+                    mode='w' if write_header else 'a',
+                    header=write_header,
+                    index=False
+                )
+                write_header = False
+            print(f"Scores written to {output_path}")
+
+            self.standardized_data = None
+            self.x_standardized = None
+            self.scaler_mean = scaler.mean_
+            self.scaler_scale = scaler.scale_
+            self.feature_names = numeric_columns
+
+            return {
+                'model': self.pca_model,
+                'scaler': scaler,
+                'components': self.pca_model.components_,
+                'explained_variance': self.pca_model.explained_variance_ratio_,
+                'loadings': self.pca_model.components_.T,
+                'feature_names': numeric_columns,
+                'n_components': n_components,
+                'max_components': max_components,
+                'data_shape': (n_samples, max_components),
+                'svd_solver': 'incremental',
+                'output_path': output_path,
+                'chunksize': chunksize,
+                'n_chunks': n_chunks
+            }
+
+        except Exception as e:
+            traceback.print_exc()  # Keep detailed error tracking
+            raise Exception(f"Streaming PCA analysis failed: {str(e)}")
+
+    def compare_precision(
+            self,
+            data: pd.DataFrame,
+            n_components: int,
+            drop_columns: Optional[List[str]] = None,
+            default_columns_to_drop: Optional[List[str]] = None,
+            svd_solver: str = 'auto'
+    ) -> Dict[str, Any]:
+        """Run the same analysis in float64 and float32 and report how far float32 drifts."""
+        runs = {}
+        elapsed = {}
+        for precision in PRECISIONS:
+            analyzer = PCAAnalyzer(precision=precision)
+            start = time.perf_counter()
+            runs[precision] = analyzer.analyze(
+                data,
+                n_components,
+                drop_columns=drop_columns,
+                default_columns_to_drop=default_columns_to_drop,
+                svd_solver=svd_solver
+            )
+            elapsed[precision] = time.perf_counter() - start
+
+        reference, reduced = runs['float64'], runs['float32']
+        reference_components = reference['components']
+        reduced_components = reduced['components'].astype(np.float64)
+
+        # Components are only defined up to sign; align before comparing
+        signs = np.sign(np.sum(reference_components * reduced_components, axis=1))
+        signs[signs == 0] = 1.0
+        reduced_components = reduced_components * signs[:, np.newaxis]
+        reduced_scores = reduced['transformed_data'].astype(np.float64) * signs
+        score_diff = reduced_scores - reference['transformed_data']
+
+        comparison = {
+            'explained_variance_max_diff': float(np.max(np.abs(
+                reference['explained_variance'] - reduced['explained_variance']))),
+            'components_max_diff': float(np.max(np.abs(reference_components - reduced_components))),
+            'scores_max_diff': float(np.max(np.abs(score_diff))),
+            'scores_relative_error': float(
+                np.linalg.norm(score_diff) / max(np.linalg.norm(reference['transformed_data']), np.finfo(float).tiny)),
+            'max_subspace_angle_deg': float(np.degrees(np.max(
+                subspace_angles(reference_components.T, reduced_components.T)))),
+            'preprocessing_bytes': {
+                precision: sum(run['preprocessing_bytes'].values()) for precision, run in runs.items()
+            },
+            'elapsed_seconds': elapsed
+        }
+        print(f"float32 vs float64: {comparison}")
+        return comparison
+
+    def require_standardized_data(self):
+        """Raise unless the last fit kept its standardized data in memory."""
+        if self.pca_model is None:
+            raise ValueError("Please run PCA analysis first.")
+        if self.standardized_data is None:
+            raise ValueError("Streaming PCA does not keep the standardized data in memory; "
+                             "run analyze() on the loaded data for this operation.")
+
+    def bootstrap_loadings(
+            self,
+            n_replicates: int = DEFAULT_REPLICATES,
+            confidence: float = 0.95,
+            alignment: str = 'procrustes',
+            threshold: float = 0.2,
+            n_jobs: Optional[int] = None,
+            random_state: int = 42,
+            progress_callback=None
+    ) -> Dict[str, Any]:
+        """Bootstrap confidence intervals and selection frequencies for the fitted loadings."""
+        self.require_standardized_data()
+        if getattr(self.pca_model, 'is_kernel', False):
+            raise ValueError("Kernel PCA has no input-space loadings to bootstrap.")
+
+        results = bootstrap_loadings(
+            np.asarray(self.standardized_data),
+            self.pca_model.components_.T,
+            n_replicates=n_replicates,
+            confidence=confidence,
+            alignment=alignment,
+            threshold=threshold,
+            n_jobs=n_jobs,
+            random_state=random_state,
+            progress_callback=progress_callback
+        )
+        results['feature_names'] = list(getattr(self.standardized_data, 'columns', range(results['reference'].shape[0])))
+        print(f"Bootstrapped loadings with {n_replicates} replicates ({alignment} alignment)")
+        return results
+
+    def parallel_analysis(
+            self,
+            data: Optional[pd.DataFrame] = None,
+            drop_columns: Optional[List[str]] = None,
+            default_columns_to_drop: Optional[List[str]] = None,
+            n_permutations: int = DEFAULT_PERMUTATIONS,
+            percentile: float = DEFAULT_PERCENTILE,
+            n_jobs: Optional[int] = None,
+            random_state: int = 42
+    ) -> Dict[str, Any]:
+        """Suggest n_components with Horn's parallel analysis.
+
+        Uses the standardized data of the last analysis, or preprocesses data when given
+        so the suggestion is available before the first PCA run.
+        """
+        if data is not None:
+            pipeline = PreprocessingPipeline(
+                drop_columns=drop_columns,
+                default_columns_to_drop=default_columns_to_drop,
+                dtype=self.dtype
+            )
+            values = pipeline.fit_transform(data)['data']
+        elif self.standardized_data is not None:
+            values = np.asarray(self.standardized_data)
+        elif self.pca_model is not None:
+            self.require_standardized_data()
+        else:
+            raise ValueError("Please load data or run PCA analysis first.")
+
+        results = parallel_analysis(
+            values,
+            n_permutations=n_permutations,
+            percentile=percentile,
+            n_jobs=n_jobs,
+            random_state=random_state
+        )
+        print(f"Parallel analysis suggests {results['suggested_n_components']} components "
+              f"({n_permutations} permutations, {percentile}th percentile)")
+        return results
+
+    def analyze_by_group(
+            self,
+            data: pd.DataFrame,
+            group_by,
+            n_components: int,
+            drop_columns: Optional[List[str]] = None,
+            default_columns_to_drop: Optional[List[str]] = None,
+            impute_strategy: Optional[str] = 'mean',
+            svd_solver: str = 'auto',
+            n_jobs: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Fit a separate, sign-aligned PCA for each group (e.g. per BBCH stage, Site or Year)."""
+        group_by = [group_by] if isinstance(group_by, str) else list(group_by)
+        if not group_by:
+            raise ValueError("Specify at least one column to group by.")
+        if svd_solver not in SVD_SOLVERS:
+            raise ValueError(f"Unsupported SVD solver: {svd_solver}. Choose from {', '.join(SVD_SOLVERS)}")
+
+        return group_pca(
+            data,
+            group_by,
+            n_components,
+            drop_columns=drop_columns,
+            default_columns_to_drop=default_columns_to_drop,
+            impute_strategy=impute_strategy,
+            svd_solver=svd_solver,
+            n_jobs=n_jobs,
+            dtype=self.dtype
+        )
+
+    def incremental_results(self, values: np.ndarray, drift: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Project a batch of raw rows with the incremental model and build the usual results dict."""
+        state = self.incremental_state
+        model = state.model
+        standardized = model.standardize(values).astype(self.dtype, copy=False)
+        self.pca_model = model
+        self.scaler_mean = model.scaler_mean_
+        self.scaler_scale = model.scaler_scale_
+        self.standardized_data = pd.DataFrame(standardized, columns=state.feature_names, copy=False)
+        self.x_standardized = self.standardized_data
+
+        return {
+            'model': model,
+            'transformed_data': model.transform(standardized),
+            'components': model.components_,
+            'explained_variance': model.explained_variance_ratio_,
+            'loadings': model.components_.T,
+            'feature_names': state.feature_names,
+            'n_components': state.n_components,
+            'n_samples': int(state.moments[0]),
+            'n_new_rows': values.shape[0],
+            'drift': drift,
+            'svd_solver': 'incremental (running moments)'
+        }
+
+    def start_incremental(
+            self,
+            data: pd.DataFrame,
+            n_components: int,
+            drop_columns: Optional[List[str]] = None,
+            default_columns_to_drop: Optional[List[str]] = None,
+            state_path: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Fit the initial model of an incremental series and optionally persist its state."""
+        pipeline = PreprocessingPipeline(
+            drop_columns=drop_columns,
+            default_columns_to_drop=default_columns_to_drop,
+            scale=False
+        )
+        preprocessed = pipeline.fit_transform(data)
+        values = preprocessed['data']
+        self.incremental_state = IncrementalPCAState.from_values(values, preprocessed['feature_names'], n_components)
+        if state_path:
+            self.incremental_state.save(state_path)
+            print(f"Incremental PCA state saved to {state_path}")
+        return self.incremental_results(values, drift=None)
+
+    def update_incremental(self, new_data: pd.DataFrame, state_path: Optional[str] = None) -> Dict[str, Any]:
+        """Absorb new rows into the running model in time proportional to the new rows only.
+
+        The state is loaded from state_path when none is in memory and saved back after
+        the update. Missing values in the new rows are filled with the running means.
+        """
+        if self.incremental_state is None:
+            if not state_path or not os.path.exists(state_path):
+                raise ValueError("No incremental model to update. Call start_incremental first.")
+            self.incremental_state = IncrementalPCAState.load(state_path)
+
+        values = self.incremental_state.extract(new_data)
+        if values.shape[0] == 0:
+            raise ValueError("No new rows to absorb.")
+        drift = self.incremental_state.update(values)
+        print(f"Absorbed {values.shape[0]} rows; components moved by at most "
+              f"{drift['max_subspace_angle_deg']:.3f} degrees")
+
+        if state_path:
+            self.incremental_state.save(state_path)
+        return self.incremental_results(values, drift=drift)
+
+    def get_sample_index(self, sample_ids=None) -> SampleIndex:
+        """KD-tree over the current scores; rebuilt only when the model or sample IDs change."""
+        self.require_standardized_data()
+
+        index = self.sample_index
+        ids_changed = sample_ids is not None and (
+            index is None or len(sample_ids) != len(index.sample_ids)
+            or not np.array_equal(np.asarray(sample_ids), index.sample_ids))
+        if index is None or index.model is not self.pca_model or ids_changed:
+            scores = self.pca_model.transform(self.standardized_data)
+            self.sample_index = SampleIndex(scores, sample_ids=sample_ids, model=self.pca_model)
+            print(f"Built nearest-sample index over {scores.shape[0]} samples")
+        return self.sample_index
+
+    def find_similar_samples(
+            self,
+            sample_id,
+            k: int = DEFAULT_NEIGHBORS,
+            radius: Optional[float] = None,
+            sample_ids=None
+    ) -> Dict[str, Any]:
+        """Samples nearest to sample_id in PCA space: the k nearest, or all within radius."""
+        index = self.get_sample_index(sample_ids)
+        if radius is not None:
+            return index.radius(sample_id, radius)
+        return index.knn(sample_id, k)
+
+    def export_projector(self, path: str):
+        """Save scaler statistics, components and feature order for the standalone projector."""
+        if self.pca_model is None or self.scaler_mean is None:
+            raise ValueError("Please run PCA analysis first.")
+        if not isinstance(self.pca_model, LINEAR_MODELS):
+            raise ValueError(f"A {type(self.pca_model).__name__} cannot be exported as a linear projector; "
+                             f"refit with the sklearn or covariance engine.")
+
+        save_projector(
+            path,
+            feature_names=(list(self.standardized_data.columns) if self.standardized_data is not None
+                           else self.feature_names),
+            scaler_mean=self.scaler_mean,
+            scaler_scale=self.scaler_scale,
+            components=self.pca_model.components_,
+            pca_mean=self.pca_model.mean_,
+            explained_variance_ratio=self.pca_model.explained_variance_ratio_
+        )
+        print(f"Projector exported to {path}")
+
+    def windowed_pca(
+            self,
+            data: pd.DataFrame,
+            n_components: int,
+            window: int,
+            step: int = 1,
+            order_by=DEFAULT_ORDER_BY,
+            drop_columns: Optional[List[str]] = None,
+            default_columns_to_drop: Optional[List[str]] = None,
+            impute_strategy: Optional[str] = 'mean'
+    ) -> Dict[str, Any]:
+        """Sliding-window PCA over ordered sampling events; returns loadings over time."""
+        return windowed_pca(
+            data,
+            n_components,
+            window,
+            step=step,
+            order_by=order_by,
+            drop_columns=drop_columns,
+            default_columns_to_drop=default_columns_to_drop,
+            impute_strategy=impute_strategy
+        )
+
 
 class ClusterAnalyzer:
     """Core clustering functionality."""
 
-    def __init__(self):
+    def __init__(self, precision: str = 'float64'):
         self.cluster_labels = None
+        self.set_precision(precision)
+
+    def set_precision(self, precision: str):
+        """Select the float dtype the clustering algorithms run in."""
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unsupported precision: {precision}. Choose from {', '.join(PRECISIONS)}")
+        self.precision = precision
+        self.dtype = PRECISIONS[precision]
 
     def k_means_clustering(self, data: np.ndarray, num_clusters: int) -> Dict[str, Any]:
         """Perform k-means clustering on PCA-transformed data."""
@@ -174,7 +813,7 @@ class ClusterAnalyzer:
             raise ValueError("Number of clusters must be greater than 0.")
 
         kmeans = KMeans(n_clusters=num_clusters, random_state=42)
-        self.cluster_labels = kmeans.fit_predict(data)
+        self.cluster_labels = kmeans.fit_predict(np.asarray(data, dtype=self.dtype))
 
         return {
             'algorithm': 'k-means',
@@ -199,11 +838,345 @@ class ClusterAnalyzer:
             'num_clusters': num_clusters
         }
 
-    def cluster_data(self, data: np.ndarray, algorithm: str, num_clusters: int) -> Dict[str, Any]:
+    def scalable_hierarchical_clustering(
+            self,
+            data: np.ndarray,
+            num_clusters: int,
+            n_micro_clusters: int = DEFAULT_MICRO_CLUSTERS,
+            compression: str = 'kmeans',
+            birch_threshold: float = 0.5,
+            batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """Ward clustering on micro-cluster summaries instead of on every sample.
+
+        One pass compresses the samples into k-means micro-clusters (or BIRCH CF-tree
+        subclusters), ward linkage runs on the micro-cluster centroids weighted by their
+        sample counts as in the BIRCH global step, and each sample inherits the cluster
+        of its micro-cluster.
+        """
+        if num_clusters <= 0:
+            raise ValueError("Number of clusters must be greater than 0.")
+
+        data = np.asarray(data, dtype=self.dtype)
+        n_micro_clusters = min(n_micro_clusters, data.shape[0])
+
+        # Single pass compression into micro-clusters
+        if compression == 'kmeans':
+            compressor = MiniBatchKMeans(n_clusters=n_micro_clusters, batch_size=max(batch_size, n_micro_clusters),
+                                         random_state=42)
+            step = max(batch_size, n_micro_clusters)
+            for start in range(0, data.shape[0], step):
+                block = data[start:start + step]
+                if block.shape[0] >= n_micro_clusters or hasattr(compressor, 'cluster_centers_'):
+                    compressor.partial_fit(block)
+            if not hasattr(compressor, 'cluster_centers_'):
+                compressor.partial_fit(data)
+            micro_centroids = compressor.cluster_centers_
+        elif compression == 'birch':
+            compressor = Birch(n_clusters=None, threshold=birch_threshold)
+            for start in range(0, data.shape[0], batch_size):
+                compressor.partial_fit(data[start:start + batch_size])
+            micro_centroids = compressor.subcluster_centers_
+        else:
+            raise ValueError(f"Unsupported compression method: {compression}")
+        micro_labels = compressor.predict(data)
+        micro_sizes = np.bincount(micro_labels, minlength=micro_centroids.shape[0])
+        print(f"Compressed {data.shape[0]} samples into {micro_centroids.shape[0]} micro-clusters")
+
+        # Empty micro-clusters carry no samples; keep them out of the linkage
+        occupied = np.flatnonzero(micro_sizes)
+        if occupied.size < 2:
+            raise ValueError("Not enough distinct micro-clusters for hierarchical clustering.")
+        linkage_matrix = weighted_ward_linkage(micro_centroids[occupied], micro_sizes[occupied])
+        occupied_clusters = fcluster(linkage_matrix, num_clusters, criterion="maxclust")
+
+        micro_to_cluster = np.zeros(micro_centroids.shape[0], dtype=occupied_clusters.dtype)
+        micro_to_cluster[occupied] = occupied_clusters
+        self.cluster_labels = micro_to_cluster[micro_labels]
+
+        return {
+            'algorithm': 'hierarchical (scalable)',
+            'labels': self.cluster_labels,
+            'linkage_matrix': linkage_matrix,
+            'num_clusters': num_clusters,
+            'micro_centroids': micro_centroids[occupied],
+            'micro_sizes': micro_sizes[occupied],
+            'micro_labels': micro_labels,
+            'compression': compression
+        }
+
+    def estimate_eps(self, data: np.ndarray, min_samples: int = DEFAULT_MIN_SAMPLES) -> float:
+        """Estimate a DBSCAN radius at the knee of the sorted k-distance curve.
+
+        Each sample's distance to its min_samples-th neighbour (KD-tree queries) is sorted
+        and both axes are scaled to [0, 1]. The knee is the point furthest below the chord
+        from the first to the last point: the curve is flat inside clusters and climbs
+        steeply over noise. A fixed quantile would land among the noise distances
+        whenever noise is more than a few percent of the samples, and merge clusters.
+        """
+        data = np.asarray(data, dtype=self.dtype)
+        k = min(min_samples, data.shape[0])
+        distances, _ = KDTree(data).query(data, k=k)
+        k_distances = np.sort(distances[:, -1])
+        spread = k_distances[-1] - k_distances[0]
+        if spread > 0:
+            position = np.linspace(0.0, 1.0, k_distances.shape[0])
+            eps = float(k_distances[np.argmax(position - (k_distances - k_distances[0]) / spread)])
+        else:
+            eps = float(k_distances[-1])
+        return eps if eps > 0 else float(np.finfo(np.float64).eps)
+
+    def density_clustering(
+            self,
+            data: np.ndarray,
+            method: str = 'hdbscan',
+            min_samples: int = DEFAULT_MIN_SAMPLES,
+            eps: Optional[float] = None,
+            min_cluster_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Density-based clustering (DBSCAN or HDBSCAN) on PCA-transformed data.
+
+        Neighbourhood queries go through a KD-tree over the scores, so the cost grows
+        as n log n instead of n^2. The number of clusters is found from the data;
+        samples in no dense region get NOISE_LABEL.
+        """
+        if min_samples <= 0:
+            raise ValueError("min_samples must be greater than 0.")
+
+        data = np.asarray(data, dtype=self.dtype)
+        if method == 'dbscan':
+            if eps is None:
+                eps = self.estimate_eps(data, min_samples)
+                print(f"Estimated DBSCAN eps at the knee of the {min_samples}-distance curve: {eps:.4f}")
+            model = DBSCAN(eps=eps, min_samples=min_samples, algorithm='kd_tree')
+        elif method == 'hdbscan':
+            model = HDBSCAN(min_cluster_size=min_cluster_size or min_samples, min_samples=min_samples,
+                            algorithm='kd_tree', copy=True)
+        else:
+            raise ValueError(f"Unsupported density method: {method}. Choose from {', '.join(DENSITY_ALGORITHMS)}")
+
+        self.cluster_labels = model.fit_predict(data)
+        found_clusters = len(set(np.unique(self.cluster_labels)) - {NOISE_LABEL})
+        n_noise = int(np.sum(self.cluster_labels == NOISE_LABEL))
+        print(f"{method} found {found_clusters} clusters and {n_noise} noise points")
+
+        results = {
+            'algorithm': method,
+            'labels': self.cluster_labels,
+            'num_clusters': found_clusters,
+            'noise_label': NOISE_LABEL,
+            'n_noise': n_noise,
+            'min_samples': min_samples
+        }
+        if method == 'dbscan':
+            results['eps'] = eps
+            results['core_sample_indices'] = model.core_sample_indices_
+        else:
+            results['min_cluster_size'] = model.min_cluster_size
+            results['probabilities'] = model.probabilities_
+        return results
+
+    def mini_batch_k_means_clustering(
+            self,
+            data: np.ndarray,
+            num_clusters: int,
+            batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """Perform mini-batch k-means clustering on PCA-transformed data."""
+        if num_clusters <= 0:
+            raise ValueError("Number of clusters must be greater than 0.")
+
+        kmeans = MiniBatchKMeans(n_clusters=num_clusters, batch_size=batch_size, n_init=3, random_state=42)
+        self.cluster_labels = kmeans.fit_predict(np.asarray(data, dtype=self.dtype))
+
+        return {
+            'algorithm': 'mini-batch k-means',
+            'labels': self.cluster_labels,
+            'centroids': kmeans.cluster_centers_,
+            'inertia': kmeans.inertia_,
+            'num_clusters': num_clusters,
+            'batch_size': batch_size,
+            'n_iter': kmeans.n_iter_,
+            'converged': kmeans.n_iter_ < kmeans.max_iter
+        }
+
+    def iter_score_chunks(self, scores, chunksize: int = DEFAULT_CHUNKSIZE, encoding: Optional[str] = None):
+        """Yield score blocks from a scores CSV path (as written by analyze_streaming) or a callable."""
+        if callable(scores):
+            for block in scores():
+                yield np.asarray(block, dtype=self.dtype)
+        else:
+            for chunk in iter_csv_chunks(scores, chunksize=chunksize, encoding=encoding):
+                yield chunk.to_numpy(dtype=self.dtype)
+
+    def sample_score_rows(self, scores, size: int, chunksize: int = DEFAULT_CHUNKSIZE,
+                          encoding: Optional[str] = None) -> np.ndarray:
+        """Uniform sample of up to size score rows in one pass: keep the rows with the smallest random keys."""
+        rng = np.random.default_rng(42)
+        sample = None
+        keys = np.empty(0)
+        for block in self.iter_score_chunks(scores, chunksize, encoding=encoding):
+            sample = block if sample is None else np.vstack([sample, block])
+            keys = np.concatenate([keys, rng.random(block.shape[0])])
+            if keys.shape[0] > size:
+                keep = np.argpartition(keys, size)[:size]
+                sample, keys = sample[keep], keys[keep]
+        return np.empty((0, 0), dtype=self.dtype) if sample is None else sample
+
+    def mini_batch_k_means_streaming(
+            self,
+            scores,
+            num_clusters: int,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            max_passes: int = 10,
+            tol: float = 1e-4,
+            chunksize: int = DEFAULT_CHUNKSIZE
+    ) -> Dict[str, Any]:
+        """Mini-batch k-means over chunked scores that never need to fit in memory at once.
+
+        `scores` is a scores CSV path or a callable returning a fresh iterator of
+        score blocks on every call, since each pass re-reads the data.
+        """
+        if num_clusters <= 0:
+            raise ValueError("Number of clusters must be greater than 0.")
+        if batch_size < num_clusters:
+            raise ValueError(f"Batch size ({batch_size}) must be at least the number of clusters ({num_clusters}).")
+
+        # Every pass re-reads the file, so detect its encoding only once
+        encoding = None if callable(scores) else detect_encoding(scores)['encoding']
+
+        # Seed the centers from a uniform sample of all rows, not from the first chunk:
+        # score files are often ordered (by event, site, ...) and the first chunk may
+        # hold a single cluster. 3 * batch_size matches MiniBatchKMeans' own init_size.
+        sample = self.sample_score_rows(scores, 3 * batch_size, chunksize, encoding=encoding)
+        if sample.shape[0] < num_clusters:
+            raise ValueError(f"Need at least {num_clusters} samples to form {num_clusters} clusters.")
+        init = KMeans(n_clusters=num_clusters, n_init=3, random_state=42).fit(sample).cluster_centers_
+
+        # No random reassignment: on ordered rows the centers of clusters absent from the
+        # current chunk look empty and would be moved into the cluster that is present
+        kmeans = MiniBatchKMeans(n_clusters=num_clusters, init=init, n_init=1, batch_size=batch_size,
+                                 reassignment_ratio=0.0, random_state=42)
+        previous_centers = None
+        converged = False
+        n_passes = 0
+        for n_passes in range(1, max_passes + 1):
+            pending = None
+            for block in self.iter_score_chunks(scores, chunksize, encoding=encoding):
+                pending = block if pending is None else np.vstack([pending, block])
+                # The very first update needs at least num_clusters samples
+                if not hasattr(kmeans, 'cluster_centers_') and pending.shape[0] < num_clusters:
+                    continue
+                for start in range(0, pending.shape[0], batch_size):
+                    kmeans.partial_fit(pending[start:start + batch_size])
+                pending = None
+
+            # Converged once a full pass barely moves the centers
+            centers = kmeans.cluster_centers_.copy()
+            if previous_centers is not None:
+                shift = np.linalg.norm(centers - previous_centers) / max(np.linalg.norm(previous_centers), 1e-12)
+                print(f"Pass {n_passes}: relative center shift {shift:.2e}")
+                if shift <= tol:
+                    converged = True
+                    break
+            previous_centers = centers
+
+        # Final pass: assign labels and accumulate inertia chunk by chunk
+        labels = []
+        inertia = 0.0
+        for block in self.iter_score_chunks(scores, chunksize, encoding=encoding):
+            block_labels = kmeans.predict(block)
+            inertia += float(((block - kmeans.cluster_centers_[block_labels]) ** 2).sum())
+            labels.append(block_labels)
+        self.cluster_labels = np.concatenate(labels)
+
+        return {
+            'algorithm': 'mini-batch k-means',
+            'labels': self.cluster_labels,
+            'centroids': kmeans.cluster_centers_,
+            'inertia': inertia,
+            'num_clusters': num_clusters,
+            'batch_size': batch_size,
+            'n_iter': n_passes,
+            'converged': converged
+        }
+
+    def k_sweep(
+            self,
+            data: np.ndarray,
+            k_values: List[int],
+            n_jobs: Optional[int] = None,
+            silhouette_sample_size: int = DEFAULT_SILHOUETTE_SAMPLE
+    ) -> Dict[str, Any]:
+        """Fit k-means for a range of k in parallel and report inertia and silhouette per k."""
+        return k_sweep(
+            np.asarray(data, dtype=self.dtype),
+            k_values,
+            n_jobs=n_jobs,
+            silhouette_sample_size=silhouette_sample_size
+        )
+
+    def consensus_clustering(
+            self,
+            data: np.ndarray,
+            num_clusters: int,
+            algorithm: str = 'k-means',
+            n_resamples: int = DEFAULT_RESAMPLES,
+            subsample: float = DEFAULT_SUBSAMPLE,
+            n_neighbors: int = DEFAULT_CONSENSUS_NEIGHBORS,
+            n_jobs: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Consensus labels and per-sample stability from subsampled fits run across processes."""
+        if algorithm not in CONSENSUS_ALGORITHMS:
+            raise ValueError(f"Unsupported consensus algorithm: {algorithm}. "
+                             f"Choose from {', '.join(CONSENSUS_ALGORITHMS)}")
+        if num_clusters <= 0:
+            raise ValueError("Number of clusters must be greater than 0.")
+
+        label_fn = functools.partial(cluster_labels, algorithm=algorithm, num_clusters=num_clusters,
+                                     precision=self.precision)
+        results = consensus_clustering(
+            np.asarray(data, dtype=self.dtype),
+            label_fn,
+            n_resamples=n_resamples,
+            subsample=subsample,
+            n_neighbors=n_neighbors,
+            n_jobs=n_jobs
+        )
+        self.cluster_labels = results['labels']
+        results['algorithm'] = f"consensus {algorithm}"
+        print(f"Consensus over {n_resamples} resamples: mean stability {results['stability'].mean():.3f}")
+        return results
+
+    def cluster_data(
+            self,
+            data: np.ndarray,
+            algorithm: str,
+            num_clusters: int,
+            batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Dict[str, Any]:
         """Run the specified clustering algorithm."""
         if algorithm == 'k-means':
             return self.k_means_clustering(data, num_clusters)
+        elif algorithm == 'mini-batch k-means':
+            return self.mini_batch_k_means_clustering(data, num_clusters, batch_size=batch_size)
         elif algorithm == 'hierarchical':
+            if len(data) > SCALABLE_HIERARCHICAL_THRESHOLD:
+                print(f"{len(data)} samples exceed {SCALABLE_HIERARCHICAL_THRESHOLD}; "
+                      f"using scalable hierarchical clustering")
+                return self.scalable_hierarchical_clustering(data, num_clusters, batch_size=batch_size)
             return self.hierarchical_clustering(data, num_clusters)
+        elif algorithm == 'hierarchical (scalable)':
+            return self.scalable_hierarchical_clustering(data, num_clusters, batch_size=batch_size)
+        elif algorithm in DENSITY_ALGORITHMS:
+            # Density methods discover the number of clusters themselves
+            return self.density_clustering(data, method=algorithm)
+        elif algorithm.startswith('consensus '):
+            return self.consensus_clustering(data, num_clusters, algorithm=algorithm[len('consensus '):])
         else:
-            raise ValueError(f"Unsupported clustering algorithm: {algorithm}")
\ No newline at end of file
+            raise ValueError(f"Unsupported clustering algorithm: {algorithm}")
+
+
+def cluster_labels(data: np.ndarray, algorithm: str, num_clusters: int, precision: str = 'float64') -> np.ndarray:
+    """Labels from a fresh ClusterAnalyzer; module level so worker processes can unpickle it."""
+    return ClusterAnalyzer(precision=precision).cluster_data(data, algorithm, num_clusters)['labels']
\ No newline at end of file
@@ -0,0 +1,140 @@
+from typing import Dict, Any, Optional, List
+
+import numpy as np
+import pandas as pd
+
+
+IMPUTE_STRATEGIES = ('mean', 'median', 'zero', None)
+
+
+class PreprocessingPipeline:
+    """Declarative drop -> numeric select -> inf/NaN -> impute -> scale pipeline.
+
+    Column selection only touches the DataFrame metadata. The surviving numeric
+    columns are copied once into a single column-major float array, and each column
+    then runs through inf handling, imputation and scaling in place while it is hot
+    in cache. No intermediate DataFrames are created.
+    """
+
+    STAGES = ('drop', 'numeric', 'nonfinite', 'impute', 'scale')
+
+    def __init__(
+            self,
+            drop_columns: Optional[List[str]] = None,
+            default_columns_to_drop: Optional[List[str]] = None,
+            impute_strategy: Optional[str] = 'mean',
+            scale: bool = True,
+            dtype=np.float64
+    ):
+        if impute_strategy not in IMPUTE_STRATEGIES:
+            raise ValueError(f"Unsupported impute strategy: {impute_strategy}")
+        self.drop_columns = drop_columns or []
+        self.default_columns_to_drop = default_columns_to_drop or []
+        self.impute_strategy = impute_strategy
+        self.scale = scale
+        self.dtype = np.dtype(dtype)
+
+    def resolve_columns(self, data: pd.DataFrame) -> Dict[str, List[str]]:
+        """Apply the drop and numeric-select stages to the column index only."""
+        missing_columns = [col for col in self.drop_columns if col not in data.columns]
+        if missing_columns:
+            raise ValueError(f"Columns not found in the dataset: {', '.join(missing_columns)}")
+
+        dropped = set(self.drop_columns) | set(self.default_columns_to_drop)
+        kept = [col for col in data.columns if col not in dropped]
+        numeric = [
+            col for col in kept
+            if pd.api.types.is_numeric_dtype(data[col].dtype) and not pd.api.types.is_bool_dtype(data[col].dtype)
+        ]
+        removed = [col for col in kept if col not in numeric]
+        return {'kept': kept, 'numeric': numeric, 'removed': removed, 'missing': missing_columns}
+
+    def fit_transform(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """Run every stage in one fused pass and report the bytes each stage allocates."""
+        columns = self.resolve_columns(data)
+        numeric_columns = columns['numeric']
+        if columns['removed']:
+            print(f"Non-numeric columns excluded: {columns['removed']}")
+        if not numeric_columns:
+            raise ValueError("No numerical data available for PCA")
+
+        n_rows, n_cols = data.shape[0], len(numeric_columns)
+        itemsize = self.dtype.itemsize
+        stage_bytes = dict.fromkeys(self.STAGES, 0)
+
+        # The only full-size allocation: column-major so each column is contiguous
+        values = np.empty((n_rows, n_cols), dtype=self.dtype, order='F')
+        stage_bytes['numeric'] = values.nbytes
+
+        fill_values = np.full(n_cols, np.nan)
+        means = np.zeros(n_cols)
+        scales = np.ones(n_cols)
+        inf_count = 0
+        nan_count = 0
+
+        for j, col in enumerate(numeric_columns):
+            column = values[:, j]
+            source = data[col]
+            if isinstance(source.dtype, pd.api.extensions.ExtensionDtype):
+                # Nullable extension columns are materialized once before the copy
+                stage_bytes['numeric'] = max(stage_bytes['numeric'], values.nbytes + n_rows * itemsize)
+                column[:] = source.to_numpy(dtype=self.dtype, na_value=np.nan)
+            else:
+                # Plain numpy columns are cast straight into the output column
+                column[:] = source.to_numpy()
+
+            # inf/-inf -> NaN (boolean mask is the only temporary)
+            mask = np.isinf(column)
+            stage_bytes['nonfinite'] = max(stage_bytes['nonfinite'], mask.nbytes)
+            inf_count += int(mask.sum())
+            column[mask] = np.nan
+            np.isnan(column, out=mask)
+            nan_count += int(mask.sum())
+
+            if self.impute_strategy is not None and mask.any():
+                if self.impute_strategy == 'zero' or mask.all():
+                    fill = 0.0
+                else:
+                    # nan-aware reductions work on a copy of the column
+                    stage_bytes['impute'] = max(stage_bytes['impute'], n_rows * itemsize)
+                    fill = np.nanmean(column) if self.impute_strategy == 'mean' else np.nanmedian(column)
+                column[mask] = fill
+                fill_values[j] = fill
+
+            if self.scale:
+                # StandardScaler conventions: ddof=0, NaN ignored, unit scale for constant columns
+                if mask.all():
+                    mean, std = 0.0, 0.0
+                elif self.impute_strategy is None and mask.any():
+                    # NaN left in place; nan-aware reductions work on a copy of the column
+                    stage_bytes['scale'] = max(stage_bytes['scale'], n_rows * itemsize)
+                    mean, std = np.nanmean(column), np.nanstd(column)
+                else:
+                    mean, std = column.mean(), None
+                column -= mean
+                if std is None:
+                    std = np.sqrt(np.dot(column, column) / n_rows)
+                means[j] = mean
+                scales[j] = std if std > 0 else 1.0
+                column /= scales[j]
+
+        print(f"Preprocessed data shape: {values.shape}, "
+              f"replaced {inf_count} inf values, found {nan_count} missing values")
+
+        return {
+            'data': values,
+            'feature_names': numeric_columns,
+            'mean': means,
+            'scale': scales,
+            'fill_values': fill_values,
+            'removed_columns': columns['removed'],
+            'missing_columns': columns['missing'],
+            'prepared_shape': (n_rows, len(columns['kept'])),
+            'stage_bytes': stage_bytes,
+            'inf_count': inf_count,
+            'nan_count': nan_count
+        }
+
+    def to_frame(self, result: Dict[str, Any]) -> pd.DataFrame:
+        """Wrap the pipeline output in a DataFrame without copying the array."""
+        return pd.DataFrame(result['data'], columns=result['feature_names'], copy=False)
@@ -0,0 +1,114 @@
+from typing import Dict, Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from source.utils.file_operations import DEFAULT_CHUNKSIZE, iter_csv_chunks
+from source.utils.parallel import imap_tasks
+
+
+BBCH_COLUMN = 'bbch'
+
+# Profile of a block of rows:
+#   {'rows': int,
+#    'columns': {name: {'numeric', 'missing', 'inf', 'finite', 'sum', 'min', 'max'}},
+#    'bbch_counts': {stage: int}}
+Profile = Dict[str, Any]
+
+
+def profile_chunk(chunk: pd.DataFrame) -> Profile:
+    """Missing, inf, range and sum per column plus BBCH stage counts for one block of rows."""
+    columns = {}
+    numeric_cols = [
+        col for col in chunk.columns
+        if pd.api.types.is_numeric_dtype(chunk[col].dtype) and not pd.api.types.is_bool_dtype(chunk[col].dtype)
+    ]
+    if numeric_cols:
+        values = chunk[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        missing = np.isnan(values)
+        infinite = np.isinf(values)
+        finite = ~(missing | infinite)
+        n_finite = finite.sum(axis=0)
+        sums = np.where(finite, values, 0.0).sum(axis=0)
+        mins = np.where(finite, values, np.inf).min(axis=0, initial=np.inf)
+        maxs = np.where(finite, values, -np.inf).max(axis=0, initial=-np.inf)
+        for j, col in enumerate(numeric_cols):
+            columns[col] = {
+                'numeric': True,
+                'missing': int(missing[:, j].sum()),
+                'inf': int(infinite[:, j].sum()),
+                'finite': int(n_finite[j]),
+                'sum': float(sums[j]),
+                'min': float(mins[j]),
+                'max': float(maxs[j])
+            }
+
+    for col in chunk.columns:
+        if col not in columns:
+            columns[col] = {'numeric': False, 'missing': int(chunk[col].isna().sum()), 'inf': 0, 'finite': 0,
+                            'sum': 0.0, 'min': np.inf, 'max': -np.inf}
+    columns = {col: columns[col] for col in chunk.columns}  # Keep the file's column order
+
+    bbch_counts = {}
+    bbch = next((col for col in chunk.columns if str(col).strip().lower() == BBCH_COLUMN), None)
+    if bbch is not None:
+        stages = chunk[bbch].astype(str).str.strip()
+        bbch_counts = {str(stage): int(count) for stage, count in stages.value_counts().items()}
+
+    return {'rows': int(chunk.shape[0]), 'columns': columns, 'bbch_counts': bbch_counts}
+
+
+def merge_profiles(a: Optional[Profile], b: Profile) -> Profile:
+    """Merge two profiles; a column is numeric only if it parsed as numeric in every block."""
+    if a is None:
+        return b
+    columns = {col: dict(stats) for col, stats in a['columns'].items()}
+    for col, stats in b['columns'].items():
+        if col not in columns:
+            columns[col] = dict(stats)
+            continue
+        merged = columns[col]
+        merged['numeric'] = merged['numeric'] and stats['numeric']
+        for key in ('missing', 'inf', 'finite', 'sum'):
+            merged[key] += stats[key]
+        merged['min'] = min(merged['min'], stats['min'])
+        merged['max'] = max(merged['max'], stats['max'])
+
+    bbch_counts = dict(a['bbch_counts'])
+    for stage, count in b['bbch_counts'].items():
+        bbch_counts[stage] = bbch_counts.get(stage, 0) + count
+    return {'rows': a['rows'] + b['rows'], 'columns': columns, 'bbch_counts': bbch_counts}
+
+
+def accumulate_profiles(chunks: Iterable[pd.DataFrame], n_jobs: Optional[int] = None) -> Profile:
+    """Profile every chunk in a process pool and merge the results in one pass."""
+    total = None
+    for profile in imap_tasks(profile_chunk, ((chunk,) for chunk in chunks), n_jobs=n_jobs):
+        total = merge_profiles(total, profile)
+
+    if total is None:
+        raise ValueError("No rows to profile")
+    return total
+
+
+def profile_file(file_path: str, chunksize: int = DEFAULT_CHUNKSIZE, n_jobs: Optional[int] = None) -> Profile:
+    """Profile a CSV in a single streaming pass without loading it whole."""
+    return accumulate_profiles(iter_csv_chunks(file_path, chunksize=chunksize), n_jobs=n_jobs)
+
+
+def summarize_profile(profile: Profile) -> pd.DataFrame:
+    """One row per column: type, missing rate, inf count, min, max and mean of finite values."""
+    rows = []
+    for col, stats in profile['columns'].items():
+        has_values = stats['numeric'] and stats['finite'] > 0
+        rows.append({
+            'column': col,
+            'numeric': stats['numeric'],
+            'missing': stats['missing'],
+            'missing_rate': stats['missing'] / profile['rows'] if profile['rows'] else 0.0,
+            'inf': stats['inf'],
+            'min': stats['min'] if has_values else np.nan,
+            'max': stats['max'] if has_values else np.nan,
+            'mean': stats['sum'] / stats['finite'] if has_values else np.nan
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,170 @@
+"""Standalone PCA projector: scores new samples with an exported model using NumPy only.
+
+Deliberately imports nothing beyond the standard library and NumPy (no sklearn,
+pandas or tkinter) so scoring processes start fast. Usage:
+
+    python -m source.analysis.projector model.npz survey.csv -o scores.csv --id-column SampleID
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+
+PROJECTOR_FORMAT = 'kupca-projector'
+PROJECTOR_VERSION = 1
+DEFAULT_BATCH_ROWS = 10000
+
+
+def save_projector(path, feature_names, scaler_mean, scaler_scale, components, pca_mean=None,
+                   explained_variance_ratio=None):
+    """Write the arrays needed to project new samples to a small versioned .npz file."""
+    components = np.asarray(components, dtype=np.float64)
+    n_features = components.shape[1]
+    if len(feature_names) != n_features:
+        raise ValueError("Feature names do not match the number of model features.")
+    meta = {
+        'format': PROJECTOR_FORMAT,
+        'version': PROJECTOR_VERSION,
+        'feature_names': [str(name) for name in feature_names],
+        'n_components': int(components.shape[0]),
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+    arrays = {
+        'scaler_mean': np.asarray(scaler_mean, dtype=np.float64),
+        'scaler_scale': np.asarray(scaler_scale, dtype=np.float64),
+        'components': components,
+        'pca_mean': np.zeros(n_features) if pca_mean is None else np.asarray(pca_mean, dtype=np.float64)
+    }
+    if explained_variance_ratio is not None:
+        arrays['explained_variance_ratio'] = np.asarray(explained_variance_ratio, dtype=np.float64)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        np.savez(file, meta=np.array(json.dumps(meta)), **arrays)
+    os.replace(tmp_path, path)
+
+
+class Projector:
+    """Scores raw (unscaled) samples with an exported model.
+
+    Missing or non-numeric values are scored as the training mean of their feature,
+    i.e. they contribute nothing to any component.
+    """
+
+    def __init__(self, path):
+        with np.load(path, allow_pickle=False) as stored:
+            meta = json.loads(str(stored['meta']))
+            if meta.get('format') != PROJECTOR_FORMAT:
+                raise ValueError(f"{path} is not a projector file")
+            if meta.get('version') != PROJECTOR_VERSION:
+                raise ValueError(f"Unsupported projector version: {meta.get('version')}")
+            self.feature_names = meta['feature_names']
+            self.n_components = meta['n_components']
+            self.scaler_mean = stored['scaler_mean']
+            self.scaler_scale = stored['scaler_scale']
+            components = stored['components']
+            pca_mean = stored['pca_mean']
+
+        # Fold scaling and centering into one affine map: scores = x @ weights - offset
+        self.weights = np.ascontiguousarray((components / self.scaler_scale).T)
+        self.offset = (self.scaler_mean / self.scaler_scale + pca_mean) @ components.T
+
+    def project(self, values):
+        """Project a (samples x features) array whose columns follow feature_names."""
+        values = np.array(values, dtype=np.float64)
+        invalid = ~np.isfinite(values)
+        if invalid.any():
+            values[invalid] = np.broadcast_to(self.scaler_mean, values.shape)[invalid]
+        return values @ self.weights - self.offset
+
+    def resolve_columns(self, header):
+        """Map each model feature to its column index in a CSV header (case-insensitive fallback)."""
+        header = [name.strip() for name in header]
+        exact = {name: i for i, name in enumerate(header)}
+        folded = {name.lower(): i for i, name in enumerate(header)}
+        indices = []
+        missing = []
+        for name in self.feature_names:
+            index = exact.get(name, folded.get(name.lower()))
+            if index is None:
+                missing.append(name)
+            indices.append(index)
+        if missing:
+            raise ValueError(f"Input is missing model features: {', '.join(missing)}")
+        return indices
+
+    @staticmethod
+    def parse_batch(rows):
+        """Convert a batch of string cells to floats; blanks and non-numbers become NaN."""
+        cells = np.array(rows, dtype=str)
+        cells[np.char.str_len(np.char.strip(cells)) == 0] = 'nan'
+        try:
+            return cells.astype(np.float64)
+        except ValueError:
+            values = np.empty(cells.shape)
+            for index, cell in np.ndenumerate(cells):
+                try:
+                    values[index] = float(cell)
+                except ValueError:
+                    values[index] = np.nan
+            return values
+
+    def iter_csv(self, path, batch_rows=DEFAULT_BATCH_ROWS, id_columns=(), encoding='utf-8-sig'):
+        """Yield (ids, scores) per batch so memory is bounded by batch_rows."""
+        with open(path, newline='', encoding=encoding) as file:
+            reader = csv.reader(file)
+            header = next(reader)
+            feature_indices = self.resolve_columns(header)
+            stripped = [name.strip() for name in header]
+            id_indices = [stripped.index(col) for col in id_columns]
+
+            features, ids = [], []
+            for row in reader:
+                if not row:
+                    continue
+                features.append([row[i] if i < len(row) else '' for i in feature_indices])
+                ids.append([row[i] for i in id_indices])
+                if len(features) >= batch_rows:
+                    yield ids, self.project(self.parse_batch(features))
+                    features, ids = [], []
+            if features:
+                yield ids, self.project(self.parse_batch(features))
+
+    def project_csv(self, path, output_path, batch_rows=DEFAULT_BATCH_ROWS, id_columns=(), encoding='utf-8-sig'):
+        """Stream a CSV through the model and write id columns plus PC1..PCk scores."""
+        n_rows = 0
+        with open(output_path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(list(id_columns) + [f"PC{i + 1}" for i in range(self.n_components)])
+            for ids, scores in self.iter_csv(path, batch_rows, id_columns, encoding):
+                writer.writerows(id_row + [repr(float(score)) for score in score_row]
+                                 for id_row, score_row in zip(ids, scores))
+                n_rows += scores.shape[0]
+        return n_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Project CSV samples onto an exported PCA model.")
+    parser.add_argument('model', help="Projector file written by PCAAnalyzer.export_projector")
+    parser.add_argument('input', help="CSV file with the model's feature columns")
+    parser.add_argument('-o', '--output', help="Output CSV (default: <input>_scores.csv)")
+    parser.add_argument('--id-column', action='append', default=[], help="Column to copy to the output; repeatable")
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS)
+    parser.add_argument('--encoding', default='utf-8-sig')
+    args = parser.parse_args(argv)
+
+    output = args.output or f"{os.path.splitext(args.input)[0]}_scores.csv"
+    start = time.perf_counter()
+    n_rows = Projector(args.model).project_csv(args.input, output, args.batch_rows, args.id_column, args.encoding)
+    print(f"Projected {n_rows} samples to {output} in {time.perf_counter() - start:.3f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
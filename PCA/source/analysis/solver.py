@@ -0,0 +1,31 @@
+SVD_SOLVERS = ('auto', 'full', 'randomized', 'arpack', 'covariance_eigh')
+
+
+def select_svd_solver(n_samples: int, n_features: int, n_components: int) -> str:
+    """Pick the cheapest exact-enough PCA solver for the data shape."""
+    min_dim = min(n_samples, n_features)
+
+    # Tall tables: eigendecompose the small p x p covariance instead of the data
+    if n_samples >= 10 * n_features and n_features <= 1000:
+        return 'covariance_eigh'
+
+    # Wide tables where only a few components are wanted: skip the rest
+    if max(n_samples, n_features) > 500 and n_components < 0.8 * min_dim:
+        return 'randomized'
+
+    return 'full'
+
+
+def resolve_svd_solver(svd_solver: str, n_samples: int, n_features: int, n_components: int) -> str:
+    """Validate svd_solver, resolve 'auto' by shape and fall back from ARPACK where it cannot run."""
+    if svd_solver not in SVD_SOLVERS:
+        raise ValueError(f"Unsupported SVD solver: {svd_solver}. Choose from {', '.join(SVD_SOLVERS)}")
+
+    if svd_solver == 'auto':
+        svd_solver = select_svd_solver(n_samples, n_features, n_components)
+
+    # ARPACK can only compute strictly fewer components than the smallest dimension
+    if svd_solver == 'arpack' and n_components >= min(n_samples, n_features):
+        print("ARPACK needs n_components < min(n_samples, n_features); falling back to full SVD.")
+        svd_solver = 'full'
+    return svd_solver
@@ -0,0 +1,154 @@
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from source.analysis.covariance import CovariancePCAModel, Moments, chunk_moments, merge_moments, subtract_moments
+from source.analysis.preprocessing import PreprocessingPipeline
+
+
+DEFAULT_ORDER_BY = ('Year', 'EventId')
+REFRESH_EVERY = 200  # Rebuild the window from event moments this often to stop rounding drift
+WINDOW_IMPUTE_STRATEGIES = ('mean', 'zero', None)
+
+
+def resolve_order_by(data: pd.DataFrame, order_by) -> List[str]:
+    """Match ordering columns to the data case-insensitively (clean_data lower-cases names)."""
+    order_by = [order_by] if isinstance(order_by, str) else list(order_by)
+    lookup = {str(col).strip().lower(): col for col in data.columns}
+    missing_keys = [col for col in order_by if str(col).strip().lower() not in lookup]
+    if missing_keys:
+        raise ValueError(f"Ordering columns not found in the dataset: {', '.join(missing_keys)}")
+    return [lookup[str(col).strip().lower()] for col in order_by]
+
+
+def masked_sums(block: np.ndarray) -> tuple:
+    """Row count and NaN-masked pairwise sums of one event; they add and subtract exactly."""
+    finite = (~np.isnan(block)).astype(np.float64)
+    filled = np.nan_to_num(block.astype(np.float64), nan=0.0)
+    # count[j, k]: rows where j and k are both present; total[j, k]: sum of x_j over those rows
+    return block.shape[0], finite.T @ finite, filled.T @ finite, filled.T @ filled
+
+
+def merge_sums(a: Optional[tuple], b: tuple) -> tuple:
+    """Add one event's masked sums to a window total."""
+    if a is None:
+        return b
+    return tuple(x + y for x, y in zip(a, b))
+
+
+def subtract_sums(total: tuple, part: tuple) -> tuple:
+    """Remove one event's masked sums from a window total."""
+    return tuple(x - y for x, y in zip(total, part))
+
+
+def mean_imputed_moments(sums: tuple) -> Moments:
+    """Moments of the window after filling each column's gaps with its mean over the window."""
+    n, count, total, cross = sums
+    present = np.diag(count)
+    mean = np.divide(np.diag(total), present, out=np.zeros(present.shape[0]), where=present > 0)
+    # Filled cells sit exactly at the mean, so only pairs present in both columns contribute
+    shifted = total * mean[np.newaxis, :]
+    comoment = cross - shifted - shifted.T + np.outer(mean, mean) * count
+    return int(round(n)), mean, comoment
+
+
+def windowed_pca(
+        data: pd.DataFrame,
+        n_components: int,
+        window: int,
+        step: int = 1,
+        order_by=DEFAULT_ORDER_BY,
+        drop_columns: Optional[List[str]] = None,
+        default_columns_to_drop: Optional[List[str]] = None,
+        impute_strategy: Optional[str] = 'mean'
+) -> Dict[str, Any]:
+    """Slide a window of `window` consecutive events over the data and fit PCA per window.
+
+    Each event's moments are computed once. Moving the window merges the entering
+    events' moments and subtracts the leaving ones, so a step costs O(p^2) per event
+    moved plus one O(p^3) eigendecomposition, however many rows the window holds.
+    Components are sign-aligned to the previous window so the sequence animates smoothly.
+
+    Mean imputation uses each window's own means, so later events never leak into
+    earlier windows; 'zero' fills a constant and None raises on missing values.
+    """
+    order_by = resolve_order_by(data, order_by)
+    if window <= 0 or step <= 0:
+        raise ValueError("Window and step must be greater than 0.")
+    if impute_strategy not in WINDOW_IMPUTE_STRATEGIES:
+        raise ValueError(f"Unsupported impute strategy for windowed PCA: {impute_strategy}")
+
+    preprocessed = PreprocessingPipeline(
+        drop_columns=drop_columns,
+        default_columns_to_drop=list(default_columns_to_drop or []) + order_by,
+        impute_strategy='zero' if impute_strategy == 'zero' else None,
+        scale=False
+    ).fit_transform(data)
+    values, feature_names = preprocessed['data'], preprocessed['feature_names']
+    n_components = min(n_components, len(feature_names))
+
+    events = data.groupby(order_by if len(order_by) > 1 else order_by[0], sort=True).indices
+    event_keys = list(events)
+    if len(event_keys) < window:
+        raise ValueError(f"Only {len(event_keys)} events available for a window of {window}.")
+
+    if impute_strategy == 'mean' and preprocessed['nan_count']:
+        # Centering on the overall means is only a numerical shift; the moments do not depend on it
+        values = values - np.nanmean(values, axis=0)
+        event_moments = [masked_sums(values[rows]) for rows in events.values()]
+        merge, subtract, to_moments = merge_sums, subtract_sums, mean_imputed_moments
+    else:
+        event_moments = [chunk_moments(values[rows]) for rows in events.values()]
+        merge, subtract, to_moments = merge_moments, subtract_moments, None
+
+    starts = list(range(0, len(event_keys) - window + 1, step))
+    n_features = len(feature_names)
+    loadings = np.full((len(starts), n_features, n_components), np.nan)
+    explained_variance = np.full((len(starts), n_components), np.nan)
+    n_samples = np.zeros(len(starts), dtype=np.int64)
+
+    moments = None
+    previous_components = None
+    current = (0, 0)  # Half-open range of events currently merged into moments
+    for i, start in enumerate(starts):
+        stop = start + window
+        if moments is None or i % REFRESH_EVERY == 0 or start >= current[1]:
+            moments = None
+            for event in range(start, stop):
+                moments = merge(moments, event_moments[event])
+        else:
+            for event in range(current[0], start):
+                moments = subtract(moments, event_moments[event])
+            for event in range(current[1], stop):
+                moments = merge(moments, event_moments[event])
+        current = (start, stop)
+
+        n_samples[i] = moments[0]
+        if moments[0] < 2:
+            continue
+        model = CovariancePCAModel(n_components).fit_moments(to_moments(moments) if to_moments else moments)
+        components = model.components_
+        if previous_components is not None:
+            signs = np.sign(np.sum(components * previous_components, axis=1))
+            signs[signs == 0] = 1.0
+            components = components * signs[:, np.newaxis]
+        previous_components = components
+        loadings[i] = components.T
+        explained_variance[i] = model.explained_variance_ratio_
+
+    print(f"Fitted {len(starts)} windows of {window} events over {len(event_keys)} events")
+
+    return {
+        'loadings': loadings,
+        'explained_variance': explained_variance,
+        'n_samples': n_samples,
+        'window_start': [event_keys[start] for start in starts],
+        'window_end': [event_keys[start + window - 1] for start in starts],
+        'event_keys': event_keys,
+        'feature_names': feature_names,
+        'n_components': n_components,
+        'window': window,
+        'step': step,
+        'order_by': order_by
+    }
@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import filedialog, messagebox
 from typing import Dict, Any
 
-import chardet
 from matplotlib import pyplot as plt
 from matplotlib.colors import to_hex
 from matplotlib.figure import Figure
@@ -10,6 +9,7 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import pandas as pd
 import numpy as np
 import os
+import threading
 import time
 
 from sklearn.impute import SimpleImputer
@@ -20,12 +20,19 @@ from source.visualization.biplot import BiplotVisualizer, InteractiveBiplotVisua
 from source.visualization.scree import ScreePlotVisualizer
 from source.visualization.heatmap import LoadingsHeatmapVisualizer
 from source.visualization.loadings import LoadingsProcessor
+from source.visualization.cluster_sweep import ClusterSweepVisualizer
 
 # Core functionality imports
 from source.analysis.pca import PCAAnalyzer, ClusterAnalyzer
-from source.utils.constant import OUTPUT_DIR, DEFAULT_COLUMNS_TO_DROP
-from source.utils.file_operations import load_file, save_plot
+from source.analysis.cache import AnalysisCache
+from source.analysis.config_sweep import run_config_sweep
+from source.analysis.profiler import merge_profiles, profile_file, summarize_profile
+from source.utils.constant import OUTPUT_DIR, DEFAULT_COLUMNS_TO_DROP, METADATA_COLUMNS
+from source.utils.file_operations import (
+    SOURCE_COLUMN, load_file, load_columns, load_files, save_plot, cast_numeric_columns
+)
 from source.utils.helpers import generate_color_palette
+from source.utils.parallel import enable_frozen_workers
 
 
 class PCAAnalysisApp:
@@ -38,6 +45,7 @@ class PCAAnalysisApp:
         self.biplot_visualizer = BiplotVisualizer()
         self.biplot_manager = BiplotManager()
         self.cluster_analyzer = ClusterAnalyzer()
+        self.analysis_cache = AnalysisCache()
 
         # Initialize all GUI variables
         self.target_var = tk.StringVar(value="None")
@@ -46,11 +54,15 @@ class PCAAnalysisApp:
         self.enable_feature_grouping = tk.BooleanVar(value=False)
         self.heatmap_mode_var = tk.StringVar(value="Top 10 Features")
         self.target_mode = tk.StringVar(value="Select Target")
+        self.use_float32 = tk.BooleanVar(value=False)
+        self.show_loading_intervals = tk.BooleanVar(value=False)
+        self.find_similar_on_click = tk.BooleanVar(value=False)
 
         # Initialize all widget references
         # File Section
         self.file_label = None
         self.file_button = None
+        self.multi_file_button = None
         self.clean_data_button = None
 
         # Missing Values Section
@@ -113,10 +125,20 @@ class PCAAnalysisApp:
 
         # Data-related variables
         self.data = None
+        self.sample_metadata = None
+        self.is_cleaned = False
+        self.data_profile = None  # Profile of the chosen file(s), filled in by a background thread
+        self.profiled_paths = None
         self.pca_model = None
         self.standardized_data = None
         self.feature_to_group = None
         self.feature_groups_colors = None
+        self.loading_intervals = None
+        self.bootstrapping_model = None  # Model whose loadings a background thread is bootstrapping
+        self.parallel_analysis_results = None
+        self.similar_artists = []
+        self.showing_scores = False  # True while the canvas holds the PC1/PC2 score scatter
+        self.showing_biplot = False
 
         # Style constants
         self.button_style = {
@@ -174,6 +196,7 @@ class PCAAnalysisApp:
         self.ax = self.fig.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.master)
         self.canvas.get_tk_widget().pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)  # Attach canvas to Tkinter
+        self.canvas.mpl_connect('button_press_event', self.on_canvas_click)
 
     def create_widgets(self):
         """Create all widgets"""
@@ -182,6 +205,8 @@ class PCAAnalysisApp:
                                    bg="#f5f5f5", font=('Helvetica', 10))
         self.file_button = tk.Button(self.master, text="Browse",
                                      **self.button_style, command=self.load_file)
+        self.multi_file_button = tk.Button(self.master, text="Browse Multiple",
+                                           **self.button_style, command=self.load_multiple_files)
 
         # Output Directory Section
         self.output_dir = OUTPUT_DIR  # Default directory
@@ -290,6 +315,22 @@ class PCAAnalysisApp:
                                          font=('Helvetica', 10),
                                          width=10)
         self.components_entry.insert(0, "2")
+        self.config_sweep_button = tk.Button(self.master, text="Sensitivity Sweep",
+                                             command=self.run_config_sweep, **self.button_style)
+        self.find_similar_checkbox = tk.Checkbutton(self.master,
+                                                    text="Find similar samples on click",
+                                                    variable=self.find_similar_on_click,
+                                                    bg="#f5f5f5",
+                                                    font=('Helvetica', 10))
+        self.suggest_components_button = tk.Button(self.master, text="Suggest Components",
+                                                   command=self.suggest_components, **self.button_style)
+
+        self.float32_checkbox = tk.Checkbutton(self.master,
+                                               text="Use float32 (less memory)",
+                                               variable=self.use_float32,
+                                               bg="#f5f5f5",
+                                               font=('Helvetica', 10),
+                                               command=self.update_precision)
 
         self.top_n_label = tk.Label(self.master, text="Top N Features for Biplot:", bg="#f5f5f5", font=('Helvetica', 10))
         self.top_n_entry = tk.Entry(self.master, font=('Helvetica', 10), width=10)
@@ -371,6 +412,14 @@ class PCAAnalysisApp:
                                         command=self.upload_mapping_csv)
         self.mapping_button.config(state="disabled")
 
+        self.loading_intervals_checkbox = tk.Checkbutton(
+            self.master,
+            text="Bootstrap Loading CIs",
+            variable=self.show_loading_intervals,
+            bg="#f5f5f5",
+            font=('Helvetica', 10)
+        )
+
 
         ### Focus on signficant loadings (Biplot)
         # Create a BooleanVar for the checkbox
@@ -399,7 +448,10 @@ class PCAAnalysisApp:
         self.clustering_label = tk.Label(self.master, text="Clustering Options:", bg="#f5f5f5", font=('Helvetica', 10))
 
         self.clustering_algorithm_var = tk.StringVar(value="k-means")  # Default algorithm
-        self.clustering_dropdown = tk.OptionMenu(self.master, self.clustering_algorithm_var, "k-means", "hierarchical")
+        self.clustering_dropdown = tk.OptionMenu(self.master, self.clustering_algorithm_var, "k-means",
+                                                 "mini-batch k-means", "hierarchical",
+                                                 "hierarchical (scalable)", "dbscan", "hdbscan",
+                                                 "consensus k-means", "consensus hierarchical")
 
         self.num_clusters_label = tk.Label(self.master, text="Number of Clusters (k-means):", bg="#f5f5f5",
                                            font=('Helvetica', 10))
@@ -408,6 +460,8 @@ class PCAAnalysisApp:
 
         self.run_clustering_button = tk.Button(self.master, text="Run Clustering",
                                                command=self.run_clustering, **self.button_style)
+        self.cluster_sweep_button = tk.Button(self.master, text="Choose k (Sweep)",
+                                              command=self.run_cluster_sweep, **self.button_style)
 
         # Heatmap Controls
         self.focus_label = tk.Label(self.master,
@@ -473,6 +527,10 @@ class PCAAnalysisApp:
                                      text="Save Plot",
                                      **self.button_style,
                                      command=self.save_plot)
+        self.export_projector_button = tk.Button(self.master,
+                                                 text="Export Projector",
+                                                 **self.button_style,
+                                                 command=self.export_projector)
 
     def setup_layout(self):
         """Setup the layout of GUI components"""
@@ -489,6 +547,7 @@ class PCAAnalysisApp:
         # File Selection
         self.file_label.grid(row=0, column=0, padx=5, pady=5, sticky="e")
         self.file_button.grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        self.multi_file_button.grid(row=0, column=1, padx=5, pady=5, sticky="e")
 
         # Clean Data Banner
         self.clean_data_banner.grid(row=1, column=0, columnspan=2,
@@ -510,6 +569,7 @@ class PCAAnalysisApp:
 
         # Clean Data Button
         self.clean_data_button.grid(row=11, column=0, columnspan=2, padx=5, pady=5)
+        self.config_sweep_button.grid(row=11, column=2, padx=5, pady=5)
 
         # Drop Columns Section
         self.drop_label.grid(row=10, column=0, padx=5, pady=5, sticky="e")
@@ -524,9 +584,12 @@ class PCAAnalysisApp:
         self.target_label.grid(row=15, column=0, padx=5, pady=5, sticky="w")
         self.target_dropdown.grid(row=15, column=1, padx=5, pady=5, sticky="w")
         self.custom_target_entry.grid(row=16, column=1, padx=5, pady=5, sticky="w")
+        self.float32_checkbox.grid(row=16, column=0, padx=5, pady=5, sticky="w")
+        self.find_similar_checkbox.grid(row=20, column=2, padx=5, pady=5, sticky="w")
         # PCA Parameters
         self.components_label.grid(row=17, column=0, padx=5, pady=5, sticky="e")
         self.components_entry.grid(row=17, column=1, padx=5, pady=5, sticky="w")
+        self.suggest_components_button.grid(row=17, column=2, padx=5, pady=5)
 
         self.top_n_label.grid(row=18, column=0, padx=5, pady=5, sticky="e")
         self.top_n_entry.grid(row=18, column=1, padx=5, pady=5, sticky="w")
@@ -556,6 +619,7 @@ class PCAAnalysisApp:
 
         # Feature Grouping Section
         self.grouping_checkbox.grid(row=22, column=0, sticky="w", padx=5, pady=5)
+        self.loading_intervals_checkbox.grid(row=22, column=1, sticky="w", padx=5, pady=5)
         # self.mapping_label.grid(row=21, column=1, padx=5, pady=5, sticky="e")
         self.mapping_button.grid(row=23, column=0, columnspan=2, padx=5, pady=5, sticky="w")
         self.palette_label.grid(row=24, column=0, padx=5, pady=5, sticky="e")
@@ -567,7 +631,8 @@ class PCAAnalysisApp:
         self.clustering_dropdown.grid(row=26, column=1, padx=5, pady=5, sticky="w")
         self.num_clusters_label.grid(row=27, column=0, padx=5, pady=5, sticky="e")
         self.num_clusters_entry.grid(row=27, column=1, padx=5, pady=5, sticky="w")
-        self.run_clustering_button.grid(row=28, column=0, columnspan=2, padx=5, pady=5)
+        self.run_clustering_button.grid(row=28, column=0, padx=5, pady=5)
+        self.cluster_sweep_button.grid(row=28, column=1, padx=5, pady=5)
 
         # Heatmap Section
         self.focus_label.grid(row=29, column=0, padx=5, pady=5, sticky="e")
@@ -580,6 +645,7 @@ class PCAAnalysisApp:
 
         # Save Button
         self.save_button.grid(row=32, column=2, padx=5, pady=5)
+        self.export_projector_button.grid(row=31, column=2, padx=5, pady=5)
 
         # Configure remaining row weights
         for i in range(32):
@@ -593,12 +659,57 @@ class PCAAnalysisApp:
             file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
             if file_path:
                 self.file_path = file_path  # Save the file path for later use
-                self.data = load_file(file_path)
+                self.file_paths = None
+                self.sample_metadata = None
+                self.is_cleaned = False
+                self.data = load_file(file_path, float_dtype=np.float32 if self.use_float32.get() else None)
+                self.encoding_info = self.data.attrs.get('encoding')
+                self.parallel_analysis_results = None
+                self.start_profiling([file_path])
                 self.handle_successful_load(file_path)
         except Exception as e:
             self.handle_load_error(e)
             self.handle_load_error(e)
 
+    def load_multiple_files(self):
+        """Load several CSV files (e.g. one per season or site) and concatenate them."""
+        try:
+            file_paths = filedialog.askopenfilenames(filetypes=[("CSV files", "*.csv")])
+            if not file_paths:
+                return
+            results = load_files(file_paths, float_dtype=np.float32 if self.use_float32.get() else None)
+            self.file_path = file_paths[0]
+            self.file_paths = list(file_paths)
+            self.sample_metadata = None
+            self.is_cleaned = False
+            self.data = results['data']
+            self.encoding_info = None
+            self.parallel_analysis_results = None
+            self.start_profiling(file_paths)
+
+            report = results['schema_report']
+            lines = []
+            for _, entry in report.iterrows():
+                name = os.path.basename(entry['file'])
+                if entry['error']:
+                    lines.append(f"{name}: skipped ({entry['error']})")
+                    continue
+                if entry['missing_columns']:
+                    lines.append(f"{name}: missing {', '.join(entry['missing_columns'])}")
+                if entry['type_conflicts']:
+                    lines.append(f"{name}: type differs for {', '.join(entry['type_conflicts'])}")
+                if entry['duplicate_columns']:
+                    lines.append(f"{name}: duplicate columns {', '.join(entry['duplicate_columns'])}")
+
+            message = f"Loaded {results['n_files']} of {len(file_paths)} files ({self.data.shape[0]} rows)."
+            if lines:
+                message += "\n\nSchema differences:\n" + "\n".join(lines)
+            messagebox.showinfo("Files Loaded", message)
+            self.update_data_info()
+            self.run_button.config(state="normal")
+        except Exception as e:
+            self.handle_load_error(e)
+
     def run_analysis(self):
         """Execute PCA analysis."""
         if not self.validate_data_exists():
@@ -616,18 +727,18 @@ class PCAAnalysisApp:
             # Drop valid columns
             self.data.drop(columns=drop_columns, inplace=True)
 
-            # Standardize the data for PCA
-            self.standardized_data = self.pca_analyzer.standardize_data(self.data)
-
-            # Run PCA analysis and store the results
+            # Run PCA analysis (standardization happens once, inside the analyzer) and store the results
             results = self.pca_analyzer.analyze(
-                data=self.standardized_data,
+                data=self.data,
                 n_components=n_components,
+                cache=self.analysis_cache
             )
 
             # Store the PCA model and transformed data
             self.pca_model = results['model']
+            self.standardized_data = self.pca_analyzer.standardized_data
             self.transformed_data = results['transformed_data']  # Ensure this is created here
+            self.loading_intervals = None  # Bootstrap intervals belong to the previous model
 
             # Update the display or state
             self.update_results_display(results)
@@ -691,15 +802,104 @@ class PCAAnalysisApp:
             # Update GUI display
             self.update_data_info()
 
+            message = f"Clustering completed successfully using {algorithm} with {clustering_results['num_clusters']} clusters!"
+            if 'n_noise' in clustering_results:
+                message += f"\n{clustering_results['n_noise']} samples were labelled as noise."
+            if 'stability' in clustering_results:
+                message += (f"\nMean stability over {clustering_results['n_resamples']} resamples: "
+                            f"{clustering_results['stability'].mean():.2f}")
+            messagebox.showinfo("Success", message)
+
+        except ValueError as ve:
+            messagebox.showerror("Clustering Error", str(ve))
+        except Exception as e:
+            messagebox.showerror("Error", f"Clustering failed: {str(e)}")
+
+    def run_config_sweep(self):
+        """Run PCA for every cleaning configuration and save a comparison table."""
+        try:
+            if not hasattr(self, 'file_path') or not self.file_path:
+                raise ValueError("No file loaded. Please load a CSV file first.")
+            n_components = int(self.components_entry.get())
+
+            drop_lists = {'none': [], 'default': DEFAULT_COLUMNS_TO_DROP}
+            if self.get_columns_to_drop():
+                drop_lists['user'] = self.get_columns_to_drop()
+
+            timestamp = time.strftime("%Y%m%d-%H%M%S")
+            output_path = os.path.join(self.output_dir, f"config_sweep_{timestamp}.csv")
+            table = run_config_sweep(self.file_path, n_components, drop_lists=drop_lists, output_path=output_path)
+
+            failed = int((table['error'] != '').sum())
+            message = f"Compared {len(table)} configurations.\nTable saved to:\n{output_path}"
+            if failed:
+                message += f"\n{failed} configurations failed; see the 'error' column."
+            messagebox.showinfo("Sensitivity Sweep", message)
+
+        except ValueError as ve:
+            messagebox.showerror("Sensitivity Sweep Error", str(ve))
+        except Exception as e:
+            messagebox.showerror("Error", f"Sensitivity sweep failed: {str(e)}")
+
+    def suggest_components(self):
+        """Run parallel analysis and pre-fill the number of components."""
+        try:
+            if self.data is None:
+                raise ValueError("Please load a dataset first.")
+
+            self.parallel_analysis_results = self.pca_analyzer.parallel_analysis(data=self.data)
+            suggested = self.parallel_analysis_results['suggested_n_components']
+            self.components_entry.delete(0, tk.END)
+            self.components_entry.insert(0, str(suggested))
+
             messagebox.showinfo(
-                "Success",
-                f"Clustering completed successfully using {algorithm} with {num_clusters} clusters!",
+                "Parallel Analysis",
+                f"{suggested} components have eigenvalues above the "
+                f"{self.parallel_analysis_results['percentile']}th percentile of "
+                f"{self.parallel_analysis_results['n_permutations']} column-shuffled datasets.\n"
+                f"The scree plot now shows the null envelope."
             )
 
+        except ValueError as ve:
+            messagebox.showerror("Parallel Analysis Error", str(ve))
+        except Exception as e:
+            messagebox.showerror("Error", f"Parallel analysis failed: {str(e)}")
+
+    def run_cluster_sweep(self):
+        """Fit k-means over a range of k and show the elbow/silhouette chart."""
+        try:
+            if not hasattr(self, "pca_model") or self.pca_model is None:
+                raise ValueError("Please run PCA analysis first.")
+            if len(self.transformed_data) < 3:
+                raise ValueError(f"The cluster sweep needs at least 3 samples; "
+                                 f"the PCA scores have {len(self.transformed_data)}.")
+
+            # Sweep at least up to 10 clusters, further if the user asked for more
+            try:
+                max_k = max(10, int(self.num_clusters_entry.get()))
+            except ValueError:
+                max_k = 10
+            max_k = min(max_k, len(self.transformed_data) - 1)
+
+            sweep_results = self.cluster_analyzer.k_sweep(self.transformed_data, range(2, max_k + 1))
+
+            self.reset_canvas()
+            sweep_visualizer = ClusterSweepVisualizer(self.fig, self.ax)
+            sweep_visualizer.create_sweep_plot(sweep_results)
+            self.canvas.draw()
+
+            if sweep_results['best_k'] is not None:
+                self.num_clusters_entry.delete(0, tk.END)
+                self.num_clusters_entry.insert(0, str(sweep_results['best_k']))
+                messagebox.showinfo(
+                    "Cluster Sweep",
+                    f"Best silhouette at k = {sweep_results['best_k']}. The number of clusters has been updated."
+                )
+
         except ValueError as ve:
             messagebox.showerror("Clustering Error", str(ve))
         except Exception as e:
-            messagebox.showerror("Error", f"Clustering failed: {str(e)}")
+            messagebox.showerror("Error", f"Cluster sweep failed: {str(e)}")
 
     def process_data(self):
         """Process data according to user selections."""
@@ -709,6 +909,9 @@ class PCAAnalysisApp:
         try:
             # Check user-selected columns to drop
             drop_columns = self.get_columns_to_drop()
+            if self.is_cleaned:
+                # clean_data already pruned these (and the defaults) at load, matching names case-insensitively
+                drop_columns = [col for col in drop_columns if col in self.data.columns]
 
             # Prepare data using PCAAnalyzer
             prepared_data, missing_cols = self.pca_analyzer.prepare_data(
@@ -723,6 +926,7 @@ class PCAAnalysisApp:
 
             # Update internal data with prepared data
             self.data = prepared_data
+            self.parallel_analysis_results = None
             print(f"Data processed successfully. Shape after preparation: {self.data.shape}")
 
             # Inform user if any specified columns were missing
@@ -760,17 +964,19 @@ class PCAAnalysisApp:
             return
 
         try:
-            # Detect file encoding and load the data
-            with open(self.file_path, 'rb') as file:
-                result = chardet.detect(file.read())
-            encoding = result['encoding']
-            self.data = pd.read_csv(self.file_path, encoding=encoding)
+            # Reload only the columns that survive the drop lists (served from the columnar cache when unchanged).
+            # ID and metadata columns are gone from here on, except the ones set aside below.
+            load_options = dict(drop_columns=self.get_columns_to_drop(), default_columns_to_drop=DEFAULT_COLUMNS_TO_DROP,
+                                keep=['bbch'] + METADATA_COLUMNS, float_dtype=self.pca_analyzer.dtype)
+            if getattr(self, 'file_paths', None):
+                self.data = load_files(self.file_paths, **load_options)['data']
+            else:
+                self.data = load_columns(self.file_path, **load_options)
+            self.parallel_analysis_results = None
             self.data.replace([np.inf, -np.inf], np.nan, inplace=True)
 
-            # Convert int64 to float for PCA compatibility
-            for col in self.data.columns:
-                if self.data[col].dtype == 'int64':
-                    self.data[col] = self.data[col].astype(float)
+            # Convert int64 to float (float32 in float32 mode) for PCA compatibility
+            cast_numeric_columns(self.data, self.pca_analyzer.dtype)
 
             # Ensure BBCH column exists and is treated as string
             if 'bbch' in self.data.columns:
@@ -792,12 +998,14 @@ class PCAAnalysisApp:
             self.data.columns = self.data.columns.str.strip().str.lower()  # Standardize column names
             drop_columns = [col.strip().lower() for col in drop_columns]  # Ensure consistency
 
-            # Filter valid columns to drop
+            # Set IDs, event keys and the source file aside (row-aligned) so they never become PCA features
+            metadata_columns = [col.lower() for col in METADATA_COLUMNS + [SOURCE_COLUMN]
+                                if col.lower() in self.data.columns]
+            self.sample_metadata = self.data[metadata_columns].reset_index(drop=True)
+            self.data.drop(columns=metadata_columns, inplace=True)
+
+            # Most columns were pruned at load; BBCH is kept for filtering and dropped here if requested
             valid_columns_to_drop = [col for col in drop_columns if col in self.data.columns]
-            missing_columns = set(drop_columns) - set(self.data.columns)
-            if missing_columns:
-                print(
-                    f"Warning: The following columns were not found in the dataset and could not be dropped: {missing_columns}")
             self.data.drop(columns=valid_columns_to_drop, inplace=True, errors='ignore')
 
             # Drop non-numeric columns except BBCH
@@ -856,6 +1064,9 @@ class PCAAnalysisApp:
 
         # Clear the entire figure
         self.fig.clear()
+        self.similar_artists = []
+        self.showing_scores = False
+        self.showing_biplot = False
 
         # Create a fresh subplot
         self.ax = self.fig.add_subplot(111)
@@ -889,6 +1100,7 @@ class PCAAnalysisApp:
                 target=target_variable,
                 target_mode=self.target_mode.get().strip().lower()
             )
+            self.showing_scores = True
 
             # Redraw the canvas
             self.canvas.draw()
@@ -897,6 +1109,52 @@ class PCAAnalysisApp:
             messagebox.showerror("Visualization Error", str(e))
 
 
+    def get_sample_ids(self):
+        """Sample IDs for the analysed rows: the SampleID column when present, else the row labels."""
+        # clean_data sets SampleID aside with the other metadata, row-aligned with the cleaned data
+        for frame in (self.sample_metadata, self.data):
+            if frame is None or frame.shape[0] != self.data.shape[0]:
+                continue
+            for col in ('SampleID', 'sampleid'):
+                if col in frame.columns:
+                    return frame[col].to_numpy()
+        return self.data.index.to_numpy()
+
+    def on_canvas_click(self, event):
+        """Highlight the samples most similar to the clicked point of a PC1/PC2 scatter."""
+        if not self.find_similar_on_click.get() or not self.showing_scores:
+            return
+        if event.inaxes is not self.ax or event.xdata is None:
+            return
+        try:
+            if self.pca_model is None or self.data is None:
+                return
+
+            index = self.pca_analyzer.get_sample_index(self.get_sample_ids())
+            row = index.locate(event.xdata, event.ydata)
+            similar = index.knn(row=row)
+
+            # Plots show PC1/PC2, so highlight in that plane
+            selected = index.scores[row]
+            neighbors = index.scores[similar['neighbor_rows']]
+            for artist in self.similar_artists:
+                artist.remove()
+            self.similar_artists = [
+                self.ax.scatter(neighbors[:, 0], neighbors[:, 1], s=120, facecolors='none',
+                                edgecolors='orange', linewidths=2, zorder=5),
+                self.ax.scatter([selected[0]], [selected[1]], s=160, marker='*', color='red', zorder=6)
+            ]
+            self.canvas.draw_idle()
+
+            lines = [f"Samples most similar to {similar['sample_id']}:"]
+            lines += [f"  {sample_id}  (distance {distance:.3f})"
+                      for sample_id, distance in zip(similar['neighbor_ids'], similar['distances'])]
+            self.pcaresults_summary.delete(1.0, tk.END)
+            self.pcaresults_summary.insert(tk.END, "\n".join(lines))
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Similar sample search failed: {str(e)}")
+
     def visualize_clustering(self, clustering_results):
         """Visualize clustering results in the PCA space."""
         try:
@@ -911,8 +1169,14 @@ class PCAAnalysisApp:
             unique_clusters = np.unique(cluster_labels)
             colors = plt.cm.tab10(np.linspace(0, 1, len(unique_clusters)))  # Use distinct colors for clusters
 
+            noise_label = clustering_results.get('noise_label')
             for cluster, color in zip(unique_clusters, colors):
                 cluster_points = transformed_data[cluster_labels == cluster]
+                if cluster == noise_label:
+                    # Density-based noise points are drawn small and grey beneath the clusters
+                    self.ax.scatter(cluster_points[:, 0], cluster_points[:, 1],
+                                    label="Noise", color="lightgrey", s=10, alpha=0.5, zorder=0)
+                    continue
                 self.ax.scatter(cluster_points[:, 0], cluster_points[:, 1],
                                 label=f"Cluster {cluster}", color=color, alpha=0.7)
 
@@ -921,6 +1185,7 @@ class PCAAnalysisApp:
             self.ax.set_xlabel("Principal Component 1")
             self.ax.set_ylabel("Principal Component 2")
             self.ax.legend()
+            self.showing_scores = True
 
             # Redraw the canvas
             self.canvas.draw()
@@ -938,7 +1203,7 @@ class PCAAnalysisApp:
             self.reset_canvas()
 
             scree_visualizer = ScreePlotVisualizer(self.fig, self.ax)
-            scree_visualizer.create_scree_plot(self.pca_model)
+            scree_visualizer.create_scree_plot(self.pca_model, parallel_analysis=self.parallel_analysis_results)
 
             self.canvas.draw()  # This ensures the new plot appears on the canvas
 
@@ -953,6 +1218,8 @@ class PCAAnalysisApp:
                 raise ValueError("Please run PCA analysis first.")
             if self.transformed_data is None:
                 raise ValueError("PCA-transformed data is missing. Run PCA analysis first.")
+            if getattr(self.pca_model, 'is_kernel', False):
+                raise ValueError("Kernel PCA components have no feature loading vectors to draw in a biplot.")
 
             # Reset the canvas for fresh plotting
             self.reset_canvas()
@@ -973,6 +1240,11 @@ class PCAAnalysisApp:
             if target_variable and target_variable not in self.data.columns:
                 raise ValueError(f"Target variable '{target_variable}' not found in the dataset.")
 
+            # Bootstrap the loadings once per fitted model, off the main loop;
+            # the biplot is redrawn with the intervals when they arrive
+            if self.show_loading_intervals.get() and self.loading_intervals is None:
+                self.start_bootstrap()
+
             # Create biplot using the BiplotVisualizer
             biplot_visualizer = BiplotVisualizer(self.fig, self.ax)
             biplot_visualizer.create_biplot(
@@ -984,7 +1256,8 @@ class PCAAnalysisApp:
                 top_n=top_n,
                 text_distance=text_distance,
                 focus_on_loadings=self.focus_on_loadings.get(),
-                target=target_variable
+                target=target_variable,
+                loading_intervals=self.loading_intervals if self.show_loading_intervals.get() else None
             )
 
             # Improve visual clarity
@@ -994,15 +1267,51 @@ class PCAAnalysisApp:
 
             # Draw the updated canvas
             self.canvas.draw()
+            self.showing_biplot = True
 
         except Exception as e:
             messagebox.showerror("Biplot Error", str(e))
 
+    def start_bootstrap(self):
+        """Bootstrap the current model's loadings on a background thread."""
+        model = self.pca_model
+        if self.bootstrapping_model is model:
+            return  # Already running for this model
+        self.bootstrapping_model = model
+        print("Bootstrapping loading intervals in the background...")
+
+        def work():
+            try:
+                if self.pca_analyzer.pca_model is not model:
+                    return  # A new analysis replaced the model before the thread started
+                results = self.pca_analyzer.bootstrap_loadings()
+            except Exception as e:
+                results = {'error': str(e)}
+            # Tk widgets may only be touched from the main loop
+            self.master.after(0, self.finish_bootstrap, model, results)
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def finish_bootstrap(self, model, results):
+        """Keep finished intervals and redraw the biplot if it is still showing."""
+        if self.bootstrapping_model is model:
+            self.bootstrapping_model = None
+        if model is not self.pca_model:
+            return  # Intervals of a model that has since been replaced
+        if 'error' in results:
+            messagebox.showerror("Biplot Error", f"Bootstrapping the loadings failed: {results['error']}")
+            return
+        self.loading_intervals = results
+        if self.showing_biplot and self.show_loading_intervals.get():
+            self.create_biplot()
+
     def create_interactive_biplot(self):
         """Create an interactive biplot visualization."""
         try:
             if not hasattr(self, 'pca_model') or self.pca_model is None:
                 raise ValueError("Please run PCA analysis first")
+            if getattr(self.pca_model, 'is_kernel', False):
+                raise ValueError("Kernel PCA components have no feature loading vectors to draw in a biplot.")
 
             interactive_visualizer = InteractiveBiplotVisualizer()
             fig = interactive_visualizer.create_interactive_biplot(
@@ -1214,6 +1523,12 @@ class PCAAnalysisApp:
             messagebox.showerror("Error", f"Error determining focus columns: {str(e)}")
             return None
 
+    def update_precision(self):
+        """Switch analysis and clustering between float64 and float32."""
+        precision = 'float32' if self.use_float32.get() else 'float64'
+        self.pca_analyzer.set_precision(precision)
+        self.cluster_analyzer.set_precision(precision)
+
     def update_focus_on_loadings(self):
         """
         Update logic or perform actions based on the checkbox state.
@@ -1222,19 +1537,76 @@ class PCAAnalysisApp:
 
     #### 4. UI UPDATE METHODS ####
 
+    def start_profiling(self, file_paths):
+        """Profile the chosen file(s) in one streaming pass on a background thread."""
+        file_paths = list(file_paths)
+        self.data_profile = None
+        self.profiled_paths = file_paths
+
+        def work():
+            try:
+                profile = None
+                for path in file_paths:
+                    profile = merge_profiles(profile, profile_file(path))
+            except Exception as e:
+                profile = {'error': str(e)}
+            # Tk widgets may only be touched from the main loop
+            self.master.after(0, self.finish_profiling, file_paths, profile)
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def finish_profiling(self, file_paths, profile):
+        """Keep a finished profile and refresh the data panel if it is still showing."""
+        if file_paths != self.profiled_paths:
+            return  # Another file was chosen meanwhile
+        self.data_profile = profile
+        if self.pcaresults_summary.get('1.0', '1.end') == "Data Information":
+            self.update_data_info()
+
     def update_data_info(self):
         """Update display with simplified data information."""
         if self.validate_data_exists():
             # Simple, clean formatting
             info_text = "Data Information\n"
             info_text += "═══════════════\n\n"
-            info_text += f"Dataset Shape: {self.data.shape[0]} rows × {self.data.shape[1]} columns\n\n"
-            info_text += "Columns:\n"
-
-            # Simple column listing
-            columns = self.data.columns.tolist()
-            for i, col in enumerate(columns, 1):
-                info_text += f"{i}. {col}\n"
+            info_text += f"Dataset Shape: {self.data.shape[0]} rows × {self.data.shape[1]} columns\n"
+            if getattr(self, 'encoding_info', None):
+                info_text += (f"Encoding: {self.encoding_info['encoding']} "
+                              f"(confidence {self.encoding_info['confidence']:.2f}, {self.encoding_info['method']})\n")
+            info_text += "\n"
+
+            # Missing/inf counts, ranges and BBCH stages of the file as loaded, from start_profiling
+            profile = self.data_profile
+            if profile is None:
+                info_text += "Profiling the file in the background...\n"
+            elif 'error' in profile:
+                info_text += f"File profile unavailable: {profile['error']}\n"
+            else:
+                summary = summarize_profile(profile)
+                missing_columns = summary[summary['missing'] > 0]
+                info_text += f"File profile ({profile['rows']} rows as loaded):\n"
+                info_text += (f"Missing values: {int(summary['missing'].sum())} cells "
+                              f"in {len(missing_columns)} columns\n")
+                info_text += f"Infinite values: {int(summary['inf'].sum())}\n"
+                non_numeric = summary.loc[~summary['numeric'], 'column'].tolist()
+                if non_numeric:
+                    info_text += f"Non-numeric columns: {', '.join(map(str, non_numeric))}\n"
+                if profile['bbch_counts']:
+                    stages = ", ".join(f"{stage}: {count}" for stage, count in sorted(profile['bbch_counts'].items()))
+                    info_text += f"BBCH stages: {stages}\n"
+                info_text += "\nColumns:\n"
+
+                for i, row in enumerate(summary.itertuples(index=False), 1):
+                    info_text += f"{i}. {row.column}"
+                    if row.numeric:
+                        info_text += f" [{row.min:.4g} to {row.max:.4g}, mean {row.mean:.4g}]"
+                    else:
+                        info_text += " [non-numeric]"
+                    if row.missing:
+                        info_text += f", {row.missing_rate:.1%} missing"
+                    if row.inf:
+                        info_text += f", {row.inf} inf"
+                    info_text += "\n"
 
             # Update the results summary box
             self.pcaresults_summary.delete(1.0, tk.END)
@@ -1251,7 +1623,15 @@ class PCAAnalysisApp:
         # Basic Information
         summary += f"Number of components: {results['n_components']}\n"
         summary += f"Original shape: {results['original_shape']}\n"
-        summary += f"Prepared shape: {results['prepared_shape']}\n\n"
+        summary += f"Prepared shape: {results['prepared_shape']}\n"
+        summary += f"SVD solver: {results.get('svd_solver', 'n/a')}\n"
+        summary += f"Precision: {results.get('precision', 'float64')}\n"
+        if results.get('cache_hit'):
+            summary += "Loaded from cache\n"
+        if results.get('preprocessing_bytes'):
+            allocated_mb = sum(results['preprocessing_bytes'].values()) / 1e6
+            summary += f"Preprocessing memory: {allocated_mb:.1f} MB\n"
+        summary += "\n"
 
         # Explained Variance Section
         summary += "Explained Variance Ratios:\n"
@@ -1361,49 +1741,31 @@ class PCAAnalysisApp:
         except Exception as e:
             messagebox.showerror("Save Error", f"Could not save plot: {str(e)}")
 
+    def export_projector(self):
+        """Export the fitted model for scoring new files with the standalone projector."""
+        try:
+            if not hasattr(self, "pca_model") or self.pca_model is None:
+                raise ValueError("Please run PCA analysis first.")
+            path = filedialog.asksaveasfilename(defaultextension=".npz",
+                                                filetypes=[("Projector files", "*.npz")],
+                                                initialdir=self.output_dir)
+            if not path:
+                return
+            self.pca_analyzer.export_projector(path)
+            messagebox.showinfo("Success", f"Projector saved at:\n{path}")
 
+        except ValueError as ve:
+            messagebox.showerror("Export Error", str(ve))
+        except Exception as e:
+            messagebox.showerror("Export Error", f"Could not export projector: {str(e)}")
 
 
+def main():
+    enable_frozen_workers()  # Must run before any window is created
+    root = tk.Tk()
+    PCAAnalysisApp(root)
+    root.mainloop()
 
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,12 @@
 # constants.py
 OUTPUT_DIR = 'KUpca_plots_output5'
 
+CACHE_DIR = '.kupca_cache'  # On-disk cache for PCA results
+CACHE_MAX_BYTES = 512 * 1024 * 1024  # Evict least recently used entries beyond this size
+TABLE_CACHE_DIR = '.kupca_cache/tables'  # Columnar copies of parsed CSV files
+TABLE_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+ENCODING_CACHE_PATH = '.kupca_cache/encodings.json'  # Detected encodings by file fingerprint
+
 FEATURE_GROUPS_COLORS = {
     "FAB": "black",
     "non-FAB": "silver",
@@ -14,4 +20,8 @@ DEFAULT_COLUMNS_TO_DROP = [
     'trees.assessed', 'flower.clusters.assessed', 'Year', 'treat',
     'Rep', 'SideFlowerStrip', 'SideFlowerStrip_E',
     'SideFlowerStrip_W', 'SideFlowerStrip_preflow'
-]
\ No newline at end of file
+]
+
+# Sample IDs and event keys kept through column-pruned loading (they sit in DEFAULT_COLUMNS_TO_DROP)
+# so cleaned data can still be ordered and labelled; clean_data sets them aside from the PCA features
+METADATA_COLUMNS = ['SampleID', 'Year', 'EventId']
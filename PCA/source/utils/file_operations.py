@@ -1,17 +1,424 @@
+import hashlib
+import json
 import os
 import time
-import chardet
+from chardet import UniversalDetector
 import pandas as pd
 
+from source.utils.constant import DEFAULT_COLUMNS_TO_DROP, ENCODING_CACHE_PATH, TABLE_CACHE_DIR, TABLE_CACHE_MAX_BYTES
+from source.utils.parallel import map_tasks, resolve_n_jobs
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # Without pyarrow every load parses the CSV
+    pa = feather = None
+
 OUTPUT_DIR = "output"  # Default directory for saving plots
+DEFAULT_CHUNKSIZE = 50000  # Rows per chunk for streaming reads
+TABLE_CACHE_VERSION = 2
+ENCODING_SAMPLE_BYTES = 64 * 1024  # Size of each of the head, middle and tail samples
+ENCODING_MIN_CONFIDENCE = 0.8  # Below this the whole file is scanned
+ENCODING_CACHE_ENTRIES = 1000
+CATEGORICAL_COLUMNS = ('bbch',)  # Low-cardinality labels stored as categoricals
+SOURCE_COLUMN = 'source'  # Names the file each row came from in multi-file loads
+
+
+def load_file(file_path, float_dtype=None, use_cache=True):
+    """Load and validate CSV file, optionally casting numeric columns to float_dtype.
+
+    Parsed files are kept as uncompressed Feather copies in TABLE_CACHE_DIR, so
+    reopening an unchanged file is a columnar read with no encoding detection or
+    CSV parsing. The detected encoding and its confidence are attached as data.attrs['encoding'].
+    """
+    data = read_table_cache(file_path) if use_cache else None
+    if data is None:
+        data = parse_csv(file_path, lambda encoding: pd.read_csv(file_path, encoding=encoding), use_cache)
+        if use_cache:
+            write_table_cache(file_path, data, data.attrs['encoding'])
+    if float_dtype is not None:
+        data = cast_numeric_columns(data, float_dtype)
+    return data
+
+
+def load_files(file_paths, float_dtype=None, n_jobs=None, source_column=SOURCE_COLUMN,
+               drop_columns=None, default_columns_to_drop=DEFAULT_COLUMNS_TO_DROP, keep=()):
+    """Load several CSV files in parallel and concatenate them into one frame.
+
+    Column names are normalized (stripped, lower-cased) as in run_analysis, so
+    'Site' and ' site' line up. Columns missing from a file are filled with NaN and a
+    source column records each row's file. A file that cannot be parsed is reported
+    and skipped rather than failing the batch. When drop_columns is given (even empty),
+    each file is loaded column-pruned as in load_columns. Returns a dict with the
+    combined data and a per-file schema report.
+    """
+    file_paths = list(file_paths)
+    if not file_paths:
+        raise ValueError("No files given.")
+    tasks = [(path, float_dtype, drop_columns, default_columns_to_drop, tuple(keep)) for path in file_paths]
+    loaded = map_tasks(load_normalized, tasks, n_jobs=resolve_n_jobs(n_jobs, len(file_paths)))
+
+    frames = {path: result['data'] for path, result in zip(file_paths, loaded) if result['data'] is not None}
+    if not frames:
+        raise ValueError("None of the files could be loaded.")
+    all_columns = list(dict.fromkeys(col for frame in frames.values() for col in frame.columns))
+    if source_column in all_columns:
+        raise ValueError(f"Column '{source_column}' already exists; choose another source column name.")
+
+    # A column conflicts when the files that have it do not all agree on its kind of dtype
+    kinds = {}
+    for frame in frames.values():
+        for col in frame.columns:
+            kinds.setdefault(col, set()).add(dtype_kind(frame[col].dtype))
+    conflicting = {col for col, col_kinds in kinds.items() if len(col_kinds) > 1}
+
+    report = []
+    for path, result in zip(file_paths, loaded):
+        frame = result['data']
+        entry = {'file': path, 'rows': 0, 'columns': 0, 'missing_columns': [], 'type_conflicts': [],
+                 'duplicate_columns': result['duplicate_columns'], 'error': result['error']}
+        if frame is not None:
+            entry.update(
+                rows=frame.shape[0],
+                columns=frame.shape[1],
+                missing_columns=[col for col in all_columns if col not in frame.columns],
+                type_conflicts=[f"{col} ({dtype_kind(frame[col].dtype)})"
+                                for col in frame.columns if col in conflicting]
+            )
+        report.append(entry)
+    report = pd.DataFrame(report)
+
+    for path, frame in frames.items():
+        frame[source_column] = os.path.basename(path)
+    data = pd.concat(list(frames.values()), ignore_index=True, sort=False)
+    data[source_column] = data[source_column].astype('category')
+
+    mismatched = report[(report['error'].notna()) | (report['missing_columns'].str.len() > 0)
+                        | (report['type_conflicts'].str.len() > 0) | (report['duplicate_columns'].str.len() > 0)]
+    print(f"Loaded {len(frames)} of {len(file_paths)} files: {data.shape[0]} rows, "
+          f"{len(all_columns)} columns ({len(mismatched)} files with schema differences)")
+    return {'data': data, 'schema_report': report, 'n_files': len(frames)}
+
+
+def dtype_kind(dtype):
+    """Coarse kind of a column dtype; integer and float widths do not conflict with each other."""
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'boolean'
+    if pd.api.types.is_numeric_dtype(dtype):
+        return 'numeric'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'datetime'
+    return 'text'
+
+
+def load_normalized(file_path, float_dtype=None, drop_columns=None, default_columns_to_drop=DEFAULT_COLUMNS_TO_DROP,
+                    keep=()):
+    """Load one file with normalized column names; errors are returned, not raised, for batch loads."""
+    try:
+        if drop_columns is None:
+            data = load_file(file_path, float_dtype=float_dtype)
+        else:
+            data = load_columns(file_path, drop_columns=drop_columns, default_columns_to_drop=default_columns_to_drop,
+                                keep=keep, float_dtype=float_dtype)
+    except Exception as e:
+        return {'data': None, 'duplicate_columns': [], 'error': f"{type(e).__name__}: {e}"}
+    data.columns = data.columns.str.strip().str.lower()
+    duplicated = data.columns.duplicated()
+    duplicate_columns = data.columns[duplicated].tolist()
+    if duplicate_columns:
+        data = data.loc[:, ~duplicated]  # Keep the first of columns that collide after normalization
+    return {'data': data, 'duplicate_columns': duplicate_columns, 'error': None}
+
+
+def load_columns(file_path, drop_columns=None, default_columns_to_drop=DEFAULT_COLUMNS_TO_DROP, keep=(),
+                 float_dtype=None, use_cache=True, chunksize=DEFAULT_CHUNKSIZE):
+    """Load only the columns that survive the drop lists, with compact dtypes.
+
+    Drop names are matched against the header case-insensitively (as clean_data
+    standardizes names) before parsing, so dropped columns are never materialized.
+    Integer columns are downcast to the smallest integer type chunk by chunk and
+    CATEGORICAL_COLUMNS load as categoricals. Columns named in keep are never dropped.
+    """
+    encoding = detect_encoding(file_path, use_cache=use_cache)['encoding']
+    header = pd.read_csv(file_path, encoding=encoding, nrows=0).columns.tolist()
+    usecols = resolve_usecols(header, drop_columns or [], keep, default_columns_to_drop or [])
+
+    data = read_table_cache(file_path, columns=usecols) if use_cache else None
+    if data is None:
+        def parse(encoding):
+            with pd.read_csv(file_path, encoding=encoding, usecols=usecols, chunksize=chunksize) as reader:
+                chunks = [downcast_columns(chunk, categorical=()) for chunk in reader]
+            return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=usecols)
+
+        data = parse_csv(file_path, parse, use_cache)
+    data = downcast_columns(data)
+    if float_dtype is not None:
+        data = cast_numeric_columns(data, float_dtype)
+    return data
+
+
+def parse_csv(file_path, parse, use_cache=True):
+    """Run parse(encoding) with the detected encoding, rescanning once if decoding fails."""
+    encoding_info = detect_encoding(file_path, use_cache=use_cache)
+    try:
+        data = parse(encoding_info['encoding'])
+    except UnicodeDecodeError:
+        # The samples missed the non-ASCII bytes; scan the whole file and retry
+        encoding_info = detect_encoding(file_path, full_scan=True, use_cache=use_cache)
+        data = parse(encoding_info['encoding'])
+    data.attrs['encoding'] = encoding_info
+    return data
+
+
+def resolve_usecols(header, drop_columns, keep=(), default_columns_to_drop=()):
+    """Header columns not in either drop list, comparing stripped, lower-cased names.
+
+    Only user-requested columns missing from the header are reported; absent defaults are expected.
+    """
+    def normalize(columns):
+        return {str(col).strip().lower() for col in columns}
+
+    dropped = (normalize(drop_columns) | normalize(default_columns_to_drop)) - normalize(keep)
+    usecols = [col for col in header if str(col).strip().lower() not in dropped]
+    missing = normalize(drop_columns) - normalize(header)
+    if missing:
+        print(f"Warning: The following columns were not found in the dataset and could not be dropped: {missing}")
+    return usecols
+
+
+def downcast_columns(data, categorical=CATEGORICAL_COLUMNS):
+    """Downcast integer columns to the smallest integer type and store label columns as categoricals."""
+    categorical = {col.lower() for col in categorical}
+    for col in data.columns:
+        dtype = data[col].dtype
+        if pd.api.types.is_integer_dtype(dtype):
+            data[col] = pd.to_numeric(data[col], downcast='integer')
+        elif str(col).strip().lower() in categorical and not isinstance(dtype, pd.CategoricalDtype):
+            data[col] = data[col].astype('category')
+    return data
+
+
+def table_cache_paths(file_path, cache_dir=TABLE_CACHE_DIR):
+    """Feather and metadata paths of the cached copy of a file, keyed on its absolute path."""
+    key = hashlib.blake2b(os.path.abspath(file_path).encode(), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, f"{key}.feather"), os.path.join(cache_dir, f"{key}.json")
+
 
+def read_table_cache(file_path, cache_dir=TABLE_CACHE_DIR, columns=None):
+    """Return the cached DataFrame (optionally only some columns) for an unchanged file, or None on a miss.
 
-def load_file(file_path):
-    """Load and validate CSV file."""
+    A file counts as unchanged while its path, size and mtime match the cached copy;
+    touching or copying a file back therefore re-parses it once.
+    """
+    if feather is None:
+        return None
+    table_path, meta_path = table_cache_paths(file_path, cache_dir)
+    if not (os.path.exists(table_path) and os.path.exists(meta_path)):
+        return None
+    with open(meta_path) as file:
+        meta = json.load(file)
+    stat = os.stat(file_path)
+    if (meta.get('version') != TABLE_CACHE_VERSION or meta.get('path') != os.path.abspath(file_path)
+            or meta.get('size') != stat.st_size or meta.get('mtime_ns') != stat.st_mtime_ns):
+        return None
+
+    try:
+        data = feather.read_table(table_path, columns=columns).to_pandas()
+    except (OSError, pa.ArrowException) as e:
+        print(f"Discarding unreadable table cache {table_path}: {e}")
+        os.remove(table_path)
+        return None
+    data.attrs['encoding'] = dict(meta.get('encoding') or {}, method='cache')
+    os.utime(table_path)  # Mark as recently used for LRU eviction
+    print(f"Loaded {file_path} from the columnar cache")
+    return data
+
+
+def write_table_cache(file_path, data, encoding_info=None, cache_dir=TABLE_CACHE_DIR, max_bytes=TABLE_CACHE_MAX_BYTES):
+    """Store a freshly parsed file as uncompressed Feather and evict old entries."""
+    if feather is None:
+        return
+    table_path, meta_path = table_cache_paths(file_path, cache_dir)
+    stat = os.stat(file_path)
+    meta = {
+        'version': TABLE_CACHE_VERSION,
+        'path': os.path.abspath(file_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'encoding': encoding_info
+    }
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{table_path}.{os.getpid()}.tmp"
+    try:
+        feather.write_feather(data, tmp_path, compression='uncompressed')
+    except (OSError, TypeError, ValueError, pa.ArrowException) as e:
+        # Mixed-type object columns cannot be stored; such files are simply parsed every time
+        print(f"Could not cache {file_path} as a columnar table: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    os.replace(tmp_path, table_path)
+    _write_json(meta_path, meta)
+    evict_table_cache(cache_dir, max_bytes)
+
+
+def evict_table_cache(cache_dir=TABLE_CACHE_DIR, max_bytes=TABLE_CACHE_MAX_BYTES):
+    """Remove least recently used cached tables until the cache fits in max_bytes."""
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.feather'):
+            stat = os.stat(os.path.join(cache_dir, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(os.path.join(cache_dir, name))
+        meta_path = os.path.join(cache_dir, f"{name[:-len('.feather')]}.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        total -= size
+
+
+def _write_json(path, payload):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(payload, file)
+    os.replace(tmp_path, path)
+
+
+def cast_numeric_columns(data, float_dtype):
+    """Cast integer and float64 columns to float_dtype (e.g. float32 to halve memory) in place."""
+    for col in data.columns:
+        dtype = data[col].dtype
+        if (pd.api.types.is_integer_dtype(dtype) or dtype == 'float64') and dtype != float_dtype:
+            data[col] = data[col].astype(float_dtype)
+    return data
+
+
+def _feed_detector(blocks):
+    detector = UniversalDetector()
+    for block in blocks:
+        detector.feed(block)
+        if detector.done:
+            break
+    detector.close()
+    return detector.result
+
+
+def sample_blocks(file_path, block_size=ENCODING_SAMPLE_BYTES):
+    """Head, middle and tail blocks of a file (the whole file if it is small).
+
+    Middle and tail blocks start after their first newline so they never begin
+    inside a multi-byte character.
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as file:
+        if size <= 3 * block_size:
+            return [file.read()]
+        blocks = []
+        for offset in (0, (size - block_size) // 2, size - block_size):
+            file.seek(offset)
+            block = file.read(block_size)
+            blocks.append(block if offset == 0 else block[block.find(b'\n') + 1:])
+        return blocks
+
+
+def non_ascii_lines(file_path, limit=3 * ENCODING_SAMPLE_BYTES, block_size=1 << 20):
+    """Stream the file and collect up to `limit` bytes of lines containing non-ASCII bytes.
+
+    ASCII text carries no encoding evidence, so these lines are what a full scan needs;
+    detectors that only read a bounded prefix then still see them.
+    """
+    collected, total, carry = [], 0, b''
     with open(file_path, 'rb') as file:
-        result = chardet.detect(file.read())
-    encoding = result['encoding']
-    return pd.read_csv(file_path, encoding=encoding)
+        for block in iter(lambda: file.read(block_size), b''):
+            block = carry + block
+            cut = block.rfind(b'\n') + 1
+            block, carry = block[:cut], block[cut:]
+            if block.isascii():
+                continue
+            for line in block.splitlines(keepends=True):
+                if not line.isascii():
+                    collected.append(line)
+                    total += len(line)
+                    if total >= limit:
+                        return b''.join(collected)
+    if carry and not carry.isascii():
+        collected.append(carry)
+    return b''.join(collected)
+
+
+def sample_fingerprint(file_path, blocks):
+    """Cheap content fingerprint: file size plus the sampled blocks."""
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(str(os.path.getsize(file_path)).encode())
+    for block in blocks:
+        hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _load_encoding_store(path=ENCODING_CACHE_PATH):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_encoding(fingerprint, encoding_info, path=ENCODING_CACHE_PATH):
+    store = _load_encoding_store(path)
+    store.pop(fingerprint, None)
+    store[fingerprint] = encoding_info
+    for stale in list(store)[:max(0, len(store) - ENCODING_CACHE_ENTRIES)]:
+        del store[stale]  # Oldest entries first (dicts keep insertion order)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    _write_json(path, store)
+
+
+def detect_encoding(file_path, full_scan=False, use_cache=True, min_confidence=ENCODING_MIN_CONFIDENCE):
+    """Detect a file's encoding from head, middle and tail samples.
+
+    Escalates to a full streaming scan when the sample confidence is below
+    min_confidence. Results are remembered per sample fingerprint in
+    ENCODING_CACHE_PATH, so reopening the same file skips detection. Returns a dict
+    with encoding, confidence and method ('cache', 'sample' or 'full').
+    """
+    blocks = sample_blocks(file_path)
+    fingerprint = sample_fingerprint(file_path, blocks)
+    if use_cache and not full_scan:
+        cached = _load_encoding_store().get(fingerprint)
+        if cached is not None:
+            return dict(cached, method='cache')
+
+    result, method = None, 'full'
+    if not full_scan:
+        result, method = _feed_detector(blocks), 'sample'
+        sampled_whole_file = len(blocks) == 1
+        if not sampled_whole_file and (result['encoding'] is None or result['confidence'] < min_confidence):
+            result = None
+    if result is None:
+        evidence = non_ascii_lines(file_path)
+        result = _feed_detector([evidence]) if evidence else {'encoding': 'ascii', 'confidence': 1.0}
+        method = 'full'
+
+    encoding = result['encoding'] or 'utf-8'
+    if encoding.lower() == 'ascii':
+        encoding = 'utf-8'  # ASCII samples say nothing about unsampled bytes; UTF-8 is a superset
+    encoding_info = {'encoding': encoding, 'confidence': float(result['confidence'] or 0.0), 'method': method}
+    if use_cache:
+        _save_encoding(fingerprint, encoding_info)
+    return encoding_info
+
+
+def iter_csv_chunks(file_path, chunksize=DEFAULT_CHUNKSIZE, encoding=None, **read_kwargs):
+    """Yield the CSV as DataFrame chunks so memory is bounded by chunk size."""
+    if encoding is None:
+        encoding = detect_encoding(file_path)['encoding']
+    with pd.read_csv(file_path, encoding=encoding, chunksize=chunksize, **read_kwargs) as reader:
+        for chunk in reader:
+            yield chunk
 
 
 def save_plot(fig, filename_prefix="plot", output_dir=OUTPUT_DIR):
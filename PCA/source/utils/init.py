@@ -4,6 +4,8 @@ Utility functions and constants
 
 from constant import (
     OUTPUT_DIR,
+    CACHE_DIR,
+    CACHE_MAX_BYTES,
     FEATURE_GROUPS_COLORS,
     DEFAULT_COLUMNS_TO_DROP
 )
@@ -13,6 +15,8 @@ from helpers import generate_color_palette
 __all__ = [
     # Constants
     'OUTPUT_DIR',
+    'CACHE_DIR',
+    'CACHE_MAX_BYTES',
     'FEATURE_GROUPS_COLORS',
     'DEFAULT_COLUMNS_TO_DROP',
 
@@ -0,0 +1,127 @@
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from source.utils.shared_array import attach_array, share_array
+
+
+_worker_context = None  # State shared with every task: set once per worker, or around an inline run
+_frozen_workers = False  # Set by enable_frozen_workers; frozen builds run inline until then
+
+
+def _init_worker(context: Dict[str, Any], specs: Dict[str, Dict[str, Any]]):
+    global _worker_context
+    context = dict(context)
+    blocks = []
+    for name, spec in specs.items():
+        shm, context[name] = attach_array(spec)
+        blocks.append(shm)  # Keep the blocks mapped for the worker's lifetime
+    context['_shared_blocks'] = blocks
+    _worker_context = context
+
+
+def worker_context() -> Dict[str, Any]:
+    """Context of the running task (see imap_tasks)."""
+    return _worker_context
+
+
+def enable_frozen_workers():
+    """Call first in the entry point of a frozen (PyInstaller) build.
+
+    A spawned worker re-runs the frozen executable; freeze_support() makes it run its
+    task and exit instead of starting another GUI. Until this has been called, a
+    frozen build never starts worker processes.
+    """
+    global _frozen_workers
+    multiprocessing.freeze_support()
+    _frozen_workers = True
+
+
+def resolve_n_jobs(n_jobs: Optional[int] = None, n_tasks: Optional[int] = None) -> int:
+    """Worker count: all CPUs by default, never more than there are tasks."""
+    if getattr(sys, 'frozen', False) and not _frozen_workers:
+        return 1
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_tasks is not None:
+        n_jobs = min(n_jobs, n_tasks)
+    return max(n_jobs, 1)
+
+
+def split_blocks(n_items: int, n_blocks: int) -> List[List[int]]:
+    """Split range(n_items) into at most n_blocks contiguous blocks of indices."""
+    return [[int(i) for i in block] for block in np.array_split(np.arange(n_items), max(n_blocks, 1)) if len(block)]
+
+
+def _call(fn: Callable, index: int, task: tuple):
+    return index, fn(*task)
+
+
+def _imap_indexed(fn, tasks, n_jobs, context, shared) -> Iterator[tuple]:
+    global _worker_context
+    if n_jobs == 1:
+        previous = _worker_context
+        _worker_context = dict(context or {}, **(shared or {}))
+        try:
+            for index, task in enumerate(tasks):
+                yield index, fn(*task)
+        finally:
+            _worker_context = previous
+        return
+
+    blocks, specs = [], {}
+    try:
+        for name, array in (shared or {}).items():
+            shm, specs[name] = share_array(array)
+            blocks.append(shm)
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(context or {}, specs)) as executor:
+            # Keep only a couple of tasks per worker in flight so iterators over files stay bounded
+            pending = set()
+            for index, task in enumerate(tasks):
+                pending.add(executor.submit(_call, fn, index, task))
+                if len(pending) >= 2 * n_jobs:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def imap_tasks(
+        fn: Callable,
+        tasks: Iterable[tuple],
+        n_jobs: Optional[int] = None,
+        context: Optional[Dict[str, Any]] = None,
+        shared: Optional[Dict[str, np.ndarray]] = None
+) -> Iterator[Any]:
+    """Yield fn(*task) for every task, in completion order, from a process pool.
+
+    fn must be a module-level function. context is pickled to each worker once;
+    arrays in shared are copied into shared memory once and mapped by every worker.
+    Both are read inside fn through worker_context(). With n_jobs == 1 the tasks run
+    inline against the same context, so no process is started.
+    """
+    for _, result in _imap_indexed(fn, tasks, resolve_n_jobs(n_jobs), context, shared):
+        yield result
+
+
+def map_tasks(
+        fn: Callable,
+        tasks: Iterable[tuple],
+        n_jobs: Optional[int] = None,
+        context: Optional[Dict[str, Any]] = None,
+        shared: Optional[Dict[str, np.ndarray]] = None
+) -> List[Any]:
+    """Like imap_tasks, but return the results as a list in task order."""
+    results = dict(_imap_indexed(fn, tasks, resolve_n_jobs(n_jobs), context, shared))
+    return [results[index] for index in range(len(results))]
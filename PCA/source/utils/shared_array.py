@@ -0,0 +1,33 @@
+from multiprocessing import shared_memory
+from typing import Dict, Any, Tuple
+
+import numpy as np
+
+
+def share_array(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, Dict[str, Any]]:
+    """Copy an array into a new shared memory block once.
+
+    Returns the block (the caller owns it and must close() and unlink() it) and a
+    small picklable spec that worker processes pass to attach_array.
+    """
+    array = np.asarray(array)
+    order = 'F' if array.flags.f_contiguous and not array.flags.c_contiguous else 'C'
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf, order=order)
+    shared[...] = array
+    spec = {'name': shm.name, 'shape': array.shape, 'dtype': array.dtype.str, 'order': order}
+    return shm, spec
+
+
+def attach_array(spec: Dict[str, Any]) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """Map a shared array into this process without copying.
+
+    Keep the returned block referenced for as long as the array is in use.
+    """
+    try:
+        # The creating process owns the block; attachers must not unlink it on exit
+        shm = shared_memory.SharedMemory(name=spec['name'], track=False)
+    except TypeError:  # Python < 3.13 has no track argument
+        shm = shared_memory.SharedMemory(name=spec['name'])
+    array = np.ndarray(spec['shape'], dtype=np.dtype(spec['dtype']), buffer=shm.buf, order=spec['order'])
+    return shm, array
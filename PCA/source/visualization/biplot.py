@@ -26,9 +26,11 @@ class BiplotVisualizer(BasePlotter):
 
     def create_biplot(self, pca_model, x_standardized, data, feature_to_group=None,
                       feature_groups_colors=None, text_distance=1.1, top_n=10,
-                      enable_feature_grouping=False, significance_threshold=0.2, focus_on_loadings=False, target=None):
+                      enable_feature_grouping=False, significance_threshold=0.2, focus_on_loadings=False, target=None,
+                      loading_intervals=None):
         """
         Create a biplot visualization with optional feature grouping and significance-based filtering.
+        Pass bootstrap results as loading_intervals to draw confidence intervals at the arrow tips.
         """
         if not hasattr(pca_model, 'components_'):
             raise ValueError("Please run PCA analysis first.")
@@ -175,6 +177,10 @@ class BiplotVisualizer(BasePlotter):
                 self.ax.plot([], [], '-', color=color, label=feature_names[idx], linewidth=2)
             self.ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
 
+        if loading_intervals is not None:
+            drawn = [idx for idx in top_indices if loading_magnitudes[idx] >= significance_threshold]
+            self.draw_loading_intervals(loading_intervals, drawn, scaled_loadings, variance_scale)
+
         adjust_text(
             texts,
             arrowprops=dict(
@@ -214,6 +220,18 @@ class BiplotVisualizer(BasePlotter):
         # Equal aspect ratio for clarity
         self.ax.set_aspect('equal', adjustable='box')
 
+    def draw_loading_intervals(self, loading_intervals, indices, scaled_loadings, variance_scale):
+        """Draw bootstrap confidence intervals for PC1/PC2 loadings as error bars at the arrow tips."""
+        lower = loading_intervals['lower'][:, :2] * variance_scale
+        upper = loading_intervals['upper'][:, :2] * variance_scale
+        for idx in indices:
+            x, y = scaled_loadings[idx]
+            # Percentile intervals need not be symmetric around the point estimate
+            xerr = [[max(x - lower[idx, 0], 0)], [max(upper[idx, 0] - x, 0)]]
+            yerr = [[max(y - lower[idx, 1], 0)], [max(upper[idx, 1] - y, 0)]]
+            self.ax.errorbar(x, y, xerr=xerr, yerr=yerr, fmt='none', ecolor='black',
+                             elinewidth=0.8, capsize=2, alpha=0.6)
+
 
 class InteractiveBiplotVisualizer:
     """Exact match to original interactive biplot functionality."""
@@ -0,0 +1,35 @@
+from source.visualization.base import BasePlotter
+
+
+class ClusterSweepVisualizer(BasePlotter):
+    """Elbow and silhouette chart for a k-means sweep."""
+
+    def create_sweep_plot(self, sweep_results):
+        """
+        Plot inertia (elbow) and silhouette score against the number of clusters.
+        """
+        if sweep_results is None:
+            raise ValueError("Please run a cluster sweep first.")
+
+        self.clear_plot()
+        k_values = sweep_results['k_values']
+
+        # Elbow curve on the left axis
+        self.ax.plot(k_values, sweep_results['inertia'], marker='o', color='steelblue', label='Inertia')
+        self.ax.set_xlabel('Number of Clusters (k)')
+        self.ax.set_ylabel('Inertia', color='steelblue')
+        self.ax.set_xticks(k_values)
+
+        # Silhouette on a twin axis
+        silhouette_ax = self.ax.twinx()
+        silhouette_ax.plot(k_values, sweep_results['silhouette'], marker='s', color='darkorange',
+                           label='Silhouette')
+        silhouette_ax.set_ylabel('Silhouette Score', color='darkorange')
+
+        best_k = sweep_results.get('best_k')
+        if best_k is not None:
+            self.ax.axvline(best_k, color='gray', linestyle='--', alpha=0.6)
+
+        self.ax.set_title(f"Elbow and Silhouette (best k = {best_k})")
+        self.ax.grid(True, linestyle='--', alpha=0.3)
+        return silhouette_ax
\ No newline at end of file
@@ -8,6 +8,7 @@ from .biplot import BiplotVisualizer
 from .scree import ScreePlotVisualizer
 from .heatmap import LoadingsHeatmapVisualizer
 from .loadings import LoadingsProcessor
+from .cluster_sweep import ClusterSweepVisualizer
 
 __all__ = [
     'BasePlotter',
@@ -15,5 +16,6 @@ __all__ = [
     'BiplotVisualizer',
     'ScreePlotVisualizer',
     'LoadingsHeatmapVisualizer',
-    'LoadingsProcessor'
+    'LoadingsProcessor',
+    'ClusterSweepVisualizer'
 ]
\ No newline at end of file
@@ -8,9 +8,10 @@ from source.visualization.base import BasePlotter
 class ScreePlotVisualizer(BasePlotter):
     """Exact match to original scree plot functionality."""
 
-    def create_scree_plot(self, pca_model):
+    def create_scree_plot(self, pca_model, parallel_analysis=None):
         """
         Create a scree plot of explained variance.
+        Pass parallel analysis results to overlay the permutation null eigenvalue envelope.
         """
         # Ensure the figure and axes are valid
         if self.ax.figure is None:
@@ -42,7 +43,28 @@ class ScreePlotVisualizer(BasePlotter):
             label='Cumulative explained variance'
         )
 
+        if parallel_analysis is not None:
+            self.add_null_envelope(parallel_analysis, len(explained_variance))
+
         # Labels and title - exact match
         self.ax.set_xlabel('Principal Component Index')
         self.ax.set_ylabel('Explained Variance Ratio')
-        self.ax.set_title('Scree Plot')
\ No newline at end of file
+        self.ax.set_title('Scree Plot')
+
+    def add_null_envelope(self, parallel_analysis, n_components):
+        """Overlay the parallel analysis null envelope (as explained variance ratios)."""
+        components = np.arange(1, n_components + 1)
+        lower = parallel_analysis['null_lower_ratio'][:n_components]
+        upper = parallel_analysis['null_upper_ratio'][:n_components]
+
+        self.ax.fill_between(components, lower, upper, color='red', alpha=0.15, step='mid',
+                             label=f"Null envelope ({100 - parallel_analysis['percentile']:g}-"
+                                   f"{parallel_analysis['percentile']:g}th pct.)")
+        self.ax.plot(components, parallel_analysis['null_mean_ratio'][:n_components],
+                     color='red', linestyle='--', marker='.', label='Null mean (parallel analysis)')
+
+        suggested = parallel_analysis['suggested_n_components']
+        if suggested <= n_components:
+            self.ax.axvline(suggested + 0.5, color='gray', linestyle=':',
+                            label=f"Suggested components: {suggested}")
+        self.ax.legend()
\ No newline at end of file
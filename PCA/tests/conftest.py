@@ -0,0 +1,25 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The analysis modules import each other as source.<package>.<module>, relative to this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def correlated_frame():
+    """300 samples of 6 features driven by 2 latent factors plus noise."""
+    rng = np.random.default_rng(42)
+    latent = rng.normal(size=(300, 2))
+    values = latent @ rng.normal(size=(2, 6)) + 0.3 * rng.normal(size=(300, 6))
+    return pd.DataFrame(values, columns=[f"sp_{i}" for i in range(6)])
+
+
+def align_signs(components, reference):
+    """Flip rows of components to point the same way as the matching reference rows."""
+    signs = np.sign(np.sum(components * reference, axis=1))
+    signs[signs == 0] = 1.0
+    return components * signs[:, np.newaxis], signs
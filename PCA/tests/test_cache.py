@@ -0,0 +1,34 @@
+import os
+
+import numpy as np
+import pytest
+
+from source.analysis.cache import AnalysisCache
+from source.analysis.pca import PCAAnalyzer
+
+
+@pytest.mark.parametrize('engine', ['sklearn', 'covariance'])
+def test_cache_hit_equals_cold_fit(correlated_frame, tmp_path, engine):
+    cache = AnalysisCache(cache_dir=str(tmp_path / 'cache'))
+    cold = PCAAnalyzer().analyze(correlated_frame, 3, engine=engine, n_jobs=1, cache=cache)
+    warm_analyzer = PCAAnalyzer()
+    warm = warm_analyzer.analyze(correlated_frame, 3, engine=engine, n_jobs=1, cache=cache)
+
+    assert not cold['cache_hit'] and warm['cache_hit']
+    assert len(os.listdir(cache.cache_dir)) == 1
+    for key in ('components', 'explained_variance', 'transformed_data'):
+        np.testing.assert_allclose(warm[key], cold[key], atol=1e-12)
+    # The restored model keeps working on new rows
+    np.testing.assert_allclose(warm_analyzer.pca_model.transform(warm_analyzer.standardized_data),
+                               cold['transformed_data'], atol=1e-12)
+
+
+def test_changed_data_or_parameters_miss(correlated_frame, tmp_path):
+    cache = AnalysisCache(cache_dir=str(tmp_path / 'cache'))
+    PCAAnalyzer().analyze(correlated_frame, 3, cache=cache)
+
+    changed = correlated_frame.copy()
+    changed.iloc[0, 0] += 1.0
+    assert not PCAAnalyzer().analyze(changed, 3, cache=cache)['cache_hit']
+    assert not PCAAnalyzer().analyze(correlated_frame, 2, cache=cache)['cache_hit']
+    assert PCAAnalyzer().analyze(correlated_frame, 3, cache=cache)['cache_hit']
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from source.analysis.cluster_sweep import k_sweep
+
+
+@pytest.fixture
+def blobs():
+    rng = np.random.default_rng(0)
+    centers = rng.uniform(-10, 10, size=(5, 3))
+    return np.vstack([center + rng.normal(size=(80, 3)) for center in centers])
+
+
+def test_sweep_does_not_depend_on_n_jobs(blobs):
+    serial = k_sweep(blobs, range(2, 11), n_jobs=1)
+    parallel = k_sweep(blobs, range(2, 11), n_jobs=3)
+
+    assert serial['k_values'] == parallel['k_values'] == list(range(2, 11))
+    np.testing.assert_array_equal(serial['inertia'], parallel['inertia'])
+    np.testing.assert_array_equal(serial['silhouette'], parallel['silhouette'])
+    for k in serial['k_values']:
+        np.testing.assert_array_equal(serial['labels'][k], parallel['labels'][k])
+    assert serial['best_k'] == parallel['best_k'] == 5
+
+
+def test_sweep_rejects_fewer_than_three_samples():
+    with pytest.raises(ValueError, match="at least 3 samples"):
+        k_sweep(np.zeros((2, 2)), [1, 2], n_jobs=1)
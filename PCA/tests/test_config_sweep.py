@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from source.analysis.config_sweep import build_grid, run_config_sweep
+from source.analysis.pca import PCAAnalyzer
+
+
+@pytest.fixture
+def survey_csv(correlated_frame, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # The table and encoding caches live under the working directory
+    frame = correlated_frame.copy()
+    frame.iloc[[5, 50, 150], 2] = np.nan
+    frame.insert(0, 'BBCH', np.where(np.arange(frame.shape[0]) % 3 == 0, 'B59', 'B69'))
+    frame.insert(0, 'SampleID', [f"S{i}" for i in range(frame.shape[0])])
+    frame.to_csv('survey.csv', index=False)
+    return frame
+
+
+def test_grid_covers_every_combination():
+    grid = build_grid(['impute_mean', 'leave_empty'], [59, -1])
+    assert len(grid) == 2 * 2 * 2
+    with pytest.raises(ValueError, match="Unsupported BBCH stage"):
+        build_grid(bbch_stages=[42])
+
+
+def test_rows_match_direct_analyses(survey_csv):
+    table = run_config_sweep('survey.csv', 2, missing_strategies=['impute_mean', 'leave_empty'],
+                             bbch_stages=[59, -1], drop_lists={'none': []}, n_jobs=1)
+    rows = table.set_index(['missing_strategy', 'bbch_stage'])
+    features = survey_csv.drop(columns=['SampleID', 'BBCH'])
+
+    expected = PCAAnalyzer().analyze(features, 2, impute_strategy='mean')
+    row = rows.loc[('impute_mean', 'all')]
+    assert row['error'] == '' and row['n_samples'] == 300
+    np.testing.assert_allclose([row['PC1_var'], row['PC2_var']], expected['explained_variance'])
+
+    # leave_empty drops the three incomplete samples instead of imputing them
+    complete = features.dropna()
+    expected = PCAAnalyzer().analyze(complete, 2)
+    row = rows.loc[('leave_empty', 'all')]
+    assert row['n_samples'] == 297
+    np.testing.assert_allclose([row['PC1_var'], row['PC2_var']], expected['explained_variance'])
+
+    assert rows.loc[('impute_mean', 59), 'n_samples'] == 100
+
+
+def test_parallel_table_equals_serial(survey_csv):
+    serial = run_config_sweep('survey.csv', 2, bbch_stages=[59, 85, -1], n_jobs=1)
+    parallel = run_config_sweep('survey.csv', 2, bbch_stages=[59, 85, -1], n_jobs=3)
+
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert (serial.loc[serial['bbch_stage'] == 85, 'error'] != '').all()
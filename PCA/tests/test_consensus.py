@@ -0,0 +1,35 @@
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+
+from source.analysis.pca import ClusterAnalyzer
+
+
+def blobs_with_bridge():
+    rng = np.random.default_rng(5)
+    centers = np.array([[0.0, 0.0], [6.0, 0.0], [0.0, 6.0]])
+    truth = np.repeat(np.arange(3), 60)
+    blobs = centers[truth] + 0.6 * rng.normal(size=(180, 2))
+    # Points halfway between the first two blobs switch cluster from one subsample to the next
+    bridge = np.column_stack([np.full(6, 3.0), np.linspace(-0.3, 0.3, 6)])
+    return np.vstack([blobs, bridge]), truth
+
+
+def test_consensus_recovers_blobs_and_flags_ambiguous_points():
+    data, truth = blobs_with_bridge()
+    results = ClusterAnalyzer().consensus_clustering(data, 3, n_resamples=20, n_jobs=1)
+
+    assert adjusted_rand_score(truth, results['labels'][:180]) == 1.0
+    assert np.all(results['times_sampled'] > 0)
+    assert results['stability'][:180].min() == 1.0
+    assert results['stability'][180:].max() < 0.9
+    assert results['coassociation'].shape == (186, 186)
+
+
+def test_consensus_does_not_depend_on_n_jobs():
+    data, _ = blobs_with_bridge()
+    serial = ClusterAnalyzer().consensus_clustering(data, 3, n_resamples=12, n_jobs=1)
+    parallel = ClusterAnalyzer().consensus_clustering(data, 3, n_resamples=12, n_jobs=3)
+
+    np.testing.assert_array_equal(parallel['labels'], serial['labels'])
+    np.testing.assert_array_equal(parallel['stability'], serial['stability'])
+    np.testing.assert_array_equal(parallel['coassociation'].toarray(), serial['coassociation'].toarray())
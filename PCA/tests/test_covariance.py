@@ -0,0 +1,41 @@
+import numpy as np
+
+from conftest import align_signs
+from source.analysis.covariance import chunk_moments, merge_moments
+from source.analysis.pca import PCAAnalyzer
+
+
+def test_covariance_engine_matches_run_pca(correlated_frame):
+    reference = PCAAnalyzer().analyze(correlated_frame, 3, svd_solver='full')
+    covariance = PCAAnalyzer().analyze(correlated_frame, 3, engine='covariance', n_jobs=1)
+
+    np.testing.assert_allclose(covariance['explained_variance'], reference['explained_variance'], rtol=1e-10)
+    components, signs = align_signs(covariance['components'], reference['components'])
+    np.testing.assert_allclose(components, reference['components'], atol=1e-10)
+    np.testing.assert_allclose(covariance['transformed_data'] * signs, reference['transformed_data'], atol=1e-8)
+
+
+def test_covariance_engine_chunking_does_not_change_the_fit(correlated_frame):
+    whole = PCAAnalyzer().run_covariance_pca(correlated_frame, 3, n_jobs=1)
+    chunked = PCAAnalyzer().run_covariance_pca(correlated_frame, 3, n_jobs=1, chunk_rows=37)
+
+    np.testing.assert_allclose(chunked['components'], whole['components'], atol=1e-12)
+    np.testing.assert_allclose(chunked['transformed_data'], whole['transformed_data'], atol=1e-10)
+
+
+def test_merge_moments_is_associative_and_matches_one_pass(correlated_frame):
+    values = correlated_frame.to_numpy()
+    a, b, c = (chunk_moments(block) for block in np.split(values, [50, 170]))
+    whole = chunk_moments(values)
+
+    for merged in (merge_moments(merge_moments(a, b), c), merge_moments(a, merge_moments(b, c))):
+        assert merged[0] == whole[0]
+        np.testing.assert_allclose(merged[1], whole[1], atol=1e-12)
+        np.testing.assert_allclose(merged[2], whole[2], rtol=1e-10)
+
+
+def test_merge_moments_ignores_empty_sides(correlated_frame):
+    moments = chunk_moments(correlated_frame.to_numpy())
+    assert merge_moments(None, moments) is moments
+    empty = (0, np.zeros(6), np.zeros((6, 6)))
+    assert merge_moments(moments, empty) is moments
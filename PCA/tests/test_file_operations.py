@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from source.utils.file_operations import ENCODING_SAMPLE_BYTES, detect_encoding, load_columns, load_file, load_files, \
+    resolve_usecols
+
+
+@pytest.fixture
+def survey_csv(tmp_path, monkeypatch):
+    """A small survey file; caches are written below tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    frame = pd.DataFrame({
+        'Site': ['a', 'b', 'c', 'd'],
+        'SampleID': ['S1', 'S2', 'S3', 'S4'],
+        'Year': [2021, 2021, 2022, 2022],
+        'bbch': ['B59', 'B69', 'B59', 'B85'],
+        ' Extra ': [1.5, 2.5, 3.5, 4.5],
+        'sp_0': [0, 3, 120, 7],
+        'sp_1': [0.5, np.nan, 1.5, 2.0]
+    })
+    path = tmp_path / 'survey.csv'
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_resolve_usecols_matches_names_case_insensitively():
+    header = ['Site', 'SampleID', ' Extra ', 'sp_0']
+    assert resolve_usecols(header, ['extra'], keep=['sampleid'], default_columns_to_drop=['SITE', 'SampleID']) == [
+        'SampleID', 'sp_0']
+
+
+def test_resolve_usecols_warns_only_about_user_columns(capsys):
+    resolve_usecols(['sp_0'], ['nosuch'], default_columns_to_drop=['Site'])
+    output = capsys.readouterr().out
+    assert 'nosuch' in output
+    assert 'site' not in output
+
+
+def test_load_columns_drops_defaults_and_user_columns_but_honours_keep(survey_csv):
+    data = load_columns(survey_csv, drop_columns=['EXTRA'], keep=['sampleid'], use_cache=False)
+
+    assert list(data.columns) == ['SampleID', 'bbch', 'sp_0', 'sp_1']
+    assert data['sp_0'].dtype == np.int8
+    assert isinstance(data['bbch'].dtype, pd.CategoricalDtype)
+
+
+def test_load_columns_reads_the_same_columns_from_the_cache(survey_csv):
+    parsed = load_columns(survey_csv, drop_columns=['extra'], keep=['Year'])
+    cached = load_columns(survey_csv, drop_columns=['extra'], keep=['Year'])
+
+    assert cached.attrs['encoding']['method'] == 'cache'
+    pd.testing.assert_frame_equal(cached, parsed)
+
+
+def test_load_columns_casts_to_float_dtype(survey_csv):
+    data = load_columns(survey_csv, float_dtype=np.float32, use_cache=False)
+    assert data['sp_0'].dtype == np.float32
+    assert data['sp_1'].dtype == np.float32
+
+
+def test_load_files_applies_the_drop_lists_to_every_file(survey_csv, tmp_path):
+    second = tmp_path / 'second.csv'
+    pd.read_csv(survey_csv).to_csv(second, index=False)
+
+    results = load_files([survey_csv, str(second)], n_jobs=1, drop_columns=['extra'], keep=['SampleID'])
+
+    assert list(results['data'].columns) == ['sampleid', 'bbch', 'sp_0', 'sp_1', 'source']
+    assert results['data'].shape[0] == 8
+
+
+@pytest.mark.parametrize('text_first', [True, False])
+def test_load_files_flags_dtype_conflicts_whatever_the_file_order(survey_csv, tmp_path, text_first):
+    text = tmp_path / 'text.csv'
+    frame = pd.read_csv(survey_csv)
+    frame['sp_1'] = ['low', 'high', 'low', 'mid']
+    frame.to_csv(text, index=False)
+    paths = [str(text), survey_csv] if text_first else [survey_csv, str(text)]
+
+    report = load_files(paths, n_jobs=1)['schema_report'].set_index('file')
+
+    assert report.loc[str(text), 'type_conflicts'] == ['sp_1 (text)']
+    assert report.loc[survey_csv, 'type_conflicts'] == ['sp_1 (numeric)']
+
+
+def write_cp1252_survey(path, special_row):
+    """About 600 KB of ASCII rows with one Windows-1252 site name at special_row."""
+    rows = [f"S{i},{i * 0.5},Site{i % 7}" for i in range(30000)]
+    rows[special_row] = f"S{special_row},1.0,G\u00e4rtnerei M\u00fcller"
+    with open(path, 'wb') as file:
+        file.write(("SampleID,Value,Site\n" + "\n".join(rows) + "\n").encode('cp1252'))
+    return str(path)
+
+
+def test_detect_encoding_finds_non_ascii_bytes_in_the_tail(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = write_cp1252_survey(tmp_path / 'tail.csv', 29990)
+    assert (tmp_path / 'tail.csv').stat().st_size > 3 * ENCODING_SAMPLE_BYTES
+
+    info = detect_encoding(path)
+    assert "G\u00e4rtnerei M\u00fcller".encode('cp1252').decode(info['encoding']) == "G\u00e4rtnerei M\u00fcller"
+    assert detect_encoding(path)['method'] == 'cache'
+
+
+def test_load_file_rescans_when_the_samples_miss_non_ascii_bytes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Row 5000 lies between the head and middle samples
+    path = write_cp1252_survey(tmp_path / 'gap.csv', 5000)
+
+    data = load_file(path, use_cache=False)
+    assert data.loc[5000, 'Site'] == "G\u00e4rtnerei M\u00fcller"
+    assert data.attrs['encoding']['method'] == 'full'
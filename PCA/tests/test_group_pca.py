@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from source.analysis.pca import PCAAnalyzer
+from conftest import align_signs
+
+
+@pytest.fixture
+def grouped_frame(correlated_frame):
+    frame = correlated_frame.copy()
+    frame['Site'] = np.where(np.arange(frame.shape[0]) < 200, 'north', 'south')
+    frame.loc[frame.index[-2:], 'Site'] = 'tiny'
+    return frame
+
+
+def test_each_group_matches_its_own_analysis(grouped_frame):
+    results = PCAAnalyzer().analyze_by_group(grouped_frame, 'Site', 2, n_jobs=1)
+
+    assert results['group_keys'] == ['north', 'south']
+    assert 'tiny' in results['skipped_groups']
+    for key in results['group_keys']:
+        rows = grouped_frame[grouped_frame['Site'] == key].drop(columns=['Site'])
+        expected = PCAAnalyzer().analyze(rows, 2)
+        group = results['groups'][key]
+        components, _ = align_signs(expected['components'], group['components'])
+        np.testing.assert_allclose(group['components'], components, atol=1e-10)
+        np.testing.assert_allclose(group['explained_variance'], expected['explained_variance'], atol=1e-12)
+        # Signs point the same way as the all-rows reference
+        assert np.all(np.sum(group['loadings'] * results['reference']['loadings'], axis=0) >= 0)
+
+
+def test_parallel_groups_equal_serial(grouped_frame):
+    serial = PCAAnalyzer().analyze_by_group(grouped_frame, 'Site', 2, n_jobs=1)
+    parallel = PCAAnalyzer().analyze_by_group(grouped_frame, 'Site', 2, n_jobs=2)
+
+    assert parallel['group_keys'] == serial['group_keys']
+    np.testing.assert_allclose(parallel['loadings_tensor'], serial['loadings_tensor'], atol=1e-12)
+    np.testing.assert_allclose(parallel['explained_variance'], serial['explained_variance'], atol=1e-12)
+
+
+def test_unknown_group_column_raises(grouped_frame):
+    with pytest.raises(ValueError, match="Group columns not found"):
+        PCAAnalyzer().analyze_by_group(grouped_frame, 'Year', 2)
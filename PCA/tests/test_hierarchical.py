@@ -0,0 +1,25 @@
+import numpy as np
+from scipy.cluster.hierarchy import linkage
+
+from source.analysis.hierarchical import weighted_ward_linkage
+
+
+def test_unit_weights_match_scipy_ward():
+    points = np.random.default_rng(0).normal(size=(60, 3))
+
+    np.testing.assert_allclose(weighted_ward_linkage(points, np.ones(60)), linkage(points, method='ward'))
+
+
+def test_weights_act_like_repeated_points():
+    points = np.random.default_rng(1).normal(size=(30, 2))
+    sizes = np.ones(30)
+    sizes[[3, 17]] = 3
+    repeated = np.repeat(points, sizes.astype(int), axis=0)
+
+    weighted = weighted_ward_linkage(points, sizes)
+    expanded = linkage(repeated, method='ward')
+
+    # The repeated copies first merge at height 0; every later merge must match
+    expanded = expanded[expanded[:, 2] > 0]
+    np.testing.assert_allclose(weighted[:, 2], expanded[:, 2])
+    assert weighted[-1, 3] == len(points)  # Counts leaves (micro-clusters), as scipy's tools expect
@@ -0,0 +1,44 @@
+import numpy as np
+from sklearn.decomposition import PCA
+from sklearn.preprocessing import StandardScaler
+
+from conftest import align_signs
+from source.analysis.incremental import IncrementalPCAState
+from source.analysis.pca import PCAAnalyzer
+
+
+def test_update_matches_full_refit(correlated_frame):
+    values = correlated_frame.to_numpy()
+    names = list(correlated_frame.columns)
+    state = IncrementalPCAState.from_values(values[:120], names, 3)
+    for block in np.array_split(values[120:], 4):
+        state.update(block)
+
+    refit = PCA(n_components=3, svd_solver='full').fit(StandardScaler().fit_transform(values))
+    assert state.moments[0] == values.shape[0]
+    np.testing.assert_allclose(state.model.explained_variance_ratio_, refit.explained_variance_ratio_, rtol=1e-10)
+    components, _ = align_signs(state.model.components_, refit.components_)
+    np.testing.assert_allclose(components, refit.components_, atol=1e-10)
+
+
+def test_update_keeps_component_signs(correlated_frame):
+    values = correlated_frame.to_numpy()
+    state = IncrementalPCAState.from_values(values[:150], list(correlated_frame.columns), 3)
+    before = state.model.components_.copy()
+    drift = state.update(values[150:])
+
+    assert np.all(np.sum(state.model.components_ * before, axis=1) > 0)
+    np.testing.assert_allclose(drift['component_cosines'], np.abs(np.sum(state.model.components_ * before, axis=1)))
+
+
+def test_saved_state_resumes_the_same_model(correlated_frame, tmp_path):
+    path = str(tmp_path / 'state.npz')
+    first, rest = correlated_frame.iloc[:200], correlated_frame.iloc[200:]
+
+    analyzer = PCAAnalyzer()
+    analyzer.start_incremental(first, 3, state_path=path)
+    resumed = PCAAnalyzer().update_incremental(rest, state_path=path)
+    in_memory = analyzer.update_incremental(rest)
+
+    np.testing.assert_allclose(resumed['components'], in_memory['components'], atol=1e-12)
+    np.testing.assert_allclose(resumed['transformed_data'], in_memory['transformed_data'], atol=1e-10)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from source.analysis.neighbors import SampleIndex
+from source.analysis.pca import PCAAnalyzer
+
+
+def brute_force(scores, row):
+    distances = np.linalg.norm(scores - scores[row], axis=1)
+    distances[row] = np.inf
+    order = np.argsort(distances, kind='stable')
+    return order, distances[order]
+
+
+def test_find_similar_samples_matches_brute_force(correlated_frame):
+    sample_ids = [f"S{i}" for i in range(correlated_frame.shape[0])]
+    analyzer = PCAAnalyzer()
+    analyzer.analyze(correlated_frame, 3)
+    scores = analyzer.pca_model.transform(analyzer.standardized_data)
+
+    results = analyzer.find_similar_samples('S17', k=6, sample_ids=sample_ids)
+    order, distances = brute_force(scores, 17)
+    assert results['sample_id'] == 'S17'
+    assert list(results['neighbor_ids']) == [sample_ids[i] for i in order[:6]]
+    np.testing.assert_allclose(results['distances'], distances[:6])
+
+    within = analyzer.find_similar_samples('S17', radius=float(distances[9]) + 1e-9, sample_ids=sample_ids)
+    assert list(within['neighbor_rows']) == list(order[:10])
+    # The index is reused until the model or the sample IDs change
+    index = analyzer.sample_index
+    analyzer.find_similar_samples('S3', sample_ids=sample_ids)
+    assert analyzer.sample_index is index
+
+
+def test_locate_and_unknown_ids():
+    scores = np.array([[0.0, 0.0, 5.0], [1.0, 1.0, -5.0], [4.0, 4.0, 0.0]])
+    index = SampleIndex(scores, sample_ids=['a', 'b', 'c'])
+    assert index.locate(0.9, 1.2) == 1  # Only PC1/PC2 count for clicks
+    with pytest.raises(ValueError, match="not found"):
+        index.knn('z')
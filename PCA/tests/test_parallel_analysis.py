@@ -0,0 +1,27 @@
+import numpy as np
+
+from source.analysis.parallel_analysis import parallel_analysis
+
+
+def test_two_latent_factors_are_retained(correlated_frame):
+    results = parallel_analysis(correlated_frame.to_numpy(), n_permutations=40, n_jobs=1)
+
+    assert results['suggested_n_components'] == 2
+    assert np.all(results['observed'][:2] > results['null_upper'][:2])
+    # Column shuffles keep every column's variance, so the null has the observed total
+    np.testing.assert_allclose(results['null_mean_ratio'].sum(), 1.0)
+
+
+def test_results_do_not_depend_on_n_jobs(correlated_frame):
+    serial = parallel_analysis(correlated_frame.to_numpy(), n_permutations=30, n_jobs=1)
+    parallel = parallel_analysis(correlated_frame.to_numpy(), n_permutations=30, n_jobs=3)
+
+    for key in ('observed', 'null_mean', 'null_lower', 'null_upper'):
+        np.testing.assert_allclose(parallel[key], serial[key], rtol=1e-12)
+    assert parallel['suggested_n_components'] == serial['suggested_n_components']
+
+
+def test_independent_noise_keeps_one_component():
+    rng = np.random.default_rng(0)
+    results = parallel_analysis(rng.normal(size=(400, 8)), n_permutations=40, n_jobs=1)
+    assert results['suggested_n_components'] == 1
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import adjusted_rand_score
+
+from source.analysis.pca import NOISE_LABEL, ClusterAnalyzer, PCAAnalyzer
+from source.analysis.projector import Projector
+from conftest import align_signs
+
+
+def test_streaming_matches_in_memory_analysis(correlated_frame, tmp_path):
+    input_path = str(tmp_path / 'survey.csv')
+    output_path = str(tmp_path / 'scores.csv')
+    correlated_frame.to_csv(input_path, index=False)
+
+    reference = PCAAnalyzer()
+    expected = reference.analyze(correlated_frame, 6)
+    streaming = PCAAnalyzer()
+    # With all components kept, incremental PCA over several chunks is exact
+    results = streaming.analyze_streaming(input_path, 6, output_path, drop_columns=[], chunksize=70)
+
+    assert results['n_chunks'] == 5
+    assert results['data_shape'] == correlated_frame.shape
+    components, signs = align_signs(results['components'], expected['components'])
+    np.testing.assert_allclose(components, expected['components'], atol=1e-8)
+    np.testing.assert_allclose(results['explained_variance'], expected['explained_variance'], atol=1e-10)
+    scores = pd.read_csv(output_path).to_numpy() * signs
+    np.testing.assert_allclose(scores, expected['transformed_data'], atol=1e-8)
+
+
+def test_streaming_model_exports_a_projector(correlated_frame, tmp_path):
+    input_path = str(tmp_path / 'survey.csv')
+    output_path = str(tmp_path / 'scores.csv')
+    model_path = str(tmp_path / 'model.npz')
+    correlated_frame.to_csv(input_path, index=False)
+
+    analyzer = PCAAnalyzer()
+    analyzer.analyze_streaming(input_path, 2, output_path, drop_columns=[])
+    analyzer.export_projector(model_path)
+
+    projected = Projector(model_path).project(correlated_frame.to_numpy())
+    np.testing.assert_allclose(projected, pd.read_csv(output_path).to_numpy(), atol=1e-10)
+    with pytest.raises(ValueError, match="Streaming PCA"):
+        analyzer.find_similar_samples(0)
+
+
+def test_dbscan_eps_separates_blobs_with_background_noise():
+    rng = np.random.default_rng(1)
+    centers = np.array([[0, 0], [6, 0], [0, 6], [6, 6]])
+    blobs = np.vstack([center + rng.normal(size=(150, 2)) for center in centers])
+    noise = rng.uniform(-4, 10, size=(120, 2))
+    results = ClusterAnalyzer().density_clustering(np.vstack([blobs, noise]), method='dbscan')
+
+    assert results['num_clusters'] == 4
+    labels = results['labels'][:blobs.shape[0]].reshape(4, 150)
+    # Each blob keeps nearly all its points under one label of its own
+    majority = [np.bincount(row[row != NOISE_LABEL]).argmax() for row in labels]
+    assert len(set(majority)) == 4
+    for row, label in zip(labels, majority):
+        assert np.mean(row == label) > 0.9
+
+
+def test_float32_mode_tracks_float64(correlated_frame):
+    comparison = PCAAnalyzer().compare_precision(correlated_frame, 3)
+
+    assert comparison['components_max_diff'] < 1e-4
+    assert comparison['scores_relative_error'] < 1e-5
+    assert comparison['max_subspace_angle_deg'] < 1e-3
+    assert comparison['preprocessing_bytes']['float32'] < comparison['preprocessing_bytes']['float64']
+
+    results = PCAAnalyzer(precision='float32').analyze(correlated_frame, 3)
+    assert results['transformed_data'].dtype == np.float32
+    assert results['preprocessing_bytes']['numeric'] == correlated_frame.size * 4
+    with pytest.raises(ValueError, match="Unsupported precision"):
+        PCAAnalyzer(precision='float16')
+
+
+def test_streaming_mini_batch_k_means_recovers_blobs(tmp_path):
+    rng = np.random.default_rng(3)
+    centers = np.array([[0, 0], [8, 0], [0, 8], [8, 8]])
+    truth = np.repeat(np.arange(4), 250)
+    scores = centers[truth] + rng.normal(size=(1000, 2))
+    path = str(tmp_path / 'scores.csv')
+    pd.DataFrame(scores, columns=['PC1', 'PC2']).to_csv(path, index=False)
+
+    analyzer = ClusterAnalyzer()
+    from_file = analyzer.mini_batch_k_means_streaming(path, 4, batch_size=64, chunksize=300)
+    from_blocks = analyzer.mini_batch_k_means_streaming(
+        lambda: iter(np.array_split(scores, 4)), 4, batch_size=64)
+
+    # Rows are ordered by cluster, so every chunk holds one or two clusters only
+    assert adjusted_rand_score(truth, from_file['labels']) == 1.0
+    assert adjusted_rand_score(truth, from_blocks['labels']) == 1.0
+    exact_inertia = ((scores - centers[truth]) ** 2).sum()
+    assert from_file['inertia'] < 1.01 * exact_inertia
+    with pytest.raises(ValueError, match="Batch size"):
+        analyzer.mini_batch_k_means_streaming(path, 4, batch_size=3)
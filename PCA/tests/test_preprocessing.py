@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler
+
+from source.analysis.pca import PCAAnalyzer
+from source.analysis.preprocessing import PreprocessingPipeline
+
+
+@pytest.fixture
+def raw_frame(correlated_frame):
+    frame = correlated_frame.copy()
+    frame.iloc[[3, 40, 41], 1] = np.nan
+    frame.iloc[7, 4] = np.inf
+    frame.insert(0, 'SampleID', [f"S{i}" for i in range(frame.shape[0])])
+    frame['Site'] = 'A'
+    return frame
+
+
+@pytest.mark.parametrize('strategy', ['mean', 'median'])
+def test_pipeline_matches_imputer_and_scaler(raw_frame, strategy):
+    preprocessed = PreprocessingPipeline(default_columns_to_drop=['Site'], impute_strategy=strategy).fit_transform(raw_frame)
+
+    numeric = raw_frame.drop(columns=['SampleID', 'Site']).replace([np.inf, -np.inf], np.nan)
+    expected = StandardScaler().fit_transform(SimpleImputer(strategy=strategy).fit_transform(numeric))
+    assert preprocessed['feature_names'] == list(numeric.columns)
+    assert preprocessed['removed_columns'] == ['SampleID']
+    assert (preprocessed['inf_count'], preprocessed['nan_count']) == (1, 4)
+    np.testing.assert_allclose(preprocessed['data'], expected, atol=1e-12)
+
+
+def test_missing_drop_columns_raise(raw_frame):
+    with pytest.raises(ValueError, match="not_there"):
+        PreprocessingPipeline(drop_columns=['not_there']).fit_transform(raw_frame)
+
+
+def test_standardize_data_matches_standard_scaler(raw_frame):
+    analyzer = PCAAnalyzer()
+    standardized = analyzer.standardize_data(raw_frame.drop(columns=['SampleID', 'Site']))
+
+    numeric = raw_frame.drop(columns=['SampleID', 'Site']).replace([np.inf, -np.inf], np.nan)
+    scaler = StandardScaler().fit(numeric)
+    np.testing.assert_allclose(standardized.to_numpy(), scaler.transform(numeric), atol=1e-12)
+    np.testing.assert_allclose(analyzer.scaler_mean, scaler.mean_)
+    np.testing.assert_allclose(analyzer.scaler_scale, scaler.scale_)
+    assert analyzer.standardized_data is standardized
+
+
+def test_validate_numeric_data_keeps_numeric_columns(raw_frame):
+    numeric = PCAAnalyzer().validate_numeric_data(raw_frame)
+    assert list(numeric.columns) == [f"sp_{i}" for i in range(6)]
+    assert numeric.index.equals(raw_frame.index)
+    assert numeric.isna().sum().sum() == 4
+
+
+def test_analyze_requires_imputation_for_missing_values(raw_frame):
+    with pytest.raises(Exception, match="missing or infinite"):
+        PCAAnalyzer().analyze(raw_frame, 2, drop_columns=['SampleID', 'Site'])
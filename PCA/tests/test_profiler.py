@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from source.analysis.profiler import merge_profiles, profile_chunk, profile_file, summarize_profile
+
+
+@pytest.fixture
+def stage_frame():
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame({
+        'bbch': rng.choice(['B59', 'B69', 'B85'], 90),
+        'sp_0': rng.normal(size=90),
+        'sp_1': rng.poisson(4, 90).astype(float)
+    })
+    frame.loc[[5, 40, 77], 'sp_0'] = np.nan
+    frame.loc[[12, 60], 'sp_1'] = np.inf
+    return frame
+
+
+def assert_same_profile(actual, expected):
+    assert actual['rows'] == expected['rows']
+    assert actual['bbch_counts'] == expected['bbch_counts']
+    assert list(actual['columns']) == list(expected['columns'])
+    for col, stats in expected['columns'].items():
+        for key, value in stats.items():
+            assert actual['columns'][col][key] == pytest.approx(value), (col, key)
+
+
+def test_merged_chunks_equal_one_profile(stage_frame):
+    chunks = [stage_frame.iloc[start:start + 25] for start in range(0, 90, 25)]
+    merged = None
+    for chunk in chunks:
+        merged = merge_profiles(merged, profile_chunk(chunk))
+
+    assert_same_profile(merged, profile_chunk(stage_frame))
+
+
+def test_merge_profiles_is_associative(stage_frame):
+    a, b, c = (profile_chunk(stage_frame.iloc[rows]) for rows in (slice(0, 30), slice(30, 31), slice(31, 90)))
+
+    assert_same_profile(merge_profiles(merge_profiles(a, b), c), merge_profiles(a, merge_profiles(b, c)))
+
+
+def test_merge_profiles_leaves_its_inputs_alone(stage_frame):
+    a, b = profile_chunk(stage_frame.iloc[:45]), profile_chunk(stage_frame.iloc[45:])
+    before = {col: dict(stats) for col, stats in a['columns'].items()}
+    merge_profiles(a, b)
+    assert a['columns'] == before
+
+
+def test_a_column_is_numeric_only_if_every_block_parsed_as_numeric(stage_frame):
+    text = stage_frame.iloc[:10].astype({'sp_1': str})
+    merged = merge_profiles(profile_chunk(stage_frame), profile_chunk(text))
+
+    assert merged['columns']['sp_0']['numeric']
+    assert not merged['columns']['sp_1']['numeric']
+
+
+def test_profile_file_matches_the_in_memory_profile(stage_frame, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / 'stages.csv'
+    stage_frame.to_csv(path, index=False)
+
+    profile = profile_file(str(path), chunksize=20, n_jobs=1)
+
+    # Written to CSV, inf reads back as inf and the counts survive chunking
+    assert_same_profile(profile, profile_chunk(pd.read_csv(path)))
+    summary = summarize_profile(profile).set_index('column')
+    assert summary.loc['sp_0', 'missing'] == 3
+    assert summary.loc['sp_1', 'inf'] == 2
+    assert summary.loc['sp_0', 'mean'] == pytest.approx(stage_frame['sp_0'].mean())
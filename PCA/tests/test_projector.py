@@ -0,0 +1,62 @@
+import csv
+
+import numpy as np
+import pytest
+
+from source.analysis.pca import PCAAnalyzer
+from source.analysis.projector import Projector
+
+
+@pytest.mark.parametrize('engine', ['sklearn', 'covariance'])
+def test_projector_matches_model_transform(correlated_frame, tmp_path, engine):
+    path = str(tmp_path / 'model.npz')
+    analyzer = PCAAnalyzer()
+    analyzer.analyze(correlated_frame, 3, engine=engine, n_jobs=1)
+    analyzer.export_projector(path)
+
+    expected = analyzer.pca_model.transform(analyzer.standardized_data)
+    np.testing.assert_allclose(Projector(path).project(correlated_frame.to_numpy()), expected, atol=1e-10)
+
+
+def test_project_csv_round_trip(correlated_frame, tmp_path):
+    model_path = str(tmp_path / 'model.npz')
+    input_path = str(tmp_path / 'survey.csv')
+    output_path = str(tmp_path / 'scores.csv')
+    analyzer = PCAAnalyzer()
+    analyzer.analyze(correlated_frame, 2)
+    analyzer.export_projector(model_path)
+
+    # Columns in a different order and with different case still resolve
+    survey = correlated_frame[correlated_frame.columns[::-1]].rename(columns=str.upper)
+    survey.insert(0, 'SampleID', [f"S{i}" for i in range(survey.shape[0])])
+    survey.to_csv(input_path, index=False)
+    n_rows = Projector(model_path).project_csv(input_path, output_path, batch_rows=64, id_columns=('SampleID',))
+
+    with open(output_path, newline='') as file:
+        rows = list(csv.reader(file))
+    assert n_rows == correlated_frame.shape[0]
+    assert rows[0] == ['SampleID', 'PC1', 'PC2']
+    assert rows[1][0] == 'S0'
+    scores = np.array([[float(cell) for cell in row[1:]] for row in rows[1:]])
+    np.testing.assert_allclose(scores, analyzer.pca_model.transform(analyzer.standardized_data), atol=1e-10)
+
+
+def test_missing_values_score_as_the_training_mean(correlated_frame, tmp_path):
+    path = str(tmp_path / 'model.npz')
+    analyzer = PCAAnalyzer()
+    analyzer.analyze(correlated_frame, 2)
+    analyzer.export_projector(path)
+    projector = Projector(path)
+
+    sample = correlated_frame.to_numpy()[:1].copy()
+    filled = sample.copy()
+    sample[0, 2] = np.nan
+    filled[0, 2] = projector.scaler_mean[2]
+    np.testing.assert_allclose(projector.project(sample), projector.project(filled))
+
+
+def test_kernel_models_are_not_exported(correlated_frame, tmp_path):
+    analyzer = PCAAnalyzer()
+    analyzer.analyze(correlated_frame, 2, engine='kernel', kernel_params={'n_landmarks': 50})
+    with pytest.raises(ValueError, match="linear projector"):
+        analyzer.export_projector(str(tmp_path / 'model.npz'))
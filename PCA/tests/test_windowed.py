@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.decomposition import PCA
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler
+
+from source.analysis.covariance import chunk_moments, merge_moments, subtract_moments
+from source.analysis.windowed import windowed_pca
+
+
+@pytest.fixture
+def events_frame(correlated_frame):
+    """The correlated frame split into 12 events of 25 rows, with gaps in two columns."""
+    frame = correlated_frame.copy()
+    frame.insert(0, 'eventid', np.repeat(np.arange(12) % 4, 25))
+    frame.insert(0, 'year', np.repeat(2020 + np.arange(12) // 4, 25))
+    rng = np.random.default_rng(7)
+    for col in ('sp_1', 'sp_4'):
+        frame.loc[rng.choice(frame.index, 30, replace=False), col] = np.nan
+    return frame
+
+
+def test_subtract_moments_inverts_merge(correlated_frame):
+    values = correlated_frame.to_numpy()
+    a, b, c = (chunk_moments(block) for block in np.split(values, [80, 200]))
+    total = merge_moments(merge_moments(a, b), c)
+
+    for removed, remaining in ((a, merge_moments(b, c)), (c, merge_moments(a, b))):
+        result = subtract_moments(total, removed)
+        assert result[0] == remaining[0]
+        np.testing.assert_allclose(result[1], remaining[1], atol=1e-12)
+        np.testing.assert_allclose(result[2], remaining[2], rtol=1e-9, atol=1e-9)
+
+
+def test_windows_match_a_fresh_pca_imputed_per_window(events_frame):
+    features = [col for col in events_frame.columns if col.startswith('sp_')]
+    # DEFAULT_ORDER_BY is ('Year', 'EventId'); the lower-cased columns must still match
+    results = windowed_pca(events_frame, 2, window=3, step=2)
+
+    events = events_frame.groupby(['year', 'eventid'], sort=True).indices
+    keys = list(events)
+    for i, start in enumerate(range(0, len(keys) - 2, 2)):
+        rows = np.concatenate([events[key] for key in keys[start:start + 3]])
+        # Imputing with this window's own means only; later events must not leak in
+        window = SimpleImputer(strategy='mean').fit_transform(events_frame[features].to_numpy()[rows])
+        reference = PCA(n_components=2, svd_solver='full').fit(StandardScaler().fit_transform(window))
+
+        np.testing.assert_allclose(results['explained_variance'][i], reference.explained_variance_ratio_, rtol=1e-8)
+        cosines = np.abs(np.sum(results['loadings'][i].T * reference.components_, axis=1))
+        np.testing.assert_allclose(cosines, 1.0, atol=1e-8)
+
+
+def test_missing_order_columns_are_reported(events_frame):
+    with pytest.raises(ValueError, match="Ordering columns not found"):
+        windowed_pca(events_frame, 2, window=3, order_by=('Year', 'Site'))
+
+
+def test_median_imputation_is_rejected(events_frame):
+    with pytest.raises(ValueError, match="Unsupported impute strategy"):
+        windowed_pca(events_frame, 2, window=3, impute_strategy='median')